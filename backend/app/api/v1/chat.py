@@ -124,6 +124,7 @@ from app.models.user import User
 from app.agents.graph_factory import main_agent_graph
 from app.agents.state import AgentState
 from app.agents.memory.memory_manager import memory_manager
+from app.core.inference_executor import InferenceQueueFullError
 
 router = APIRouter()
 
@@ -157,6 +158,12 @@ async def ask_question(
                 "retrieval_time_ms": (end_time - start_time) * 1000
             }
         )
+    except InferenceQueueFullError as e:
+        print(f"Rejecting retrieval, inference queue is full: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The server is busy. Please retry shortly."
+        )
     except Exception as e:
         print(f"Error during retrieval: {e}")
         raise HTTPException(
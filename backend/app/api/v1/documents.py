@@ -79,24 +79,39 @@
 
 
 
-import hashlib
+import uuid
 from pathlib import Path
-from fastapi import APIRouter, Depends, File, UploadFile, status
+from typing import List
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.api.deps import get_current_project, get_current_user
 from app.db.session import get_db
-from app.models.document import Document, DocumentStatus
+from app.models.document import Document
+from app.models.ingestion_batch import IngestionBatch, IngestionBatchStatus
 from app.models.project import Project
+from app.models.sync_source import SyncSource
 from app.models.user import User
+from app.rag.ingest.bulk_ingest import (
+    bump_document_version,
+    dedupe_files,
+    ingestion_finished,
+    summarize_batch_progress,
+)
+from app.rag.ingest.stage_store import stage_store
+from app.rag.ingest.upload_store import upload_store
+from app.schemas.document import BulkManifestRequest, SyncSourceCreate
+from app.settings import settings
+from workers.tasks.batch_tasks import register_manifest_task, schedule_ingestion_batch
 from workers.tasks.ingest_tasks import ingest_document_task
+from workers.tasks.sync_tasks import sync_source_task
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("/app/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 @router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
     file: UploadFile = File(...),
@@ -104,8 +119,35 @@ async def upload_document(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    contents = await file.read()
-    sha256_hash = hashlib.sha256(contents).hexdigest()
+    # Streamed to disk in fixed-size chunks, hashed on the way
+    stored = await upload_store.save_upload(file)
+    return await _register_document(stored, file.filename, file.content_type, project, current_user, db)
+
+
+@router.post("/upload-stream", status_code=status.HTTP_202_ACCEPTED)
+async def upload_document_stream(
+    request: Request,
+    filename: str = Query(..., min_length=1),
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Uploads one file sent as the raw request body (no multipart encoding).
+
+    The body is consumed chunk by chunk as it arrives from the client, so neither
+    the request parser nor the handler ever buffers the whole file; the mime type
+    is taken from the Content-Type header.
+    """
+    stored = await upload_store.save_stream(request.stream())
+    content_type = request.headers.get("content-type", "application/octet-stream").split(";")[0].strip()
+    return await _register_document(stored, filename, content_type, project, current_user, db)
+
+
+async def _register_document(
+    stored: dict, filename: str, content_type: str, project: Project, current_user: User, db: AsyncSession
+):
+    sha256_hash = stored["sha256"]
 
     # --- FIX: Check if document already exists ---
     result = await db.execute(select(Document).where(Document.sha256 == sha256_hash))
@@ -121,16 +163,13 @@ async def upload_document(
         }
     # --- END FIX ---
 
-    file_path = UPLOAD_DIR / sha256_hash
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    print(f"Saved new file to: {file_path}")
+    print(f"Saved new file to: {stored['path']}")
 
     new_document = Document(
         project_id=project.id,
-        filename=file.filename,
-        mime_type=file.content_type,
-        size_bytes=len(contents),
+        filename=filename,
+        mime_type=content_type,
+        size_bytes=stored["size_bytes"],
         sha256=sha256_hash,
         owner_id=current_user.id,
     )
@@ -143,6 +182,307 @@ async def upload_document(
     return {
         "doc_id": str(new_document.id),
         "status": "queued_for_ingestion",
-        "filename": file.filename,
+        "filename": filename,
+        "sha256": sha256_hash,
+    }
+
+
+@router.post("/{document_id}/versions", status_code=status.HTTP_202_ACCEPTED)
+async def upload_document_version(
+    document_id: uuid.UUID,
+    file: UploadFile = File(...),
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Replaces a document with a new version of its file and re-ingests it in place.
+
+    The document keeps its id; ingestion then diffs the new chunks against the stored
+    ones by content hash, so only added or changed chunks are embedded and indexed.
+    A new version is rejected (409) while the previous one is still being ingested:
+    its tasks still read the previous file and stage results under the same document.
+    A version left PROCESSING without progress for `DOCUMENT_STALE_PROCESSING_SECONDS`
+    is treated as dead and may be replaced.
+    """
+    document = await _get_document_for_new_version(db, document_id, project.id)
+
+    stored = await upload_store.save_upload(file)
+    sha256_hash = stored["sha256"]
+
+    if sha256_hash == document.sha256:
+        return {"doc_id": str(document.id), "status": "unchanged", "version": document.version, "sha256": sha256_hash}
+
+    result = await db.execute(select(Document).where(Document.sha256 == sha256_hash))
+    existing_document = result.scalar_one_or_none()
+    if existing_document:
+        # sha256 is unique across documents, so the same bytes cannot become a version of this one
+        return {
+            "doc_id": str(existing_document.id),
+            "status": "already_exists",
+            "filename": existing_document.filename,
+            "sha256": existing_document.sha256,
+        }
+
+    # Re-check under a row lock: another version may have been accepted during the upload
+    document = await _get_document_for_new_version(db, document_id, project.id, for_update=True)
+    print(f"Saved version {document.version + 1} of document {document.id} to: {stored['path']}")
+
+    previous_sha256 = bump_document_version(
+        document, {**stored, "filename": file.filename, "mime_type": file.content_type}
+    )
+    await db.commit()
+    await db.refresh(document)
+
+    Path(upload_store.path(previous_sha256)).unlink(missing_ok=True)
+    ingest_document_task.delay(document_id=str(document.id), sha256_hash=sha256_hash)
+
+    return {
+        "doc_id": str(document.id),
+        "status": "queued_for_reindexing",
+        "version": document.version,
+        "filename": document.filename,
         "sha256": sha256_hash,
-    }
\ No newline at end of file
+    }
+
+
+async def _get_document_for_new_version(
+    db: AsyncSession, document_id: uuid.UUID, project_id: uuid.UUID, for_update: bool = False
+) -> Document:
+    statement = select(Document).where(Document.id == document_id, Document.project_id == project_id)
+    if for_update:
+        statement = statement.with_for_update().execution_options(populate_existing=True)
+    result = await db.execute(statement)
+    document = result.scalar_one_or_none()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not ingestion_finished(document.status, document.updated_at, settings.DOCUMENT_STALE_PROCESSING_SECONDS):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Version {document.version} is still being ingested ({document.status.value}); retry when done",
+        )
+    return document
+
+
+@router.post("/bulk-upload", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_upload_documents(
+    files: List[UploadFile] = File(...),
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Uploads many files as one ingestion batch.
+
+    All new `Document` rows are created in a single transaction and the batch is
+    scheduled as one Celery group with bounded concurrency. Files whose content is
+    already ingested are skipped. Track the batch with `GET /documents/batches/{batch_id}`.
+    """
+    if len(files) > settings.BULK_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f"At most {settings.BULK_UPLOAD_MAX_FILES} files per request; "
+                "use /documents/bulk-manifest for larger imports"
+            ),
+        )
+
+    uploaded = []
+    for file in files:
+        stored = await upload_store.save_upload(file)
+        uploaded.append(
+            {
+                "filename": file.filename,
+                "mime_type": file.content_type,
+                "size_bytes": stored["size_bytes"],
+                "sha256": stored["sha256"],
+            }
+        )
+
+    hashes = [file["sha256"] for file in uploaded]
+    result = await db.execute(select(Document.sha256).where(Document.sha256.in_(hashes)))
+    new_files, skipped = dedupe_files(uploaded, set(result.scalars()))
+
+    batch = IngestionBatch(
+        id=uuid.uuid4(),
+        project_id=project.id,
+        owner_id=current_user.id,
+        source="upload",
+        status=IngestionBatchStatus.QUEUED,
+        total_documents=len(new_files),
+        skipped_documents=len(skipped),
+    )
+    documents = [
+        Document(
+            id=uuid.uuid4(),
+            project_id=project.id,
+            owner_id=current_user.id,
+            batch_id=batch.id,
+            filename=file["filename"],
+            mime_type=file["mime_type"],
+            size_bytes=file["size_bytes"],
+            sha256=file["sha256"],
+        )
+        for file in new_files
+    ]
+    scheduled = [(str(doc.id), doc.sha256) for doc in documents]
+    db.add(batch)
+    db.add_all(documents)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Some files were ingested concurrently; retry the upload"
+        )
+
+    schedule_ingestion_batch(str(batch.id), scheduled, settings.BULK_INGEST_CONCURRENCY)
+
+    return {
+        "batch_id": str(batch.id),
+        "status": "queued_for_ingestion",
+        "queued": len(new_files),
+        "skipped": [{"filename": file["filename"], "sha256": file["sha256"]} for file in skipped],
+    }
+
+
+@router.post("/bulk-manifest", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_ingest_manifest(
+    manifest: BulkManifestRequest,
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ingests server-side files listed in a manifest: paths under the import root
+    and/or S3 prefixes to backfill.
+
+    Downloading, hashing and registering the files happens in a worker task, so
+    the request returns immediately with the batch id. S3 objects already ingested
+    with the same ETag are skipped; changed ones become new document versions.
+    """
+    batch = IngestionBatch(id=uuid.uuid4(), project_id=project.id, owner_id=current_user.id, source="manifest")
+    db.add(batch)
+    await db.commit()
+
+    manifest_ref = stage_store.put(str(batch.id), "manifest", manifest.model_dump())
+    register_manifest_task.delay(batch_id=str(batch.id), manifest_ref=manifest_ref)
+
+    return {
+        "batch_id": str(batch.id),
+        "status": "registering",
+        "paths": len(manifest.paths),
+        "s3_uris": len(manifest.s3_uris),
+    }
+
+
+@router.get("/batches/{batch_id}")
+async def get_batch_progress(
+    batch_id: uuid.UUID,
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Progress of a whole ingestion batch, aggregated from its documents' statuses.
+    """
+    result = await db.execute(
+        select(IngestionBatch).where(IngestionBatch.id == batch_id, IngestionBatch.project_id == project.id)
+    )
+    batch = result.scalar_one_or_none()
+    if not batch:
+        raise HTTPException(status_code=404, detail="Ingestion batch not found")
+
+    result = await db.execute(
+        select(Document.status, func.count()).where(Document.batch_id == batch_id).group_by(Document.status)
+    )
+    status_counts = {row_status.value: count for row_status, count in result.all()}
+
+    progress = summarize_batch_progress(batch.total_documents, status_counts)
+    if batch.status == IngestionBatchStatus.REGISTERING:
+        progress.update(progress=0.0, done=False)  # Documents are not created yet
+
+    return {
+        "batch_id": str(batch.id),
+        "status": batch.status.value,
+        "source": batch.source,
+        "skipped": batch.skipped_documents,
+        "error": batch.error,
+        **progress,
+    }
+
+
+@router.post("/sources", status_code=status.HTTP_202_ACCEPTED)
+async def register_sync_source(
+    source: SyncSourceCreate,
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Registers a source to keep in sync (a directory under the import root, an S3
+    prefix or a Drive folder) and starts its first, full sync. Later syncs
+    (`POST /documents/sources/{source_id}/sync`) only ingest new or changed items.
+    """
+    sync_source = SyncSource(
+        id=uuid.uuid4(),
+        project_id=project.id,
+        owner_id=current_user.id,
+        connector=source.connector,
+        location=source.location,
+        cursor={},
+    )
+    db.add(sync_source)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This source is already registered")
+
+    sync_source_task.delay(sync_source_id=str(sync_source.id))
+    return {"source_id": str(sync_source.id), "status": "syncing"}
+
+
+@router.post("/sources/{source_id}/sync", status_code=status.HTTP_202_ACCEPTED)
+async def sync_source(
+    source_id: uuid.UUID,
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Re-syncs a registered source from its saved cursor.
+    """
+    sync_source = await _get_sync_source(db, source_id, project.id)
+    sync_source_task.delay(sync_source_id=str(sync_source.id))
+    return {"source_id": str(sync_source.id), "status": "syncing"}
+
+
+@router.get("/sources/{source_id}")
+async def get_sync_source(
+    source_id: uuid.UUID,
+    project: Project = Depends(get_current_project),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Outcome of a source's last sync; its documents are tracked through `last_batch_id`.
+    """
+    sync_source = await _get_sync_source(db, source_id, project.id)
+    return {
+        "source_id": str(sync_source.id),
+        "connector": sync_source.connector,
+        "location": sync_source.location,
+        "last_synced_at": sync_source.last_synced_at,
+        "last_stats": sync_source.last_stats,
+        "last_batch_id": str(sync_source.last_batch_id) if sync_source.last_batch_id else None,
+        "error": sync_source.error,
+    }
+
+
+async def _get_sync_source(db: AsyncSession, source_id: uuid.UUID, project_id: uuid.UUID) -> SyncSource:
+    result = await db.execute(select(SyncSource).where(SyncSource.id == source_id, SyncSource.project_id == project_id))
+    sync_source = result.scalar_one_or_none()
+    if not sync_source:
+        raise HTTPException(status_code=404, detail="Sync source not found")
+    return sync_source
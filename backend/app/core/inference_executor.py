@@ -0,0 +1,80 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.settings import settings
+
+
+class InferenceQueueFullError(Exception):
+    """
+    Raised when the inference executor already has its maximum number of calls queued.
+    """
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool for blocking work on the request path: model inference
+    (embedder, cross-encoder, spaCy) and any remaining synchronous client calls.
+
+    Running these calls here instead of directly inside `async def` handlers keeps
+    the event loop free, so concurrent `/ask` requests actually overlap. Threads are
+    enough because torch, tokenizers and socket I/O all release the GIL.
+
+    At most `max_workers` calls run at once and at most `max_queue_depth` more may
+    wait; beyond that `run()` fails fast with `InferenceQueueFullError` instead of
+    letting latency grow without bound.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_depth: int = 64):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Runs `fn(*args, **kwargs)` on the pool and awaits its result.
+        """
+        with self._lock:
+            if self.in_flight >= self.max_workers + self.max_queue_depth:
+                self.rejected += 1
+                raise InferenceQueueFullError(
+                    f"Inference queue is full ({self.in_flight} calls in flight, limit "
+                    f"{self.max_workers + self.max_queue_depth})"
+                )
+            self.in_flight += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance shared by every request in this API process
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_MAX_WORKERS,
+    max_queue_depth=settings.INFERENCE_MAX_QUEUE_DEPTH,
+)
@@ -6,6 +6,8 @@ from app.db.base_class import Base
 from app.models.user import User
 from app.models.project import Project
 from app.models.document import Document
+from app.models.ingestion_batch import IngestionBatch
+from app.models.sync_source import SyncSource
 from app.models.chunk import Chunk
 from app.models.conversation import Conversation
 from app.models.message import Message
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import any_, bindparam, delete, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.models.chunk import Chunk
+
+CHUNK_COLUMNS = ("id", "document_id", "chunk_index", "text", "chunk_metadata", "content_hash", "created_at")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_chunk_rows(
+    document_id: uuid.UUID, chunks_data: List[Dict[str, Any]], start_index: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Turns chunker output into `chunks` rows. Ids are generated client-side, so the
+    caller knows every chunk id without reading the rows back.
+    """
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "document_id": document_id,
+            "chunk_index": start_index + offset,
+            "text": chunk["text"],
+            "chunk_metadata": chunk["metadata"],
+            "content_hash": content_hash(chunk["text"]),
+            "created_at": created_at,
+        }
+        for offset, chunk in enumerate(chunks_data)
+    ]
+
+
+def bulk_insert_chunks(
+    db: Session, rows: List[Dict[str, Any]], method: str = "values", batch_size: int = 1000
+) -> List[uuid.UUID]:
+    """
+    Inserts chunk rows in bulk, bypassing the ORM unit of work, and returns their ids
+    in order. The caller commits.
+
+    - "values": Core `insert()` executemany in `batch_size` batches (rendered by
+      SQLAlchemy as multi-row INSERT ... VALUES statements).
+    - "copy": PostgreSQL `COPY chunks FROM STDIN` through the psycopg connection.
+    """
+    start = time.perf_counter()
+    if method == "copy":
+        _copy_rows(db, rows)
+    elif method == "values":
+        for batch_start in range(0, len(rows), batch_size):
+            db.execute(insert(Chunk.__table__), rows[batch_start : batch_start + batch_size])
+    else:
+        raise ValueError(f"Unsupported chunk insert method: {method}. Expected 'values' or 'copy'")
+
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed if elapsed else 0.0
+    print(f"Bulk inserted {len(rows)} chunks via {method} in {elapsed * 1000:.1f} ms ({rate:.0f} rows/sec)")
+    return [row["id"] for row in rows]
+
+
+def _copy_rows(db: Session, rows: List[Dict[str, Any]]):
+    # Runs on the session's own connection, so it joins the current transaction
+    driver_connection = db.connection().connection.driver_connection
+    statement = f"COPY {Chunk.__tablename__} ({', '.join(CHUNK_COLUMNS)}) FROM STDIN"
+    with driver_connection.cursor() as cursor, cursor.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(
+                (
+                    row["id"],
+                    row["document_id"],
+                    row["chunk_index"],
+                    row["text"],
+                    json.dumps(row["chunk_metadata"]),
+                    row["content_hash"],
+                    row["created_at"],
+                )
+            )
+
+
+def iter_chunk_batches(
+    db: Session, document_id: uuid.UUID, batch_size: int = 256, chunk_ids: Optional[Sequence[str]] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Streams a document's chunks in `chunk_index` order as batches of chunk records
+    ({"chunk_id", "chunk_index", "text", "metadata"}).
+
+    Only the needed columns are selected (no ORM identity map) and `yield_per`
+    makes psycopg use a server-side cursor, so at most `batch_size` rows are held
+    client-side at a time regardless of document size. `chunk_ids` restricts the
+    stream to those chunks (e.g. the ones a new document version added); they are
+    bound as one array parameter (`id = ANY(...)`), so any number of ids stays
+    within the driver's 65535 bind parameter limit.
+    """
+    statement = (
+        select(Chunk.id, Chunk.chunk_index, Chunk.text, Chunk.chunk_metadata)
+        .where(Chunk.document_id == document_id)
+        .order_by(Chunk.chunk_index)
+        .execution_options(yield_per=batch_size)
+    )
+    if chunk_ids is not None:
+        ids = [uuid.UUID(str(chunk_id)) for chunk_id in chunk_ids]
+        statement = statement.where(Chunk.id == any_(bindparam("chunk_ids", ids, type_=ARRAY(Chunk.id.type))))
+    for partition in db.execute(statement).partitions():
+        yield [
+            {
+                "chunk_id": str(row.id),
+                "chunk_index": row.chunk_index,
+                "text": row.text,
+                "metadata": row.chunk_metadata,
+            }
+            for row in partition
+        ]
+
+
+@dataclass
+class ChunkDiff:
+    """
+    Difference between a document's stored chunks and the chunks of a new version.
+    """
+
+    added: List[Dict[str, Any]] = field(default_factory=list)  # New rows to insert, embed and index
+    kept: List[Dict[str, Any]] = field(default_factory=list)  # New rows that reuse a stored chunk's id
+    removed_ids: List[uuid.UUID] = field(default_factory=list)  # Stored chunks absent from the new version
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"added": len(self.added), "kept": len(self.kept), "removed": len(self.removed_ids)}
+
+
+def load_chunk_hashes(db: Session, document_id: uuid.UUID) -> List[Tuple[uuid.UUID, Optional[str]]]:
+    """
+    Returns (id, content_hash) for every stored chunk of a document, in chunk order.
+    """
+    statement = select(Chunk.id, Chunk.content_hash).where(Chunk.document_id == document_id).order_by(Chunk.chunk_index)
+    return [(row.id, row.content_hash) for row in db.execute(statement)]
+
+
+def diff_chunk_rows(existing: Sequence[Tuple[uuid.UUID, Optional[str]]], rows: List[Dict[str, Any]]) -> ChunkDiff:
+    """
+    Matches the rows of a new version (from `build_chunk_rows`) against the stored
+    chunks by content hash. A matched row takes over the stored chunk's id, so its
+    embedding and Elasticsearch document stay valid; repeated texts are matched one
+    to one, in order. Stored chunks without a hash (written before hashing) never
+    match and are replaced.
+    """
+    available = defaultdict(list)
+    for chunk_id, chunk_hash in existing:
+        if chunk_hash:
+            available[chunk_hash].append(chunk_id)
+    for ids in available.values():
+        ids.reverse()  # pop() hands out the earliest chunk first
+
+    diff = ChunkDiff()
+    for row in rows:
+        ids = available.get(row["content_hash"])
+        if ids:
+            diff.kept.append({**row, "id": ids.pop()})
+        else:
+            diff.added.append(row)
+
+    kept_ids = {row["id"] for row in diff.kept}
+    diff.removed_ids = [chunk_id for chunk_id, _ in existing if chunk_id not in kept_ids]
+    return diff
+
+
+def delete_chunks(db: Session, chunk_ids: Sequence[Any], batch_size: int = 1000) -> int:
+    """
+    Deletes chunks by id in batches. Returns the number of ids sent. The caller commits.
+    """
+    for batch_start in range(0, len(chunk_ids), batch_size):
+        batch = [uuid.UUID(str(chunk_id)) for chunk_id in chunk_ids[batch_start : batch_start + batch_size]]
+        db.execute(delete(Chunk.__table__).where(Chunk.id.in_(batch)))
+    return len(chunk_ids)
+
+
+def apply_chunk_diff(db: Session, diff: ChunkDiff, method: str = "values", batch_size: int = 1000) -> List[uuid.UUID]:
+    """
+    Writes a `ChunkDiff` in bulk: re-numbers kept chunks (their position and page
+    metadata may have moved) and inserts added ones. Returns the ids of the added
+    chunks. The caller commits.
+
+    Removed chunks are left in place: they are still in Qdrant and Elasticsearch, so
+    search must be able to resolve them until the index task has deleted them there
+    and then calls `delete_chunks`.
+    """
+    if diff.kept:
+        statement = (
+            update(Chunk.__table__)
+            .where(Chunk.__table__.c.id == bindparam("kept_id"))
+            .values(chunk_index=bindparam("kept_index"), chunk_metadata=bindparam("kept_metadata"))
+        )
+        params = [
+            {"kept_id": row["id"], "kept_index": row["chunk_index"], "kept_metadata": row["chunk_metadata"]}
+            for row in diff.kept
+        ]
+        for batch_start in range(0, len(params), batch_size):
+            db.execute(statement, params[batch_start : batch_start + batch_size])
+
+    if not diff.added:
+        return []
+    return bulk_insert_chunks(db, diff.added, method=method, batch_size=batch_size)
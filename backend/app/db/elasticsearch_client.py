@@ -1,14 +1,36 @@
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from elasticsearch import Elasticsearch, helpers
+from elasticsearch import AsyncElasticsearch, Elasticsearch, helpers
+
+ELASTICSEARCH_URL = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
+ELASTICSEARCH_CONNECTIONS_PER_NODE = int(os.getenv("ELASTICSEARCH_CONNECTIONS_PER_NODE", "20"))
+
+# FIXED: Use singular form to match where data is actually indexed
+INDEX_NAME = "intelliagent_chunk"
+
+# English analysis and BM25 tuning shared by the sync and async clients
+INDEX_SETTINGS = {
+    "analysis": {"analyzer": {"default": {"type": "standard"}, "english_analyzer": {"type": "english"}}},
+    "similarity": {"bm25_tuned": {"type": "BM25", "k1": 1.2, "b": 0.75}},
+}
+INDEX_MAPPINGS = {
+    "properties": {
+        "text": {"type": "text", "analyzer": "english", "similarity": "bm25_tuned"},
+        "metadata": {"type": "object", "enabled": False},
+    }
+}
 
 
 class ElasticsearchClient:
-    def __init__(self):
-        # FIXED: Use singular form to match where data is actually indexed
-        self.index_name = "intelliagent_chunk"
-        self.client = Elasticsearch(os.getenv("ELASTICSEARCH_URL", "http://localhost:9200"))
+    """
+    Synchronous, pooled Elasticsearch client used by Celery workers and scripts.
+    Creating it does not touch the network; call `create_index_if_not_exists()` explicitly.
+    """
+
+    def __init__(self, url: str = ELASTICSEARCH_URL, connections_per_node: int = ELASTICSEARCH_CONNECTIONS_PER_NODE):
+        self.index_name = INDEX_NAME
+        self.client = Elasticsearch(url, connections_per_node=connections_per_node)
 
     def create_index_if_not_exists(self):
         """
@@ -18,19 +40,7 @@ class ElasticsearchClient:
         try:
             if not self.client.indices.exists(index=self.index_name):
                 print(f"Creating Elasticsearch index: '{self.index_name}'")
-                settings = {
-                    "analysis": {
-                        "analyzer": {"default": {"type": "standard"}, "english_analyzer": {"type": "english"}}
-                    },
-                    "similarity": {"bm25_tuned": {"type": "BM25", "k1": 1.2, "b": 0.75}},
-                }
-                mappings = {
-                    "properties": {
-                        "text": {"type": "text", "analyzer": "english", "similarity": "bm25_tuned"},
-                        "metadata": {"type": "object", "enabled": False},
-                    }
-                }
-                body = {"settings": settings, "mappings": mappings}
+                body = {"settings": INDEX_SETTINGS, "mappings": INDEX_MAPPINGS}
                 self.client.indices.create(index=self.index_name, body=body)
                 print(f"Index '{self.index_name}' created successfully.")
             else:
@@ -56,6 +66,40 @@ class ElasticsearchClient:
         except Exception as e:
             print(f"Elasticsearch bulk indexing error: {e}")
 
+    def bulk_delete_chunks(self, chunk_ids: List[str]) -> int:
+        """
+        Deletes chunk documents by id in one bulk request. Missing ids are ignored.
+        Returns the number of documents deleted.
+        """
+        actions = [{"_op_type": "delete", "_index": self.index_name, "_id": str(chunk_id)} for chunk_id in chunk_ids]
+        deleted, errors = helpers.bulk(self.client, actions, raise_on_error=False)
+        failed = [error for error in errors if error.get("delete", {}).get("status") != 404]
+        if failed:
+            raise RuntimeError(f"Elasticsearch bulk delete failed for {len(failed)} chunks: {failed[:3]}")
+        print(f"Bulk deleted {deleted} chunks from index '{self.index_name}'.")
+        return deleted
+
+    def bulk_update_metadata(self, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Replaces the `metadata` of already indexed chunks ({"chunk_id", "metadata"})
+        in one bulk request, without re-sending their text. Missing ids are ignored.
+        Returns the number of documents updated.
+        """
+        actions = [
+            {
+                "_op_type": "update",
+                "_index": self.index_name,
+                "_id": chunk["chunk_id"],
+                "doc": {"metadata": chunk["metadata"]},
+            }
+            for chunk in chunks
+        ]
+        updated, errors = helpers.bulk(self.client, actions, raise_on_error=False)
+        failed = [error for error in errors if error.get("update", {}).get("status") != 404]
+        if failed:
+            raise RuntimeError(f"Elasticsearch bulk update failed for {len(failed)} chunks: {failed[:3]}")
+        return updated
+
     def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
         """
         Performs a keyword search against the 'text' field.
@@ -69,6 +113,64 @@ class ElasticsearchClient:
             return []
 
 
-# Singleton instance
+class AsyncElasticsearchClient:
+    """
+    Native async Elasticsearch client for the API's retrieval path.
+
+    The underlying `AsyncElasticsearch` is opened and closed by the FastAPI lifespan
+    (`connect()` / `close()`); outside the app (scripts, evals) it is opened lazily
+    on first use.
+    """
+
+    def __init__(self, url: str = ELASTICSEARCH_URL, connections_per_node: int = ELASTICSEARCH_CONNECTIONS_PER_NODE):
+        self.url = url
+        self.connections_per_node = connections_per_node
+        self.index_name = INDEX_NAME
+        self._client: Optional[AsyncElasticsearch] = None
+
+    @property
+    def client(self) -> AsyncElasticsearch:
+        if self._client is None:
+            self.connect()
+        return self._client
+
+    def connect(self):
+        if self._client is None:
+            self._client = AsyncElasticsearch(self.url, connections_per_node=self.connections_per_node)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def create_index_if_not_exists(self):
+        """
+        Creates the Elasticsearch index if it does not exist.
+        """
+        try:
+            if not await self.client.indices.exists(index=self.index_name):
+                print(f"Creating Elasticsearch index: '{self.index_name}'")
+                await self.client.indices.create(
+                    index=self.index_name, settings=INDEX_SETTINGS, mappings=INDEX_MAPPINGS
+                )
+                print(f"Index '{self.index_name}' created successfully.")
+            else:
+                print(f"Index '{self.index_name}' already exists.")
+        except Exception as e:
+            print(f"Elasticsearch error while creating index '{self.index_name}': {e}")
+
+    async def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Performs a keyword search against the 'text' field.
+        """
+        try:
+            response = await self.client.search(index=self.index_name, query={"match": {"text": query}}, size=top_k)
+            return response["hits"]["hits"]
+        except Exception as e:
+            print(f"Elasticsearch search error: {e}")
+            return []
+
+
+# Singleton instances. Neither makes a network call at import time.
 es_client = ElasticsearchClient()
-es_client.create_index_if_not_exists()
+async_es_client = AsyncElasticsearchClient()
@@ -1,16 +1,85 @@
+import json
 import os
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, PointStruct, VectorParams
+import httpx
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.models import (
+    Batch,
+    Distance,
+    Filter,
+    HasIdCondition,
+    PointIdsList,
+    PointStruct,
+    SetPayload,
+    SetPayloadOperation,
+    VectorParams,
+)
+
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "20"))
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "30"))
+
+# Batched upserts (indexing path)
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+QDRANT_UPSERT_MAX_BATCH_BYTES = int(os.getenv("QDRANT_UPSERT_MAX_BATCH_BYTES", str(8 * 1024 * 1024)))
+QDRANT_UPSERT_PARALLEL = int(os.getenv("QDRANT_UPSERT_PARALLEL", "4"))
+QDRANT_UPSERT_WAIT = os.getenv("QDRANT_UPSERT_WAIT", "true").lower() == "true"
+QDRANT_VISIBILITY_TIMEOUT = float(os.getenv("QDRANT_VISIBILITY_TIMEOUT", "60"))
+QDRANT_UPSERT_MAX_RETRIES = int(os.getenv("QDRANT_UPSERT_MAX_RETRIES", "3"))
+QDRANT_UPSERT_RETRY_BACKOFF = float(os.getenv("QDRANT_UPSERT_RETRY_BACKOFF", "0.5"))
+
+COLLECTION_NAME = "intelliagent_vectors"
+# Using SentenceTransformer 'all-MiniLM-L6-v2' which has a dimension of 384
+VECTOR_SIZE = 384
+
+
+def _pool_limits(pool_size: int) -> httpx.Limits:
+    """
+    Keep-alive connection pool shared by all requests made through one client.
+    """
+    return httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+
+def plan_batches(
+    payloads: List[Dict[str, Any]], dim: int, batch_size: int, max_batch_bytes: int
+) -> List[Tuple[int, int]]:
+    """
+    Splits points into [start, end) ranges holding at most `batch_size` points and
+    roughly `max_batch_bytes` of JSON each. Payload size varies with chunk text, so
+    a count limit alone can still produce oversized requests.
+    """
+    vector_bytes = dim * 12  # ~12 JSON characters per float32
+    ranges = []
+    start = 0
+    size = 0
+    for index, payload in enumerate(payloads):
+        point_bytes = vector_bytes + len(json.dumps(payload, default=str))
+        if index > start and (index - start >= batch_size or size + point_bytes > max_batch_bytes):
+            ranges.append((start, index))
+            start = index
+            size = 0
+        size += point_bytes
+    if start < len(payloads):
+        ranges.append((start, len(payloads)))
+    return ranges
 
 
 class VectorDBClient:
-    def __init__(self):
-        self.client = QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"))
-        self.collection_name = "intelliagent_vectors"
-        # Using SentenceTransformer 'all-MiniLM-L6-v2' which has a dimension of 384
-        self.vector_size = 384
+    """
+    Synchronous, pooled Qdrant client used by Celery workers and scripts.
+    Creating it does not touch the network; call `initialize_collection()` explicitly.
+    """
+
+    def __init__(self, url: str = QDRANT_URL, pool_size: int = QDRANT_POOL_SIZE):
+        self.client = QdrantClient(
+            url=url, timeout=QDRANT_TIMEOUT, limits=_pool_limits(pool_size), check_compatibility=False
+        )
+        self.collection_name = COLLECTION_NAME
+        self.vector_size = VECTOR_SIZE
         self.distance_metric = Distance.COSINE
 
     def initialize_collection(self):
@@ -38,7 +107,218 @@ class VectorDBClient:
             wait=True,
         )
 
+    def upsert_vectors(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict[str, Any]],
+        batch_size: int = QDRANT_UPSERT_BATCH_SIZE,
+        max_batch_bytes: int = QDRANT_UPSERT_MAX_BATCH_BYTES,
+        parallel: int = QDRANT_UPSERT_PARALLEL,
+        wait: bool = QDRANT_UPSERT_WAIT,
+    ) -> Dict[str, Any]:
+        """
+        Upserts a (n, dim) embedding matrix in size-bounded, column-oriented `Batch` requests.
+
+        No `PointStruct` is built per chunk; only the rows of the slice being sent
+        are converted to JSON-serialisable lists, so the number of boxed floats
+        alive at once is bounded by the batch size instead of the whole document.
+
+        Up to `parallel` batches are in flight at once and each is retried with
+        exponential backoff. By default every batch waits until Qdrant has applied
+        it. With `wait=False` batches are only acknowledged, so the call then polls
+        an exact `count` of the sent ids until all of them are visible (or
+        `QDRANT_VISIBILITY_TIMEOUT` passes) before returning.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Batch count, points written, retries and total/slowest batch time.
+
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(ids) != len(vectors) or len(ids) != len(payloads):
+            raise ValueError(
+                f"ids ({len(ids)}), vectors ({len(vectors)}) and payloads ({len(payloads)}) must have the same length"
+            )
+
+        ranges = plan_batches(payloads, vectors.shape[1] if vectors.ndim == 2 else 0, batch_size, max_batch_bytes)
+        start = time.perf_counter()
+
+        def send(batch_index: int, bounds: Tuple[int, int]) -> Tuple[float, int]:
+            return self._upsert_batch(batch_index, len(ranges), ids, vectors, payloads, bounds, wait)
+
+        if parallel > 1 and len(ranges) > 1:
+            with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="qdrant-upsert") as pool:
+                results = list(pool.map(send, range(len(ranges)), ranges))
+        else:
+            results = [send(batch_index, bounds) for batch_index, bounds in enumerate(ranges)]
+
+        if not wait and ranges:
+            self._wait_until_visible(ids)
+
+        elapsed = time.perf_counter() - start
+        return {
+            "batches": len(ranges),
+            "points": len(ids),
+            "retries": sum(retries for _, retries in results),
+            "seconds": round(elapsed, 3),
+            "slowest_batch_seconds": round(max((seconds for seconds, _ in results), default=0.0), 3),
+        }
+
+    def delete_vectors(self, ids: List[str], batch_size: int = QDRANT_UPSERT_BATCH_SIZE) -> int:
+        """
+        Deletes points by id in batches, waiting for each batch to be applied.
+        Ids that are not in the collection are ignored. Returns the number of ids sent.
+        """
+        for start in range(0, len(ids), batch_size):
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=[str(point_id) for point_id in ids[start : start + batch_size]]),
+                wait=True,
+            )
+        print(f"Deleted {len(ids)} points from Qdrant collection '{self.collection_name}'")
+        return len(ids)
+
+    def set_payloads(
+        self, ids: List[str], payloads: List[Dict[str, Any]], batch_size: int = QDRANT_UPSERT_BATCH_SIZE
+    ) -> int:
+        """
+        Merges a per-point payload into existing points (vectors are untouched), one
+        `batch_update_points` request per batch, waiting for each to be applied.
+        Returns the number of points updated.
+        """
+        for start in range(0, len(ids), batch_size):
+            operations = [
+                SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[str(point_id)]))
+                for point_id, payload in zip(ids[start : start + batch_size], payloads[start : start + batch_size])
+            ]
+            self.client.batch_update_points(
+                collection_name=self.collection_name, update_operations=operations, wait=True
+            )
+        return len(ids)
+
+    def _wait_until_visible(self, ids: List[str], timeout: float = QDRANT_VISIBILITY_TIMEOUT, poll: float = 0.2):
+        """
+        Blocks until every id can be counted in the collection. Counts go through
+        the same read path as search, so this covers every shard the points landed on.
+        """
+        deadline = time.monotonic() + timeout
+        count_filter = Filter(must=[HasIdCondition(has_id=list(ids))])
+        while True:
+            visible = self.client.count(
+                collection_name=self.collection_name, count_filter=count_filter, exact=True
+            ).count
+            if visible >= len(ids):
+                return
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Only {visible}/{len(ids)} upserted points visible in Qdrant after {timeout}s")
+            time.sleep(poll)
+
+    def _upsert_batch(
+        self,
+        batch_index: int,
+        total_batches: int,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict[str, Any]],
+        bounds: Tuple[int, int],
+        wait: bool,
+        max_retries: int = QDRANT_UPSERT_MAX_RETRIES,
+        backoff: float = QDRANT_UPSERT_RETRY_BACKOFF,
+    ) -> Tuple[float, int]:
+        """
+        Sends one slice, retrying transient failures. Returns (seconds, retries).
+        """
+        start, end = bounds
+        batch = Batch(ids=ids[start:end], vectors=vectors[start:end].tolist(), payloads=payloads[start:end])
+
+        for attempt in range(max_retries + 1):
+            began = time.perf_counter()
+            try:
+                self.client.upsert(collection_name=self.collection_name, points=batch, wait=wait)
+            except Exception as e:
+                if attempt == max_retries:
+                    print(
+                        f"Qdrant upsert batch {batch_index + 1}/{total_batches} "
+                        f"failed after {attempt + 1} attempts: {e}"
+                    )
+                    raise
+                delay = backoff * (2**attempt)
+                print(f"Qdrant upsert batch {batch_index + 1}/{total_batches} failed ({e}); retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            elapsed = time.perf_counter() - began
+            print(
+                f"Qdrant upsert batch {batch_index + 1}/{total_batches}: {end - start} points "
+                f"in {elapsed * 1000:.1f} ms (wait={wait})"
+            )
+            return elapsed, attempt
+        return 0.0, max_retries
+
+
+class AsyncVectorDBClient:
+    """
+    Native async Qdrant client for the API's retrieval path.
+
+    The underlying `AsyncQdrantClient` is opened and closed by the FastAPI lifespan
+    (`connect()` / `close()`); outside the app (scripts, evals) it is opened lazily
+    on first use.
+    """
+
+    def __init__(self, url: str = QDRANT_URL, pool_size: int = QDRANT_POOL_SIZE):
+        self.url = url
+        self.pool_size = pool_size
+        self.collection_name = COLLECTION_NAME
+        self.vector_size = VECTOR_SIZE
+        self.distance_metric = Distance.COSINE
+        self._client: Optional[AsyncQdrantClient] = None
+
+    @property
+    def client(self) -> AsyncQdrantClient:
+        if self._client is None:
+            self.connect()
+        return self._client
+
+    def connect(self):
+        if self._client is None:
+            self._client = AsyncQdrantClient(
+                url=self.url, timeout=QDRANT_TIMEOUT, limits=_pool_limits(self.pool_size), check_compatibility=False
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def initialize_collection(self):
+        """
+        Creates the Qdrant collection if it doesn't already exist.
+        """
+        try:
+            await self.client.get_collection(collection_name=self.collection_name)
+            print(f"Collection '{self.collection_name}' already exists.")
+        except Exception:
+            print(f"Collection '{self.collection_name}' not found. Creating collection...")
+            await self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config=VectorParams(size=self.vector_size, distance=self.distance_metric),
+            )
+            print("Collection created successfully.")
+
+    async def search(self, query_vector: List[float], top_k: int = 50) -> List[Any]:
+        """
+        Returns the top_k nearest points to `query_vector`, with payloads.
+        """
+        return await self.client.search(
+            collection_name=self.collection_name,
+            query_vector=query_vector,
+            limit=top_k,
+            with_payload=True,
+        )
+
 
-# Initialize a singleton instance
+# Singleton instances. Neither makes a network call at import time.
 vector_db_client = VectorDBClient()
-vector_db_client.initialize_collection()
+async_vector_db_client = AsyncVectorDBClient()
@@ -1,13 +1,48 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.rate_limiter import rate_limit_middleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.api.v1.router import api_router
+from app.core.inference_executor import inference_executor
+from app.db.elasticsearch_client import async_es_client
+from app.db.vector_db import async_vector_db_client
+from app.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open pooled async search clients once per API process
+    async_vector_db_client.connect()
+    async_es_client.connect()
+    try:
+        await async_vector_db_client.initialize_collection()
+    except Exception as e:
+        print(f"Qdrant collection initialization failed: {e}")
+    await async_es_client.create_index_if_not_exists()
+
+    # Replay a query log into the query embedding cache so the first requests are hits
+    if settings.QUERY_CACHE_WARMUP_LOG:
+        from app.rag.embedder import embedder
+        from app.rag.retrieval.query_cache import query_embedding_cache
+
+        try:
+            query_embedding_cache.warm_from_log(settings.QUERY_CACHE_WARMUP_LOG, embedder.embed_texts)
+        except Exception as e:
+            print(f"Query cache warm-up failed: {e}")
+    yield
+
+    await async_vector_db_client.close()
+    await async_es_client.close()
+    inference_executor.shutdown()
+
 
 app = FastAPI(
     title="IntelliAgent API",
     version="0.1.0",
-    description="Backend services for the IntelliAgent platform."
+    description="Backend services for the IntelliAgent platform.",
+    lifespan=lifespan,
 )
 
 # CORS Configuration for frontend at localhost:3000
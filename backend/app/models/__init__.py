@@ -3,8 +3,10 @@ from .chunk import Chunk
 from .conversation import Conversation
 from .document import Document, DocumentStatus
 from .evaluation import EvaluationRun
+from .ingestion_batch import IngestionBatch, IngestionBatchStatus
 from .message import Message, MessageRole
 from .project import Project
+from .sync_source import SyncSource
 from .user import User, UserRole
 from .graph_checkpoint import GraphCheckpoint
 
@@ -13,8 +15,11 @@ __all__ = [
     "User",
     "UserRole",
     "Project",
+    "SyncSource",
     "Document",
     "DocumentStatus",
+    "IngestionBatch",
+    "IngestionBatchStatus",
     "Message",
     "MessageRole",
     "Chunk",
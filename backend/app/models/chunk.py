@@ -35,6 +35,7 @@ class Chunk(Base):
     text = Column(Text, nullable=False)
     vector_id = Column(String, unique=True)  # This can be a UUID or another string format from the vector DB
     chunk_metadata = Column(JSONB)  # Renamed from 'metadata' to avoid SQLAlchemy reserved word
+    content_hash = Column(String(64), index=True)  # sha256 of `text`; matches unchanged chunks across versions
     created_at = Column(DateTime, default=func.now())
 
     document = relationship("Document", back_populates="chunks")
@@ -29,8 +29,9 @@
 
 import enum
 import uuid
+from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, func
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
@@ -45,6 +46,10 @@ class DocumentStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -53,11 +58,19 @@ class Document(Base):
     filename = Column(String, nullable=False)
     mime_type = Column(String)
     size_bytes = Column(Integer)
-    sha256 = Column(String(64), unique=True, nullable=False)
+    sha256 = Column(String(64), unique=True, nullable=False)  # Hash of the current version
+    version = Column(Integer, default=1, server_default="1", nullable=False)
     status = Column(SQLAlchemyEnum(DocumentStatus), default=DocumentStatus.PENDING, nullable=False)
+    # Whether every stored chunk reached Elasticsearch and Qdrant; only then can a new version reuse them
+    chunks_indexed = Column(Boolean, default=False, server_default="false", nullable=False)
     doc_metadata = Column(JSONB)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("ingestion_batches.id"), nullable=True, index=True)
+    source_uri = Column(String, index=True)  # e.g. s3://bucket/key for documents ingested by a connector
+    source_etag = Column(String)  # Source object's ETag at the last ingestion; unchanged objects are skipped
     created_at = Column(DateTime, default=func.now())
+    # Last change to the row (UTC); a PROCESSING document that stops changing is considered stuck
+    updated_at = Column(DateTime, default=_utcnow, onupdate=_utcnow, server_default=func.now(), nullable=False)
 
     owner = relationship("User", back_populates="documents")
     project = relationship("Project", back_populates="documents")
@@ -0,0 +1,28 @@
+import enum
+import uuid
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+class IngestionBatchStatus(str, enum.Enum):
+    REGISTERING = "registering"  # Manifest files are still being hashed and registered
+    QUEUED = "queued"  # Documents exist and ingestion has been scheduled
+    FAILED = "failed"
+
+
+class IngestionBatch(Base):
+    __tablename__ = "ingestion_batches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    source = Column(String, nullable=False)  # "upload", "manifest" or "sync"
+    status = Column(SQLAlchemyEnum(IngestionBatchStatus), default=IngestionBatchStatus.REGISTERING, nullable=False)
+    total_documents = Column(Integer, default=0, nullable=False)  # New documents created by this batch
+    skipped_documents = Column(Integer, default=0, nullable=False)  # Files already ingested (same sha256)
+    error = Column(String)
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,23 @@
+import uuid
+
+from sqlalchemy import Column, DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.db.base_class import Base
+
+
+class SyncSource(Base):
+    __tablename__ = "sync_sources"
+    __table_args__ = (UniqueConstraint("project_id", "connector", "location", name="uq_sync_source_location"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    connector = Column(String, nullable=False)  # "file", "s3" or "drive"
+    location = Column(String, nullable=False)  # Directory, s3://bucket/prefix or Drive folder id
+    cursor = Column(JSONB, nullable=False, default=dict)  # Connector watermark / change token after the last sync
+    last_synced_at = Column(DateTime)
+    last_stats = Column(JSONB)
+    last_batch_id = Column(UUID(as_uuid=True), ForeignKey("ingestion_batches.id"))
+    error = Column(String)
+    created_at = Column(DateTime, default=func.now())
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
@@ -13,12 +13,16 @@ class Chunker:
             separators=["\n\n", "\n", " ", ""],
         )
 
-    def chunk_text(self, text: str, page_number: int) -> List[Dict[str, Any]]:
+    def chunk_text(self, text: str, page_number: int, extraction: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Chunks a single string of text.
+        Chunks a single string of text. `extraction` records how the page text was obtained
+        ("text_layer" or "ocr") when known.
         """
         chunks = self.text_splitter.split_text(text)
-        return [{"text": chunk, "metadata": {"page": page_number, "source": "text"}} for chunk in chunks]
+        metadata = {"page": page_number, "source": "text"}
+        if extraction:
+            metadata["extraction"] = extraction
+        return [{"text": chunk, "metadata": dict(metadata)} for chunk in chunks]
 
     def chunk_pages_and_tables(self, page_texts: List[Dict], tables: List[Dict]) -> List[Dict[str, Any]]:
         """
@@ -29,16 +33,25 @@ class Chunker:
         for page in page_texts:
             page_num = page["page_number"]
             page_content = page["text"]
-            all_chunks.extend(self.chunk_text(page_content, page_num))
+            all_chunks.extend(self.chunk_text(page_content, page_num, page.get("method")))
 
         # Add each extracted table as a separate chunk
-        for table in tables:
-            table_str = "\n".join(["\t".join(map(str, row)) for row in table["table_data"]])
-            all_chunks.append(
-                {"text": f"Table:\n{table_str}", "metadata": {"page": table["page_number"], "source": "table"}}
-            )
+        all_chunks.extend(self.table_chunks(tables))
         return all_chunks
 
+    @staticmethod
+    def table_chunks(tables: List[Dict]) -> List[Dict[str, Any]]:
+        """
+        Turns each extracted table into one tab-separated chunk.
+        """
+        return [
+            {
+                "text": "Table:\n" + "\n".join(["\t".join(map(str, row)) for row in table["table_data"]]),
+                "metadata": {"page": table["page_number"], "source": "table"},
+            }
+            for table in tables
+        ]
+
 
 # Initialize a singleton instance
 chunker = Chunker()
@@ -23,35 +23,210 @@
 # ----------------- Using GPU -------------------
 
 # backend/app/rag/embedder.py
-from typing import List
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer
 
+from app.rag.embedding_cache import EmbeddingCache, create_embedding_cache
+from app.rag.inference_backends import load_sentence_transformer
+from app.settings import settings
+
+# Using SentenceTransformer 'all-MiniLM-L6-v2' which has a dimension of 384
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def quantize_vectors(vectors: np.ndarray, dtype: str = "float32") -> np.ndarray:
+    """
+    Converts float32 embeddings to a compact storage dtype without leaving numpy.
+    """
+    if dtype == "float32":
+        return vectors
+    if dtype == "float16":
+        return vectors.astype(np.float16)
+    if dtype == "int8":
+        return np.clip(np.rint(vectors * 127.0), -127, 127).astype(np.int8)
+    raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
 
 class Embedder:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    """
+    Long-lived embedding service.
+
+    The SentenceTransformer weights are loaded lazily on first use (or eagerly via
+    `warmup()`) and then reused for every call made by this process. Time spent
+    loading the model and time spent encoding are tracked separately so workers
+    can report where indexing time actually goes.
+
+    When an `EmbeddingCache` is attached, only texts that are not already cached
+    are sent to the model.
+
+    `backend` selects the inference runtime ("torch", "torch-int8" or "onnx", see
+    `app.rag.inference_backends`); quantized and ONNX backends always run on CPU.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        cache: Optional[EmbeddingCache] = None,
+        backend: str = "torch",
+        model_path: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.cache = cache
+        self.backend = backend
+        self.model_path = model_path
         # Automatically detect and use GPU if available
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"🔥 Embedder using device: {self.device}")
+        self.device = "cuda" if backend == "torch" and torch.cuda.is_available() else "cpu"
+
+        self._model = None
+        self._load_lock = threading.Lock()
+        # HF fast tokenizers are not safe to call from several threads at once
+        # ("Already borrowed"); torch parallelises each encode internally anyway.
+        self._encode_lock = threading.Lock()
+
+        # Metrics
+        self.load_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.encode_calls = 0
+        self.encoded_texts = 0
+
+    @property
+    def model(self) -> SentenceTransformer:
+        """
+        Returns the underlying model, loading it once per process.
+        """
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    print(f"🔥 Embedder loading '{self.model_name}' ({self.backend}) on device: {self.device}")
+                    self._model = load_sentence_transformer(
+                        self.model_name,
+                        backend=self.backend,
+                        model_path=self.model_path,
+                        device=self.device,
+                        onnx_file_name=settings.EMBEDDER_ONNX_FILE_NAME or None,
+                    )
+                    self.load_seconds += time.perf_counter() - start
+                    print(f"Embedder model loaded in {self.load_seconds:.2f}s")
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def warmup(self):
+        """
+        Loads the model and runs a tiny encode so the first real request
+        does not pay for lazy initialisation (CUDA context, kernels, etc.).
+        """
+        start = time.perf_counter()
+        self.model.encode(["warmup"], show_progress_bar=False)
+        print(f"Embedder warm-up finished in {time.perf_counter() - start:.2f}s")
 
-        # Load model on GPU if available
-        self.model = SentenceTransformer(model_name, device=self.device)
+    def token_offsets(self, texts: List[str]) -> List[List[Tuple[int, int]]]:
+        """
+        Tokenizes `texts` in one batched call with the model's own tokenizer and returns
+        the (start, end) character offsets of every token (no special tokens).
+        """
+        with self._encode_lock:
+            encoded = self.model.tokenizer(
+                texts, add_special_tokens=False, return_offsets_mapping=True, return_attention_mask=False, verbose=False
+            )
+        return encoded["offset_mapping"]
+
+    def embed_texts(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Generates embeddings for a list of texts as plain Python lists.
+        Prefer `embed_array` on bulk paths; this exists for small callers (e.g. a single query).
+        """
+        return self.embed_array(texts, batch_size).tolist()
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_array(self, texts: List[str], batch_size: Optional[int] = None, dtype: str = "float32") -> np.ndarray:
         """
-        Generates embeddings for a list of texts.
+        Generates embeddings as one contiguous (len(texts), dim) numpy array.
         Uses GPU automatically if available.
+
+        `dtype` may be "float32" (default), "float16", or "int8". The int8 form is a
+        symmetric scalar quantization (x * 127) of the normalized vectors.
+        """
+        if self.cache is None:
+            vectors = self._encode(texts, batch_size)
+        else:
+            vectors = self._embed_with_cache(texts, batch_size)
+        return quantize_vectors(vectors, dtype)
+
+    def _embed_with_cache(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        cached = self.cache.get_many(texts)
+
+        # Encode each distinct missing text once, even if it repeats within this call
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if missing:
+            fresh = self._encode(missing, batch_size)
+            self.cache.put_many(missing, fresh)
+            fresh_rows = {text: row for row, text in enumerate(missing)}
+            dim = fresh.shape[1]
+        else:
+            dim = len(cached[0]) if cached else 0
+
+        vectors = np.empty((len(texts), dim), dtype=np.float32)
+        for i, (text, vector) in enumerate(zip(texts, cached)):
+            vectors[i] = vector if vector is not None else fresh[fresh_rows[text]]
+        return vectors
+
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Runs the model over `texts` and returns a (len(texts), dim) float32 array.
+        """
+        model = self.model
+        encode_kwargs = {"batch_size": batch_size} if batch_size else {}
+
+        start = time.perf_counter()
+        with self._encode_lock:
+            # Batches are still encoded on the GPU when available; each batch is copied
+            # straight into one numpy array instead of going through Python lists
+            vectors = model.encode(
+                texts,
+                convert_to_numpy=True,
+                show_progress_bar=True,
+                **encode_kwargs,
+            )
+
+        self.encode_seconds += time.perf_counter() - start
+        self.encode_calls += 1
+        self.encoded_texts += len(texts)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns cumulative load vs. encode timings for this process.
         """
-        # convert_to_tensor=True uses GPU acceleration
-        embeddings = self.model.encode(
-            texts,
-            convert_to_tensor=True,  # ← Enables GPU tensors
-            show_progress_bar=True,
-        )
-        # Convert back to CPU numpy for storage
-        return embeddings.cpu().numpy().tolist()
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "device": self.device,
+            "loaded": self.is_loaded,
+            "load_seconds": round(self.load_seconds, 4),
+            "encode_seconds": round(self.encode_seconds, 4),
+            "encode_calls": self.encode_calls,
+            "encoded_texts": self.encoded_texts,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+        }
 
 
-# Initialize a singleton instance
-embedder = Embedder()
+# Initialize a singleton instance. The model itself is loaded on first use,
+# or at Celery worker start via `workers.celery_app.warm_up_embedder`.
+embedder = Embedder(
+    cache=create_embedding_cache(
+        DEFAULT_MODEL_NAME,
+        backend=settings.EMBEDDER_BACKEND,
+        model_path=settings.EMBEDDER_MODEL_PATH or None,
+        onnx_file_name=settings.EMBEDDER_ONNX_FILE_NAME or None,
+    ),
+    backend=settings.EMBEDDER_BACKEND,
+    model_path=settings.EMBEDDER_MODEL_PATH or None,
+)
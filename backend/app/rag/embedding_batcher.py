@@ -0,0 +1,161 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.rag.embedder import Embedder, embedder
+from app.settings import settings
+
+
+class _EmbeddingRequest:
+    """
+    A single caller's texts waiting to be embedded, plus the future its vectors are delivered on.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class EmbeddingBatcher:
+    """
+    Collects chunk texts from many in-flight documents into shared batches.
+
+    Callers block in `embed()` while a background thread drains the request queue.
+    Texts are queued in requests of at most `max_batch_size`, and a batch is flushed
+    as soon as the next request would not fit or when the oldest request has waited
+    `max_wait_ms`, whichever comes first, so no batch exceeds `max_batch_size`. Each
+    flush is one `Embedder.embed_array` call (a single `model.encode`), and each
+    caller receives its rows in submission order.
+
+    Cross-document batching only helps when several indexing tasks run in the same
+    process (e.g. `celery worker --pool=threads`). Under the solo and prefork pools a
+    process runs one task at a time, so the worker sets `direct` and `embed()` calls
+    the embedder straight away instead of waiting `max_wait_ms` for nobody.
+    """
+
+    def __init__(self, embedder: Embedder, max_batch_size: int = 64, max_wait_ms: int = 50):
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.direct = False
+
+        self._queue: "queue.Queue[_EmbeddingRequest]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._carry: Optional[_EmbeddingRequest] = None  # Did not fit the previous batch
+
+        # Metrics
+        self.batches = 0
+        self.batched_texts = 0
+        self.batched_requests = 0
+        self.encode_seconds = 0.0
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Embeds `texts` as part of a shared batch and returns a (len(texts), dim) float32 array.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        if self.direct:
+            start = time.perf_counter()
+            vectors = self.embedder.embed_array(texts, batch_size=self.max_batch_size)
+            self._record(len(texts), 1, time.perf_counter() - start)
+            return vectors
+
+        self._ensure_started()
+        requests = [
+            _EmbeddingRequest(texts[start : start + self.max_batch_size])
+            for start in range(0, len(texts), self.max_batch_size)
+        ]
+        for request in requests:
+            self._queue.put(request)
+        if len(requests) == 1:
+            return requests[0].future.result(timeout=timeout)
+        return np.concatenate([request.future.result(timeout=timeout) for request in requests])
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self) -> List[_EmbeddingRequest]:
+        """
+        Blocks for the first request, then keeps collecting until the next request would
+        overflow the batch (it then opens the next batch) or the deadline passes.
+        """
+        first, self._carry = self._carry or self._queue.get(), None
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(request.texts) > self.max_batch_size:
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [text for request in batch for text in request.texts]
+
+            try:
+                start = time.perf_counter()
+                vectors = self.embedder.embed_array(texts, batch_size=self.max_batch_size)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                print(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            self._record(len(texts), len(batch), elapsed)
+            print(f"Embedded batch: {len(texts)} texts from {len(batch)} documents in {elapsed * 1000:.1f} ms")
+
+            offset = 0
+            for request in batch:
+                request.future.set_result(vectors[offset : offset + len(request.texts)])
+                offset += len(request.texts)
+
+    def _record(self, texts: int, requests: int, seconds: float):
+        self.batches += 1
+        self.batched_texts += texts
+        self.batched_requests += requests
+        self.encode_seconds += seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns batching counters and the observed encode throughput.
+        """
+        return {
+            "batches": self.batches,
+            "batched_texts": self.batched_texts,
+            "batched_requests": self.batched_requests,
+            "avg_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else 0.0,
+            "chunks_per_second": round(self.batched_texts / self.encode_seconds, 2) if self.encode_seconds else 0.0,
+        }
+
+
+# Singleton instance shared by all indexing tasks in a worker process
+embedding_batcher = EmbeddingBatcher(
+    embedder,
+    max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+    max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+)
@@ -0,0 +1,159 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import redis
+
+from app.settings import settings
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (model name, hash of the normalized text).
+
+    - Local tier: an in-process LRU of float32 vectors.
+    - Shared tier: Redis, holding compact float16/float32 bytes so every API pod
+      and Celery worker can reuse vectors encoded by any other process.
+
+    Redis errors are logged and treated as misses; the cache never fails an embed call.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        local_max_entries: int = 50_000,
+        redis_client: Optional[redis.Redis] = None,
+        redis_ttl: int = 7 * 24 * 3600,
+        storage_dtype: str = "float16",
+    ):
+        self.model_name = model_name
+        self.local_max_entries = local_max_entries
+        self.redis_client = redis_client
+        self.redis_ttl = redis_ttl
+        self.storage_dtype = np.dtype(storage_dtype)
+
+        self._local: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Collapses whitespace so trivially different copies of the same chunk share an entry.
+        """
+        return " ".join(text.split())
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"emb:{self.model_name}:{digest}"
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Looks up each text, local tier first, then Redis for the remaining misses.
+        Returns a list aligned with `texts` holding a float32 vector or None.
+        """
+        keys = [self.key(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._local.get(key)
+                if vector is not None:
+                    self._local.move_to_end(key)
+                    results[i] = vector
+                    self.local_hits += 1
+
+        remaining = [i for i, vector in enumerate(results) if vector is None]
+        if remaining and self.redis_client is not None:
+            try:
+                payloads = self.redis_client.mget([keys[i] for i in remaining])
+            except Exception as e:
+                print(f"Embedding cache Redis lookup failed: {e}")
+                payloads = [None] * len(remaining)
+
+            for i, payload in zip(remaining, payloads):
+                if payload is None:
+                    continue
+                vector = np.frombuffer(payload, dtype=self.storage_dtype).astype(np.float32)
+                results[i] = vector
+                self.redis_hits += 1
+                self._put_local(keys[i], vector)
+
+        self.misses += sum(1 for vector in results if vector is None)
+        return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        Stores freshly encoded vectors in both tiers.
+        """
+        keys = [self.key(text) for text in texts]
+        for key, vector in zip(keys, vectors):
+            self._put_local(key, np.asarray(vector, dtype=np.float32))
+
+        if self.redis_client is None:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, vector in zip(keys, vectors):
+                pipe.set(key, np.asarray(vector, dtype=self.storage_dtype).tobytes(), ex=self.redis_ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Embedding cache Redis write failed: {e}")
+
+    def _put_local(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._local[key] = vector
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss counters for both tiers.
+        """
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def cache_namespace(
+    model_name: str, backend: str = "torch", model_path: Optional[str] = None, onnx_file_name: Optional[str] = None
+) -> str:
+    """
+    Cache namespace for one embedding model build. Torch, int8-quantized and ONNX
+    builds of the same model produce slightly different vectors, so each gets its
+    own keys; a local model path or ONNX file is folded in as a short hash.
+    """
+    namespace = f"{model_name}:{backend}"
+    if model_path or onnx_file_name:
+        build = hashlib.sha256(f"{model_path or ''}|{onnx_file_name or ''}".encode("utf-8")).hexdigest()[:12]
+        namespace += f":{build}"
+    return namespace
+
+
+def create_embedding_cache(
+    model_name: str, backend: str = "torch", model_path: Optional[str] = None, onnx_file_name: Optional[str] = None
+) -> Optional[EmbeddingCache]:
+    """
+    Builds the embedding cache from application settings, or returns None when disabled.
+    """
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    return EmbeddingCache(
+        model_name=cache_namespace(model_name, backend, model_path, onnx_file_name),
+        local_max_entries=settings.EMBEDDING_CACHE_LOCAL_SIZE,
+        redis_client=redis.from_url(settings.REDIS_URL),
+        redis_ttl=settings.EMBEDDING_CACHE_REDIS_TTL,
+        storage_dtype=settings.EMBEDDING_CACHE_DTYPE,
+    )
@@ -20,6 +20,24 @@ class KeywordIndexer:
         es_client.bulk_index_chunks(chunks)
         print("Bulk indexing to Elasticsearch complete.")
 
+    def delete_chunks(self, chunk_ids: List[str]):
+        """
+        Removes chunks from the Elasticsearch index by chunk id.
+        """
+        if not chunk_ids:
+            return
+
+        es_client.bulk_delete_chunks(chunk_ids)
+
+    def update_chunk_metadata(self, chunks: List[Dict[str, Any]]):
+        """
+        Replaces the metadata of indexed chunks ({"chunk_id", "metadata"}), keeping their text.
+        """
+        if not chunks:
+            return
+
+        es_client.bulk_update_metadata(chunks)
+
 
 # Singleton instance
 keyword_indexer = KeywordIndexer()
@@ -0,0 +1,186 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List
+
+import numpy as np
+
+# Chunk record: {"chunk_id", "chunk_index", "text", "metadata"}
+ChunkBatch = List[Dict[str, Any]]
+
+
+class StreamingIndexer:
+    """
+    Indexes a document's chunks batch by batch instead of loading them all first.
+
+    For every batch from the source, the Elasticsearch bulk index is submitted to
+    its own sink thread, the batch is embedded on the calling thread, and the Qdrant
+    upsert is submitted to the Qdrant sink. The next batch is then fetched and
+    embedded while the previous batch's writes are still running, so fetching,
+    embedding and both index writes overlap. The Elasticsearch sink has a single
+    thread, so its writes arrive in batch order; the Qdrant sink has `upsert_workers`
+    threads, so that many batch upserts (whose point ids never collide) can run at
+    once. A batch that fits one Qdrant request is otherwise sent alone.
+
+    At most `max_inflight_batches` batches may have unfinished writes; the indexer
+    waits for the oldest before starting another, which bounds memory to roughly
+    `max_inflight_batches + 1` batches whatever the document size. Concurrent
+    upserts are therefore also limited to `max_inflight_batches`.
+    """
+
+    def __init__(
+        self,
+        keyword_indexer,
+        embed: Callable[[List[str]], np.ndarray],
+        vector_client,
+        max_inflight_batches: int = 2,
+        upsert_workers: int = 1,
+    ):
+        if max_inflight_batches < 1:
+            raise ValueError("max_inflight_batches must be at least 1")
+        if upsert_workers < 1:
+            raise ValueError("upsert_workers must be at least 1")
+        self.keyword_indexer = keyword_indexer
+        self.embed = embed
+        self.vector_client = vector_client
+        self.max_inflight_batches = max_inflight_batches
+        self.upsert_workers = upsert_workers
+
+    def index(self, document_id: str, batches: Iterable[ChunkBatch]) -> Dict[str, Any]:
+        """
+        Streams `batches` into Elasticsearch and Qdrant.
+
+        Args:
+        ----
+            document_id: The document the chunks belong to.
+            batches: Iterable of chunk record batches, e.g. `iter_chunk_batches`.
+
+        Returns:
+        -------
+            Pipeline stats. Sink seconds add up to more than `wall_seconds` when the
+            stages overlap.
+
+        """
+        stats = {
+            "batches": 0,
+            "chunks": 0,
+            "fetch_seconds": 0.0,
+            "es_seconds": 0.0,
+            "embed_seconds": 0.0,
+            "upsert_seconds": 0.0,
+            "upsert_retries": 0,
+            "max_inflight": 0,
+        }
+        start = time.perf_counter()
+        inflight = deque()
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-es") as es_pool, ThreadPoolExecutor(
+            max_workers=self.upsert_workers, thread_name_prefix="index-qdrant"
+        ) as qdrant_pool:
+            try:
+                iterator = iter(batches)
+                while True:
+                    fetch_start = time.perf_counter()
+                    batch = next(iterator, None)
+                    stats["fetch_seconds"] += time.perf_counter() - fetch_start
+                    if batch is None:
+                        break
+                    if not batch:
+                        continue
+
+                    while len(inflight) >= self.max_inflight_batches:
+                        self._finish(inflight.popleft(), stats)
+
+                    es_future = es_pool.submit(
+                        _timed, self.keyword_indexer.index_chunks, _es_documents(document_id, batch)
+                    )
+
+                    embed_start = time.perf_counter()
+                    embeddings = self.embed([chunk["text"] for chunk in batch])
+                    stats["embed_seconds"] += time.perf_counter() - embed_start
+
+                    ids = [chunk["chunk_id"] for chunk in batch]  # Use chunk ID as point ID
+                    upsert_future = qdrant_pool.submit(
+                        _timed, self.vector_client.upsert_vectors, ids, embeddings, _qdrant_payloads(document_id, batch)
+                    )
+
+                    inflight.append((es_future, upsert_future))
+                    stats["max_inflight"] = max(stats["max_inflight"], len(inflight))
+                    stats["batches"] += 1
+                    stats["chunks"] += len(batch)
+
+                while inflight:
+                    self._finish(inflight.popleft(), stats)
+            except BaseException:
+                # Drop queued writes; the ones already running finish when the pools shut down
+                for futures in inflight:
+                    for future in futures:
+                        future.cancel()
+                raise
+
+        stats["wall_seconds"] = time.perf_counter() - start
+        for key in ("fetch_seconds", "es_seconds", "embed_seconds", "upsert_seconds", "wall_seconds"):
+            stats[key] = round(stats[key], 3)
+        return stats
+
+    def reposition(self, document_id: str, batches: Iterable[ChunkBatch]) -> int:
+        """
+        Pushes the current `chunk_index` and metadata of already indexed chunks to
+        Elasticsearch and Qdrant. A new document version can move unchanged chunks
+        to another position or page; their text and vectors stay valid, so nothing
+        is re-embedded. Returns the number of chunks updated.
+        """
+        count = 0
+        for batch in batches:
+            es_documents = _es_documents(document_id, batch)
+            self.keyword_indexer.update_chunk_metadata(
+                [{"chunk_id": doc["chunk_id"], "metadata": doc["metadata"]} for doc in es_documents]
+            )
+            self.vector_client.set_payloads(
+                [chunk["chunk_id"] for chunk in batch],
+                [{"chunk_index": chunk["chunk_index"], "metadata": chunk["metadata"]} for chunk in batch],
+            )
+            count += len(batch)
+        return count
+
+    @staticmethod
+    def _finish(futures, stats: Dict[str, Any]):
+        es_future, upsert_future = futures
+        _, es_seconds = es_future.result()
+        upsert_stats, upsert_seconds = upsert_future.result()
+        stats["es_seconds"] += es_seconds
+        stats["upsert_seconds"] += upsert_seconds
+        if isinstance(upsert_stats, dict):
+            stats["upsert_retries"] += upsert_stats.get("retries", 0)
+
+
+def _timed(fn: Callable, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _es_documents(document_id: str, batch: ChunkBatch) -> List[Dict[str, Any]]:
+    return [
+        {
+            "chunk_id": chunk["chunk_id"],
+            "text": chunk["text"],
+            "metadata": {
+                "document_id": str(document_id),
+                "chunk_index": chunk["chunk_index"],
+            },
+        }
+        for chunk in batch
+    ]
+
+
+def _qdrant_payloads(document_id: str, batch: ChunkBatch) -> List[Dict[str, Any]]:
+    return [
+        {
+            "document_id": str(document_id),
+            "text": chunk["text"],
+            "chunk_index": chunk["chunk_index"],
+            "metadata": chunk["metadata"],
+        }
+        for chunk in batch
+    ]
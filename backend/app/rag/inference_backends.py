@@ -0,0 +1,112 @@
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+from sentence_transformers.cross_encoder import CrossEncoder
+
+# "torch"      - full-precision PyTorch weights (default)
+# "torch-int8" - PyTorch weights with nn.Linear layers dynamically quantized to int8 (CPU only)
+# "onnx"       - ONNX Runtime, from an ONNX-exported model directory (requires `sentence-transformers[onnx]`)
+SUPPORTED_BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def _check_backend(backend: str):
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unsupported inference backend: {backend}. Expected one of {SUPPORTED_BACKENDS}")
+
+
+def _onnx_model_kwargs(onnx_file_name: Optional[str]) -> Optional[Dict[str, Any]]:
+    # e.g. "onnx/model_qint8_avx512_vnni.onnx" for a dynamically quantized export
+    return {"file_name": onnx_file_name} if onnx_file_name else None
+
+
+def _quantize_int8(module: torch.nn.Module) -> torch.nn.Module:
+    return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_sentence_transformer(
+    model_name: str,
+    backend: str = "torch",
+    model_path: Optional[str] = None,
+    device: str = "cpu",
+    onnx_file_name: Optional[str] = None,
+) -> SentenceTransformer:
+    """
+    Loads a bi-encoder for the given backend. `model_path` points at a local
+    (exported) model directory and takes precedence over `model_name`.
+    """
+    _check_backend(backend)
+    source = model_path or model_name
+
+    if backend == "onnx":
+        return SentenceTransformer(
+            source, device="cpu", backend="onnx", model_kwargs=_onnx_model_kwargs(onnx_file_name)
+        )
+
+    if backend == "torch-int8":
+        model = SentenceTransformer(source, device="cpu")
+        model.eval()
+        return _quantize_int8(model)
+
+    return SentenceTransformer(source, device=device)
+
+
+def load_cross_encoder(
+    model_name: str,
+    backend: str = "torch",
+    model_path: Optional[str] = None,
+    onnx_file_name: Optional[str] = None,
+) -> CrossEncoder:
+    """
+    Loads a cross-encoder for the given backend (see `load_sentence_transformer`).
+    """
+    _check_backend(backend)
+    source = model_path or model_name
+
+    if backend == "onnx":
+        return CrossEncoder(source, device="cpu", backend="onnx", model_kwargs=_onnx_model_kwargs(onnx_file_name))
+
+    if backend == "torch-int8":
+        model = CrossEncoder(source, device="cpu")
+        model.model = _quantize_int8(model.model.eval())
+        return model
+
+    return CrossEncoder(source)
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Row-wise cosine distance between two embedding matrices of the same texts.
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    drift = 1.0 - np.sum(reference * candidate, axis=1)
+    return {"mean_cosine_drift": float(drift.mean()), "max_cosine_drift": float(drift.max())}
+
+
+def rank_agreement(
+    reference_scores: Sequence[Sequence[float]],
+    candidate_scores: Sequence[Sequence[float]],
+    top_k: int = 10,
+) -> Dict[str, float]:
+    """
+    Compares two rankings per query (one score list per query, e.g. reranker
+    scores over the same candidate chunks): top-1 agreement and mean top-k overlap.
+    """
+    top1_matches = 0
+    overlaps = []
+    for reference, candidate in zip(reference_scores, candidate_scores):
+        reference_order = np.argsort(-np.asarray(reference))
+        candidate_order = np.argsort(-np.asarray(candidate))
+        top1_matches += int(reference_order[0] == candidate_order[0])
+        k = min(top_k, len(reference_order))
+        overlaps.append(len(set(reference_order[:k]) & set(candidate_order[:k])) / k)
+
+    queries = len(overlaps)
+    return {
+        "top1_agreement": top1_matches / queries if queries else 0.0,
+        "mean_topk_overlap": float(np.mean(overlaps)) if queries else 0.0,
+    }
@@ -1,16 +1,90 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .upload_store import UploadStore, upload_store
+
+
+@dataclass
+class SourceItem:
+    """
+    One document in a source, as listed by a connector. Its content has not been
+    read yet; `BaseConnector.save()` streams it into the upload store.
+    """
+
+    uri: str  # Stable identity across syncs, e.g. s3://bucket/key or file:///imports/a.pdf
+    version: str  # Changes whenever the content may have changed (ETag, md5, mtime + size)
+    filename: str
+    size_bytes: Optional[int] = None
+    mime_type: Optional[str] = None
+    changed_at: Optional[float] = None  # Epoch seconds; what watermarks are built from
+    ref: Any = None  # Connector-specific handle (path, S3 key, Drive file id)
 
 
 class BaseConnector(ABC):
     """
     Abstract base class for data source connectors.
+
+    Connectors are async iterators over a source: `iter_changes()` yields one
+    `SourceItem` at a time, and `open_stream()` / `save()` read an item's content
+    as a byte stream, so no connector ever materializes a whole source or a whole
+    file in memory. `SyncEngine` drives them and keeps a cursor per source.
     """
 
+    name = "base"
+
     @abstractmethod
+    def iter_changes(self, source: Dict[str, Any], cursor: Dict[str, Any]) -> AsyncIterator[SourceItem]:
+        """
+        Yields the items of `source` that may be new or changed since `cursor`.
+
+        `cursor` is the state saved after the previous successful sync (empty on
+        the first one). Connectors read their watermark or change token from it and
+        update it in place while iterating; it is only persisted once the whole
+        sync has succeeded.
+        """
+
+    @abstractmethod
+    def open_stream(self, item: SourceItem) -> AsyncIterator[bytes]:
+        """
+        Returns the item's content as an async iterator of byte chunks.
+        """
+
+    @abstractmethod
+    def parse_location(self, location: str) -> Dict[str, Any]:
+        """
+        Turns a user-facing source location (directory, s3:// URI, Drive folder id)
+        into the `source` dict this connector iterates.
+        """
+
+    async def save(self, item: SourceItem, store: Optional[UploadStore] = None) -> Dict[str, Any]:
+        """
+        Streams an item into the content-addressed upload store and returns
+        {"sha256", "size_bytes", "path"}. Connectors with a faster transfer path
+        (e.g. ranged downloads) override this.
+        """
+        return await (store or upload_store).save_stream(self.open_stream(item))
+
     async def fetch(self, source: Any) -> List[Dict[str, Any]]:
         """
-        Fetch data from the source and return it as a list of documents.
-        Each document is a dictionary with 'content' and 'metadata'.
+        Stores every item of the source and returns one {'metadata'} document per
+        item; the content is read from `metadata["storage_path"]`. Prefer
+        `SyncEngine` for large sources.
         """
-        pass
+        documents = []
+        async for item in self.iter_changes(source, {}):
+            stored = await self.save(item)
+            documents.append(
+                {
+                    "metadata": {
+                        "source_uri": item.uri,
+                        "version": item.version,
+                        "filename": item.filename,
+                        "mime_type": item.mime_type,
+                        "size_bytes": stored["size_bytes"],
+                        "sha256": stored["sha256"],
+                        "storage_path": stored["path"],
+                    }
+                }
+            )
+        return documents
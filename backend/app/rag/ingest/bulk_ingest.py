@@ -0,0 +1,138 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.models.document import Document, DocumentStatus
+from app.rag.ingest.upload_store import UploadStore
+
+HASH_READ_SIZE = 1024 * 1024
+
+# Statuses after which a document needs no more work
+TERMINAL_STATUSES = (DocumentStatus.INDEXED, DocumentStatus.FAILED)
+
+
+def ingestion_finished(status: DocumentStatus, updated_at: Optional[datetime], stale_after: float) -> bool:
+    """
+    Whether a document's ingestion is over: its status is terminal, or it has been
+    PROCESSING without any change to its row for `stale_after` seconds, which means
+    the task chain died without marking it FAILED. `updated_at` is naive UTC.
+    """
+    if status in TERMINAL_STATUSES:
+        return True
+    if status != DocumentStatus.PROCESSING or updated_at is None:
+        return False
+    age = datetime.now(timezone.utc).replace(tzinfo=None) - updated_at
+    return age.total_seconds() >= stale_after
+
+
+def hash_file(path: str, read_size: int = HASH_READ_SIZE) -> str:
+    """
+    sha256 of a file, read in fixed-size blocks so memory does not grow with the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(read_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def resolve_manifest_path(root: str, path: str) -> str:
+    """
+    Resolves a manifest entry relative to the import root, rejecting anything
+    (absolute paths, `..`, symlinks) that would escape it.
+    """
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path.lstrip("/")))
+    if not resolved.startswith(root + os.sep):
+        raise ValueError(f"Manifest path is outside the import root: {path}")
+    if not os.path.isfile(resolved):
+        raise ValueError(f"Manifest path is not a file: {path}")
+    return resolved
+
+
+def resolve_import_dir(root: str, path: str) -> str:
+    """
+    Resolves a directory to sync relative to the import root, with the same
+    confinement rules as `resolve_manifest_path`.
+    """
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path.lstrip("/")))
+    if resolved != root and not resolved.startswith(root + os.sep):
+        raise ValueError(f"Sync directory is outside the import root: {path}")
+    if not os.path.isdir(resolved):
+        raise ValueError(f"Sync directory does not exist: {path}")
+    return resolved
+
+
+def import_file(source_path: str, store: UploadStore) -> Dict[str, Any]:
+    """
+    Copies a local file into the content-addressed upload store, hashing it in the
+    same pass.
+    """
+    stored = store.save_file(source_path)
+    return {
+        "filename": os.path.basename(source_path),
+        "sha256": stored["sha256"],
+        "size_bytes": stored["size_bytes"],
+    }
+
+
+def bump_document_version(document: Document, file: Dict[str, Any]) -> str:
+    """
+    Points a document at a new version of its file ({"sha256", "size_bytes"} and
+    optionally "filename", "mime_type", "etag") and resets it for re-ingestion.
+    Returns the previous sha256, whose stored file the caller may remove.
+    """
+    previous_sha256 = document.sha256
+    document.filename = file.get("filename") or document.filename
+    document.mime_type = file.get("mime_type") or document.mime_type
+    document.size_bytes = file["size_bytes"]
+    document.sha256 = file["sha256"]
+    if file.get("etag"):
+        document.source_etag = file["etag"]
+    document.version += 1
+    document.status = DocumentStatus.PENDING
+    return previous_sha256
+
+
+def dedupe_files(files: Iterable[Dict[str, Any]], existing_hashes: Set[str]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Splits files into (new, skipped): a file is skipped when its sha256 is already
+    ingested or appeared earlier in the same batch.
+    """
+    seen = set(existing_hashes)
+    new, skipped = [], []
+    for file in files:
+        if file["sha256"] in seen:
+            skipped.append(file)
+        else:
+            seen.add(file["sha256"])
+            new.append(file)
+    return new, skipped
+
+
+def split_lanes(items: Sequence[Any], lanes: int) -> List[List[Any]]:
+    """
+    Splits items into at most `lanes` contiguous, near-equal lists.
+    """
+    if not items:
+        return []
+    lanes = max(1, min(lanes, len(items)))
+    size = -(-len(items) // lanes)  # ceil division
+    return [list(items[start : start + size]) for start in range(0, len(items), size)]
+
+
+def summarize_batch_progress(total: int, status_counts: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Aggregates per-status document counts into progress for a whole batch.
+    """
+    counts = {status.value: status_counts.get(status.value, 0) for status in DocumentStatus}
+    finished = sum(counts[status.value] for status in TERMINAL_STATUSES)
+    return {
+        "total": total,
+        "counts": counts,
+        "finished": finished,
+        "progress": round(finished / total, 4) if total else 1.0,
+        "done": finished >= total,
+    }
@@ -0,0 +1,34 @@
+from typing import Dict, Type
+
+from app.rag.ingest.base_connector import BaseConnector
+from app.rag.ingest.drive_connector import DriveConnector
+from app.rag.ingest.file_connector import FileConnector
+from app.rag.ingest.s3_connector import S3Connector
+from app.rag.ingest.upload_store import upload_store
+from app.settings import settings
+
+CONNECTORS: Dict[str, Type[BaseConnector]] = {
+    FileConnector.name: FileConnector,
+    S3Connector.name: S3Connector,
+    DriveConnector.name: DriveConnector,
+}
+
+
+def create_connector(name: str) -> BaseConnector:
+    """
+    Builds the connector for a sync source: "file" (a directory under
+    `BULK_IMPORT_ROOT`), "s3" (a bucket prefix) or "drive" (a Drive folder).
+    """
+    if name == FileConnector.name:
+        return FileConnector(upload_dir=settings.UPLOAD_DIR)
+    if name == S3Connector.name:
+        return S3Connector(
+            region_name=settings.S3_REGION,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            store=upload_store,
+            part_size=settings.S3_PART_SIZE,
+            max_concurrency=settings.S3_DOWNLOAD_CONCURRENCY,
+        )
+    if name == DriveConnector.name:
+        return DriveConnector(access_token=settings.DRIVE_ACCESS_TOKEN)
+    raise ValueError(f"Unsupported connector: {name}. Expected one of {tuple(CONNECTORS)}")
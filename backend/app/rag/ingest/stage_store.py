@@ -0,0 +1,88 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict
+
+from app.settings import settings
+
+# Stage written when a task of a document's pipeline raises; see `record_pipeline_failure`
+FAILURE_STAGE = "failure"
+
+
+class StageStore:
+    """
+    Claim-check store for intermediate ingestion results.
+
+    Pipeline stages (extracted page texts, tables, ...) are written as gzipped JSON
+    under `<root>/<document_id>/<stage>.json.gz` on the uploads volume, and Celery
+    tasks pass only the returned reference. Message size on the broker then stays
+    constant regardless of document length.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.writes = 0
+        self.bytes_written = 0
+
+    def _path(self, ref: str) -> str:
+        path = os.path.realpath(os.path.join(self.root_dir, ref))
+        if not path.startswith(os.path.realpath(self.root_dir) + os.sep):
+            raise ValueError(f"Invalid stage reference: {ref}")
+        return path
+
+    def ref(self, document_id: str, stage: str) -> str:
+        return f"{document_id}/{stage}.json.gz"
+
+    def put(self, document_id: str, stage: str, data: Any) -> str:
+        """
+        Stores `data` for a document's stage and returns its reference.
+        """
+        ref = self.ref(document_id, stage)
+        path = self._path(ref)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Atomic write (temp file + rename), so a retried task never reads a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=3) as f:
+                f.write(json.dumps(data, default=str).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += size
+        print(f"Stored stage '{stage}' for document {document_id}: {size / 1024:.1f} KiB compressed")
+        return ref
+
+    def get(self, ref: str) -> Any:
+        with gzip.open(self._path(ref), "rb") as f:
+            return json.loads(f.read().decode("utf-8"))
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self._path(ref))
+
+    def delete(self, ref: str):
+        try:
+            os.remove(self._path(ref))
+        except FileNotFoundError:
+            pass
+
+    def delete_document(self, document_id: str):
+        shutil.rmtree(self._path(document_id), ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"writes": self.writes, "bytes_written": self.bytes_written}
+
+
+# Singleton instance shared by the ingestion tasks in a worker process
+stage_store = StageStore(settings.STAGE_STORE_DIR)
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.settings import settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadStore:
+    """
+    Content-addressed store for uploaded files (`<root>/<sha256>`).
+
+    Uploads are consumed in fixed-size chunks: each chunk updates the SHA-256 and
+    is appended to a temp file in the store directory, which is then atomically
+    renamed to its content hash. Memory per upload is one chunk regardless of the
+    file size, and readers never see a partially written file.
+    """
+
+    def __init__(self, root_dir: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.root_dir = root_dir
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.files_written = 0
+        self.duplicates = 0
+        self.bytes_received = 0
+
+    def path(self, sha256_hash: str) -> str:
+        return os.path.join(self.root_dir, sha256_hash)
+
+    async def save_stream(self, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """
+        Stores a stream of byte chunks (e.g. `request.stream()`) and returns
+        {"sha256", "size_bytes", "path"}. Disk writes run in the threadpool so the
+        event loop keeps serving other requests.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = self.open_temp()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await run_in_threadpool(f.write, chunk)
+            return self.commit(tmp_path, digest.hexdigest(), size)
+        except BaseException:
+            self.discard(tmp_path)
+            raise
+
+    async def save_upload(self, upload: UploadFile) -> Dict[str, Any]:
+        """
+        Stores a FastAPI `UploadFile` without reading it into memory at once.
+        """
+
+        async def chunks():
+            while chunk := await upload.read(self.chunk_size):
+                yield chunk
+
+        return await self.save_stream(chunks())
+
+    def save_file(self, source_path: str) -> Dict[str, Any]:
+        """
+        Copies a local file into the store, hashing it in the same pass.
+        """
+        with open(source_path, "rb") as source:
+            return self.save_chunks(iter(lambda: source.read(self.chunk_size), b""))
+
+    def save_chunks(self, chunks: Iterator[bytes]) -> Dict[str, Any]:
+        """
+        Synchronous counterpart of `save_stream` for worker-side sources.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = self.open_temp()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            return self.commit(tmp_path, digest.hexdigest(), size)
+        except BaseException:
+            self.discard(tmp_path)
+            raise
+
+    def open_temp(self) -> Tuple[int, str]:
+        """
+        Creates a temp file in the store for writers that fill it themselves (e.g.
+        ranged downloads); finish with `commit()` or `discard()`.
+        """
+        os.makedirs(self.root_dir, exist_ok=True)
+        # Same directory as the target, so the final rename never crosses filesystems
+        return tempfile.mkstemp(dir=self.root_dir, prefix=".upload-", suffix=".tmp")
+
+    def commit(self, tmp_path: str, sha256_hash: str, size: int) -> Dict[str, Any]:
+        """
+        Atomically moves a fully written temp file to its content-addressed path.
+        """
+        path = self.path(sha256_hash)
+        duplicate = os.path.exists(path)
+        if duplicate:
+            self.discard(tmp_path)  # Same content is already stored
+        else:
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self.bytes_received += size
+            if duplicate:
+                self.duplicates += 1
+            else:
+                self.files_written += 1
+        return {"sha256": sha256_hash, "size_bytes": size, "path": path}
+
+    def discard(self, tmp_path: str):
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "files_written": self.files_written,
+            "duplicates": self.duplicates,
+            "bytes_received": self.bytes_received,
+        }
+
+
+# Singleton instance shared by the API and the ingestion tasks in a process
+upload_store = UploadStore(settings.UPLOAD_DIR)
@@ -0,0 +1,197 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
+
+
+class BaseOCREngine(ABC):
+    """
+    Abstract base class for OCR engines.
+
+    Subclasses implement `ocr_image`; page rendering, windowing and page-shard
+    parallelism are shared here so every engine has the same `(page_number, text)`
+    contract.
+    """
+
+    name = "base"
+
+    def __init__(self, dpi: int = 200, page_window: int = 1):
+        self.dpi = dpi
+        self.page_window = max(1, page_window)
+        self._shard = threading.local()
+
+    @property
+    def version(self) -> str:
+        return "unknown"
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Identifies everything that changes this engine's output: engine, version and render DPI.
+        """
+        return f"{self.name}-{self.version}-{self.dpi}dpi"
+
+    @abstractmethod
+    def ocr_image(self, image: Image.Image) -> Tuple[str, float]:
+        """
+        OCRs one rendered page and returns (text, confidence), confidence in [0, 1].
+        """
+        pass
+
+    def prepare(self, file_path: str, pages: Sequence[int]):
+        """
+        Hook called once per document before its pages are OCR'd.
+        """
+        pass
+
+    @property
+    def in_shard(self) -> bool:
+        """
+        True on the threads of an `ocr_pdf_parallel` shard pool, where engines should
+        stay single-threaded so concurrent shards don't oversubscribe the CPU.
+        """
+        return getattr(self._shard, "active", False)
+
+    @property
+    def shard_threads(self) -> int:
+        """
+        CPU threads this shard may use (cores divided by shards in flight, at least 1).
+        """
+        return getattr(self._shard, "threads", 1)
+
+    def _enter_shard(self, threads: int = 1):
+        self._shard.active = True
+        self._shard.threads = threads
+
+    def page_count(self, file_path: str) -> int:
+        return int(pdfinfo_from_path(file_path)["Pages"])
+
+    def iter_pdf(self, file_path: str, first_page: int = 1, last_page: int = None) -> Iterator[Tuple[int, str]]:
+        """
+        Renders and OCRs `page_window` pages at a time, yielding results as it goes.
+
+        Only the current window's images are ever held in memory, so peak memory
+        stays flat regardless of how many pages the document has.
+
+        Args:
+        ----
+            file_path: The local path to the PDF file.
+            first_page: First page to OCR (1-indexed, inclusive).
+            last_page: Last page to OCR (inclusive); defaults to the last page of the PDF.
+
+        Yields:
+        ------
+            (page_number, text) tuples in page order.
+
+        """
+        if last_page is None:
+            last_page = self.page_count(file_path)
+
+        for window_start in range(first_page, last_page + 1, self.page_window):
+            window_end = min(window_start + self.page_window - 1, last_page)
+            images = self.render(file_path, window_start, window_end)
+            try:
+                for offset, image in enumerate(images):
+                    text, _ = self.ocr_image(image)
+                    yield window_start + offset, text
+            finally:
+                for image in images:
+                    image.close()
+
+    def render(self, file_path: str, first_page: int, last_page: int) -> List[Image.Image]:
+        return convert_from_path(file_path, dpi=self.dpi, first_page=first_page, last_page=last_page)
+
+    def ocr_page_range(self, file_path: str, first_page: int, last_page: int) -> List[Tuple[int, str]]:
+        return list(self.iter_pdf(file_path, first_page=first_page, last_page=last_page))
+
+    def ocr_pages(self, file_path: str, pages: Sequence[int]) -> List[Tuple[int, str]]:
+        """
+        OCRs an arbitrary set of pages, rendering each contiguous run with one window sweep.
+        """
+        results = []
+        for first, last in _contiguous_runs(pages):
+            results.extend(self.ocr_page_range(file_path, first, last))
+        return results
+
+    def ocr_pdf_parallel(
+        self, file_path: str, workers: int = 0, pages: Optional[Sequence[int]] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Splits the page range into contiguous shards and OCRs them concurrently.
+
+        Rendering (pdftoppm) and the OCR engines all release the GIL (tesseract is a
+        subprocess, RapidOCR runs in ONNX Runtime), so a thread per shard is enough to
+        keep every core busy; it also works inside daemonic Celery prefork children,
+        which may not start a process pool of their own. Shard threads are marked
+        (`in_shard`, with a `shard_threads` budget) so engines can limit their own
+        threading, e.g. Tesseract runs with OMP_THREAD_LIMIT=1 in its own environment
+        (the worker process's environment is left untouched) and RapidOCR sizes its
+        ONNX Runtime thread pools. Results are merged back in page order.
+
+        Args:
+        ----
+            file_path: The local path to the PDF file.
+            workers: Number of shards in flight; 0 means one per CPU core.
+            pages: 1-indexed pages to OCR; defaults to every page.
+
+        Returns:
+        -------
+            A list of (page_number, text) tuples in page order.
+
+        """
+        pages = sorted(pages) if pages is not None else list(range(1, self.page_count(file_path) + 1))
+        if not pages:
+            return []
+
+        self.prepare(file_path, pages)
+        workers = min(workers or os.cpu_count() or 1, len(pages))
+        if workers <= 1:
+            return self.ocr_pages(file_path, pages)
+
+        shard_size = -(-len(pages) // workers)  # ceil division
+        shards = [pages[start : start + shard_size] for start in range(0, len(pages), shard_size)]
+
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ocr", initializer=self._enter_shard, initargs=(threads,)
+        ) as pool:
+            futures = [pool.submit(self.ocr_pages, file_path, shard) for shard in shards]
+            results = [page for future in futures for page in future.result()]
+        return sorted(results)
+
+    def ocr_pdf(self, file_path: str) -> List[Tuple[int, str]]:
+        """
+        Converts each page of a PDF to an image and performs OCR.
+
+        Args:
+        ----
+            file_path: The local path to the PDF file.
+
+        Returns:
+        -------
+            A list of tuples, where each tuple contains the page number
+            and the extracted text for that page.
+
+        """
+        try:
+            return list(self.iter_pdf(file_path))
+        except Exception as e:
+            print(f"Error during {self.name} OCR: {e}")
+            return []
+
+
+def _contiguous_runs(pages: Sequence[int]) -> List[Tuple[int, int]]:
+    """
+    Collapses sorted page numbers into inclusive (first, last) runs, e.g. [1, 2, 3, 7] -> [(1, 3), (7, 7)].
+    """
+    runs = []
+    for page in pages:
+        if runs and page == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
@@ -0,0 +1,120 @@
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from PIL import Image
+
+from app.rag.ocr.base_engine import BaseOCREngine
+from app.rag.ocr.rapidocr_engine import RapidOCREngine
+from app.rag.ocr.tesseract_engine import TesseractEngine
+
+OCR_ENGINES: Dict[str, Type[BaseOCREngine]] = {
+    TesseractEngine.name: TesseractEngine,
+    RapidOCREngine.name: RapidOCREngine,
+}
+
+
+class FallbackOCREngine(BaseOCREngine):
+    """
+    Routes OCR across several engines.
+
+    Per document, `prepare()` OCRs a probe page with every engine and orders them by
+    confidence, so the engine that reads this document best becomes the primary.
+    The probe page's result is kept and reused by the main pass instead of being
+    OCR'd again. Per page, the primary's result is kept when its confidence reaches
+    `min_confidence`; otherwise the next engines are tried and the most confident
+    result wins.
+    """
+
+    name = "auto"
+
+    def __init__(
+        self, engines: List[BaseOCREngine], min_confidence: float = 0.75, dpi: int = 200, page_window: int = 1
+    ):
+        super().__init__(dpi=dpi, page_window=page_window)
+        self.engines = engines
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._probes: Dict[str, Tuple[int, str]] = {}  # file_path -> (probe page, text) until its pass ends
+
+        # Metrics
+        self.pages_by_engine: Counter = Counter()
+        self.fallbacks = 0
+
+    @property
+    def version(self) -> str:
+        engines = "+".join(f"{engine.name}-{engine.version}" for engine in sorted(self.engines, key=lambda e: e.name))
+        return f"{engines}@{self.min_confidence}"
+
+    def _enter_shard(self, threads: int = 1):
+        super()._enter_shard(threads)
+        for engine in self.engines:
+            engine._enter_shard(threads)
+
+    def prepare(self, file_path: str, pages: Sequence[int]):
+        probe_page = pages[0]
+        images = self.render(file_path, probe_page, probe_page)
+        try:
+            results = {engine.name: engine.ocr_image(images[0]) for engine in self.engines}
+        finally:
+            for image in images:
+                image.close()
+        self.engines = sorted(self.engines, key=lambda engine: results[engine.name][1], reverse=True)
+        text, _ = self._choose((engine, results[engine.name]) for engine in self.engines)
+        with self._lock:
+            self._probes[file_path] = (probe_page, text)
+        scores = {name: confidence for name, (_, confidence) in results.items()}
+        print(f"OCR engine probe on page {probe_page}: {scores}; primary engine: {self.engines[0].name}")
+
+    def ocr_pdf_parallel(
+        self, file_path: str, workers: int = 0, pages: Optional[Sequence[int]] = None
+    ) -> List[Tuple[int, str]]:
+        try:
+            return super().ocr_pdf_parallel(file_path, workers=workers, pages=pages)
+        finally:
+            with self._lock:
+                self._probes.pop(file_path, None)
+
+    def ocr_pages(self, file_path: str, pages: Sequence[int]) -> List[Tuple[int, str]]:
+        with self._lock:
+            probe = self._probes.get(file_path)
+        if probe is None or probe[0] not in pages:
+            return super().ocr_pages(file_path, pages)
+        rest = [page for page in pages if page != probe[0]]
+        return sorted(super().ocr_pages(file_path, rest) + [probe])
+
+    def ocr_image(self, image: Image.Image) -> Tuple[str, float]:
+        return self._choose((engine, engine.ocr_image(image)) for engine in self.engines)
+
+    def _choose(self, results: Iterable[Tuple[BaseOCREngine, Tuple[str, float]]]) -> Tuple[str, float]:
+        """
+        Keeps the first result that reaches `min_confidence`, else the most confident one.
+        `results` is consumed lazily, so later engines only run when needed.
+        """
+        best_engine, best = None, ("", -1.0)
+        for position, (engine, (text, confidence)) in enumerate(results):
+            if confidence > best[1]:
+                best_engine, best = engine, (text, confidence)
+            if confidence >= self.min_confidence:
+                break
+
+        with self._lock:
+            self.pages_by_engine[best_engine.name] += 1
+            self.fallbacks += int(position > 0)
+        return best
+
+    def get_stats(self) -> Dict[str, object]:
+        return {"pages_by_engine": dict(self.pages_by_engine), "fallbacks": self.fallbacks}
+
+
+def create_ocr_engine(name: str, dpi: int = 200, page_window: int = 1, min_confidence: float = 0.75) -> BaseOCREngine:
+    """
+    Builds the OCR engine named by `OCR_ENGINE`: "tesseract", "rapidocr", or "auto"
+    (both, selected per document and falling back per page on low confidence).
+    """
+    if name == FallbackOCREngine.name:
+        engines = [engine_class(dpi=dpi, page_window=page_window) for engine_class in OCR_ENGINES.values()]
+        return FallbackOCREngine(engines, min_confidence=min_confidence, dpi=dpi, page_window=page_window)
+    if name not in OCR_ENGINES:
+        raise ValueError(f"Unsupported OCR engine: {name}. Expected one of {(*OCR_ENGINES, FallbackOCREngine.name)}")
+    return OCR_ENGINES[name](dpi=dpi, page_window=page_window)
@@ -1,20 +1,37 @@
-from typing import Any, Dict, List
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple, Union
 
 import pdfplumber
 
+from app.rag.ocr.pdf_document import PdfDocument
+
 
 class LayoutAnalyzer:
     """
     Analyzes the layout of a PDF to extract structured elements like tables.
+
+    Pages are first screened with `has_ruling_lines` (reusing the parse that text
+    extraction already did), so pages that clearly have no tables never reach
+    pdfplumber's expensive table finder. The remaining candidate pages are split
+    into contiguous shards and extracted in parallel worker processes: table
+    finding is pure Python and holds the GIL, so threads would not help.
     """
 
-    def extract_tables(self, file_path: str) -> List[Dict[str, Any]]:
+    def __init__(self, workers: int = 0):
+        self.workers = workers or os.cpu_count() or 1
+        self.last_stats: Dict[str, Any] = {}
+
+    def extract_tables(self, source: Union[str, PdfDocument]) -> List[Dict[str, Any]]:
         """
         Uses pdfplumber to find and extract tables from each page.
 
         Args:
         ----
-            file_path: The local path to the PDF file.
+            source: An open `PdfDocument` session (reused, not re-parsed) or
+                the local path to the PDF file.
 
         Returns:
         -------
@@ -23,16 +40,87 @@ class LayoutAnalyzer:
         """
         all_tables = []
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for i, page in enumerate(pdf.pages):
-                    tables = page.extract_tables()
-                    for table in tables:
-                        all_tables.append(
-                            {
-                                "page_number": i + 1,
-                                "table_data": table,  # List of lists representing rows/cells
-                            }
-                        )
+            if isinstance(source, PdfDocument):
+                all_tables = self._extract(source)
+            else:
+                with PdfDocument(source) as document:
+                    all_tables = self._extract(document)
         except Exception as e:
             print(f"Error extracting tables with pdfplumber: {e}")
         return all_tables
+
+    def _extract(self, document: PdfDocument) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        candidates = document.table_candidate_pages()
+        screen_seconds = time.perf_counter() - start
+
+        workers = min(self.workers, len(candidates))
+        if workers > 1 and _can_start_processes():
+            page_results = self._extract_parallel(document.file_path, candidates, workers)
+        else:
+            workers = 1
+            page_results = []
+            for page_number in candidates:
+                page_start = time.perf_counter()
+                tables = document.page_tables(page_number)
+                page_results.append((page_number, tables, time.perf_counter() - page_start))
+
+        all_tables = [
+            {
+                "page_number": page_number,
+                "table_data": table,  # List of lists representing rows/cells
+            }
+            for page_number, tables, _ in sorted(page_results, key=lambda result: result[0])
+            for table in tables
+        ]
+
+        page_count = document.page_count
+        pages_with_tables = sum(1 for _, tables, _ in page_results if tables)
+        extraction_seconds = sum(seconds for _, _, seconds in page_results)
+        self.last_stats = {
+            "pages": page_count,
+            "pages_skipped": page_count - len(candidates),
+            "candidate_pages": len(candidates),
+            "pages_with_tables": pages_with_tables,
+            "skip_ratio": round((page_count - len(candidates)) / page_count, 3) if page_count else 0.0,
+            "candidate_hit_ratio": round(pages_with_tables / len(candidates), 3) if candidates else 0.0,
+            "workers": workers,
+            "screen_seconds": round(screen_seconds, 3),
+            "seconds_per_candidate_page": round(extraction_seconds / len(candidates), 4) if candidates else 0.0,
+            "wall_seconds": round(time.perf_counter() - start, 3),
+        }
+        print(f"Table extraction stats: {self.last_stats}")
+        return all_tables
+
+    def _extract_parallel(
+        self, file_path: str, pages: Sequence[int], workers: int
+    ) -> List[Tuple[int, List[Any], float]]:
+        shard_size = -(-len(pages) // workers)  # ceil division
+        shards = [list(pages[start : start + shard_size]) for start in range(0, len(pages), shard_size)]
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            futures = [pool.submit(_extract_page_tables, file_path, shard) for shard in shards]
+            return [result for future in futures for result in future.result()]
+
+
+def _extract_page_tables(file_path: str, pages: Sequence[int]) -> List[Tuple[int, List[Any], float]]:
+    """
+    Worker-process entry point: extracts tables from the shard's `pages`.
+
+    Only the page indices cross the process boundary. The child opens the PDF with
+    `pages=` so pdfplumber builds Page objects for this shard alone; it still reads
+    the xref and walks the page tree, but no other page's content is parsed.
+    """
+    results = []
+    with pdfplumber.open(file_path, pages=pages) as pdf:
+        for page in pdf.pages:
+            start = time.perf_counter()
+            tables = page.extract_tables()
+            page.flush_cache()
+            results.append((page.page_number, tables, time.perf_counter() - start))
+    return results
+
+
+def _can_start_processes() -> bool:
+    # Daemonic processes (e.g. a multiprocessing-based pool child) may not have children
+    return not mp.current_process().daemon
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+
+class OCRCache:
+    """
+    Persistent, file-based store of OCR results.
+
+    Results live on the uploads volume next to the files they came from, so they
+    survive worker restarts and are shared by every worker mounting that volume.
+    Two keys point at a page's text:
+
+    - (file sha256, page number, engine cache key): reprocessing the same upload
+      (retries, re-chunking, re-embedding) never OCRs a page twice.
+    - (page content hash, engine cache key): an identical page inside a different
+      file (re-exported or concatenated scans) is also a hit.
+
+    The engine cache key includes engine name, version and render DPI, so upgrading
+    an engine or changing its settings naturally misses instead of serving stale text.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.file_hits = 0
+        self.page_hash_hits = 0
+        self.misses = 0
+
+    def _file_path(self, engine_key: str, sha256: str, page_number: int) -> str:
+        return os.path.join(self.root_dir, engine_key, "files", sha256[:2], sha256, f"{page_number}.json")
+
+    def _page_hash_path(self, engine_key: str, page_hash: str) -> str:
+        return os.path.join(self.root_dir, engine_key, "pages", page_hash[:2], f"{page_hash}.json")
+
+    def get(self, engine_key: str, sha256: str, page_number: int, page_hash: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the cached text for a page, or None.
+        """
+        text = _read(self._file_path(engine_key, sha256, page_number))
+        if text is not None:
+            self._count("file_hits")
+            return text
+
+        if page_hash:
+            text = _read(self._page_hash_path(engine_key, page_hash))
+            if text is not None:
+                self._count("page_hash_hits")
+                # Promote to the file key so the next lookup for this file is a single read
+                _write(self._file_path(engine_key, sha256, page_number), text)
+                return text
+
+        self._count("misses")
+        return None
+
+    def get_many(
+        self, engine_key: str, sha256: str, pages: Iterable[int], page_hashes: Optional[Dict[int, str]] = None
+    ) -> Dict[int, str]:
+        page_hashes = page_hashes or {}
+        results = {}
+        for page_number in pages:
+            text = self.get(engine_key, sha256, page_number, page_hashes.get(page_number))
+            if text is not None:
+                results[page_number] = text
+        return results
+
+    def put(self, engine_key: str, sha256: str, page_number: int, text: str, page_hash: Optional[str] = None):
+        _write(self._file_path(engine_key, sha256, page_number), text)
+        if page_hash:
+            _write(self._page_hash_path(engine_key, page_hash), text)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.file_hits + self.page_hash_hits + self.misses
+        return {
+            "file_hits": self.file_hits,
+            "page_hash_hits": self.page_hash_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.file_hits + self.page_hash_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["text"]
+    except (OSError, ValueError, KeyError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Ignoring unreadable OCR cache entry {path}: {e}")
+        return None
+
+
+def _write(path: str, text: str):
+    """
+    Atomic write (temp file + rename), so concurrent workers never see a partial entry.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"text": text}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write OCR cache entry {path}: {e}")
@@ -0,0 +1,209 @@
+import hashlib
+import mmap
+from typing import Any, Dict, List, Optional
+
+import pdfplumber
+from pdfminer.pdftypes import PDFException, PDFObjRef, PDFStream, resolve1
+
+
+class PdfDocument:
+    """
+    One parsing session over a PDF, shared by metadata, text, table and OCR consumers.
+
+    The file is opened once and memory-mapped, so pages are paged in by the OS on
+    demand instead of being copied into a bytes object. pdfplumber parses the
+    document structure once (`parse_count` stays at 1 for the life of the session)
+    and every derived value (metadata, page text, tables) is computed lazily and
+    cached. Rendering is left to the OCR engines (poppler), which read the same file path.
+
+    Use as a context manager, or call `close()` when done.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.parse_count = 0
+
+        self._file = open(file_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._pdf: Optional[pdfplumber.PDF] = None
+
+        self._sha256: Optional[str] = None
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._texts: Dict[int, str] = {}
+        self._tables: Dict[int, List[List[List[Optional[str]]]]] = {}
+        self._table_candidates: Dict[int, bool] = {}
+
+    def __enter__(self) -> "PdfDocument":
+        """Returns the open session."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the session, also when the block raised."""
+        self.close()
+
+    @property
+    def pdf(self) -> pdfplumber.PDF:
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self._mmap)
+            self.parse_count += 1
+        return self._pdf
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    @property
+    def sha256(self) -> str:
+        """
+        SHA-256 of the file bytes (the same content address `upload_document` uses).
+        """
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self._mmap).hexdigest()
+        return self._sha256
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Title, author and page count, in the shape `MetadataExtractor` returns.
+        """
+        if self._metadata is None:
+            doc_metadata = self.pdf.metadata
+            self._metadata = {
+                "title": doc_metadata.get("Title"),
+                "author": doc_metadata.get("Author"),
+                "page_count": self.page_count,
+            }
+        return self._metadata
+
+    def page_text(self, page_number: int) -> str:
+        """
+        Text-layer text of a 1-indexed page.
+        """
+        self._load_page(page_number)
+        return self._texts[page_number]
+
+    def page_tables(self, page_number: int) -> List[List[List[Optional[str]]]]:
+        """
+        Tables of a 1-indexed page, as lists of rows of cells. Pages that fail the
+        ruling-line screen (`is_table_candidate`) return [] without running extraction.
+        """
+        if page_number not in self._tables:
+            if self.is_table_candidate(page_number):
+                page = self.pdf.pages[page_number - 1]
+                self._tables[page_number] = page.extract_tables()
+                page.flush_cache()
+            else:
+                self._tables[page_number] = []
+        return self._tables[page_number]
+
+    def is_table_candidate(self, page_number: int) -> bool:
+        self._load_page(page_number)
+        return self._table_candidates[page_number]
+
+    def table_candidate_pages(self) -> List[int]:
+        return [page_number for page_number in range(1, self.page_count + 1) if self.is_table_candidate(page_number)]
+
+    def tables(self) -> List[Dict[str, Any]]:
+        """
+        All tables in the document, in the shape `LayoutAnalyzer.extract_tables` returns.
+        """
+        return [
+            {"page_number": page_number, "table_data": table}
+            for page_number in self.table_candidate_pages()
+            for table in self.page_tables(page_number)
+        ]
+
+    def page_hash(self, page_number: int) -> str:
+        """
+        Hash of what a 1-indexed page draws: its content streams plus every resource
+        they can use, resolved in full (fonts with their FontFile*/ToUnicode streams
+        and encodings, image/form XObjects, color spaces). Identical scanned pages in
+        different files hash the same, without rendering anything, while the same
+        content stream drawn with different font subsets or encodings does not.
+        """
+        page = self.pdf.pages[page_number - 1].page_obj
+        digest = hashlib.sha256()
+        for stream in page.contents:
+            digest.update(_decoded_data(resolve1(stream)))
+        _hash_object(digest, page.resources, visited={})
+        return digest.hexdigest()
+
+    def _load_page(self, page_number: int):
+        # Text and the table screen come from the same parsed layout objects, so compute
+        # both in one visit and then drop the page's layout cache instead of keeping every page parsed
+        if page_number in self._texts:
+            return
+        page = self.pdf.pages[page_number - 1]
+        self._texts[page_number] = page.extract_text() or ""
+        self._table_candidates[page_number] = has_ruling_lines(page)
+        page.flush_cache()
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+
+def has_ruling_lines(page: pdfplumber.page.Page, min_edges: int = 5) -> bool:
+    """
+    Cheap table screen from the page's line/rect/curve edges. pdfplumber's default
+    ("lines") table strategy builds cells only from ruling lines, so a page without
+    at least two horizontal and two vertical edges cannot yield a table; a lone
+    rectangle (4 edges, e.g. a page border) is not enough either.
+    """
+    horizontal = len(page.horizontal_edges)
+    vertical = len(page.vertical_edges)
+    return horizontal >= 2 and vertical >= 2 and horizontal + vertical >= min_edges
+
+
+def _decoded_data(stream: PDFStream) -> bytes:
+    # pdfminer drops `rawdata` once it decodes a stream (text extraction decodes content
+    # streams and fonts), so always hash the decoded bytes: the hash must not depend on
+    # what was extracted first. Undecoded streams are decoded on a throwaway copy, so
+    # image data is not kept decoded in the document's object cache.
+    if stream.rawdata is None:
+        return stream.data or b""
+    copy = PDFStream(stream.attrs, stream.rawdata, stream.decipher)
+    copy.objid, copy.genno = stream.objid, stream.genno
+    try:
+        return copy.get_data()
+    except PDFException:
+        return stream.rawdata  # Filters pdfminer cannot decode: it never decodes these either
+
+
+def _hash_object(digest, obj: Any, visited: Dict[int, int]):
+    # Feeds a resolved PDF object graph into the digest in a canonical order. Object ids
+    # differ between files, so a reference seen before is encoded by its visit order.
+    if isinstance(obj, PDFObjRef):
+        if obj.objid in visited:
+            digest.update(b"@%d;" % visited[obj.objid])
+            return
+        visited[obj.objid] = len(visited)
+        obj = resolve1(obj)
+
+    if isinstance(obj, PDFStream):
+        digest.update(b"stream(")
+        attrs = {key: value for key, value in obj.attrs.items() if key not in ("Length", "Parent")}
+        _hash_object(digest, attrs, visited)
+        digest.update(_decoded_data(obj))
+        digest.update(b")")
+    elif isinstance(obj, dict):
+        digest.update(b"{")
+        for key in sorted(obj):
+            if key == "Parent":
+                continue  # Back-reference up the page tree
+            digest.update(str(key).encode() + b":")
+            _hash_object(digest, obj[key], visited)
+        digest.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"[")
+        for value in obj:
+            _hash_object(digest, value, visited)
+        digest.update(b"]")
+    elif isinstance(obj, bytes):
+        digest.update(b"b%d:" % len(obj) + obj)
+    else:
+        digest.update(repr(obj).encode() + b";")  # Numbers, names, booleans, None
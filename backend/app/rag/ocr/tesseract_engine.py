@@ -1,35 +1,78 @@
-from typing import List, Tuple
+import io
+import os
+import subprocess
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 import pytesseract
-from pdf2image import convert_from_path
+from PIL import Image
 
+from app.rag.ocr.base_engine import BaseOCREngine
 
-class TesseractEngine:
+
+class TesseractEngine(BaseOCREngine):
     """
     An OCR engine using Tesseract to extract text from PDF files.
     """
 
-    def ocr_pdf(self, file_path: str) -> List[Tuple[int, str]]:
+    name = "tesseract"
+
+    @property
+    def version(self) -> str:
+        return _tesseract_version()
+
+    def ocr_image(self, image: Image.Image) -> Tuple[str, float]:
         """
-        Converts each page of a PDF to an image and performs OCR.
+        Runs Tesseract once and rebuilds the page text from its word boxes, so the
+        per-word confidences come for free. Confidence is the mean word confidence in [0, 1].
+        """
+        data = _image_to_data(image, single_threaded=self.in_shard)
 
-        Args:
-        ----
-            file_path: The local path to the PDF file.
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if confidence < 0 or not word.strip():
+                continue
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(word)
+            confidences.append(confidence / 100.0)
 
-        Returns:
-        -------
-            A list of tuples, where each tuple contains the page number
-            and the extracted text for that page.
+        text_lines = []
+        previous_paragraph = None
+        for (block, paragraph, _), words in lines.items():
+            if previous_paragraph is not None and (block, paragraph) != previous_paragraph:
+                text_lines.append("")
+            text_lines.append(" ".join(words))
+            previous_paragraph = (block, paragraph)
 
-        """
-        try:
-            images = convert_from_path(file_path)
-            results = []
-            for i, image in enumerate(images):
-                text = pytesseract.image_to_string(image)
-                results.append((i + 1, text))  # page_num is 1-indexed
-            return results
-        except Exception as e:
-            print(f"Error during Tesseract OCR: {e}")
-            return []
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return "\n".join(text_lines), confidence
+
+
+def _image_to_data(image: Image.Image, single_threaded: bool = False) -> Dict[str, Any]:
+    """
+    `pytesseract.image_to_data` as a dict. pytesseract always hands Tesseract the
+    process environment, so the single-threaded variant runs the binary itself with
+    OMP_THREAD_LIMIT=1 set for that subprocess only.
+    """
+    if not single_threaded:
+        return pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+
+    image, extension = pytesseract.pytesseract.prepare(image)
+    buffer = io.BytesIO()
+    image.save(buffer, format=extension)
+    process = subprocess.run(
+        [pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout", "tsv"],
+        input=buffer.getvalue(),
+        capture_output=True,
+        env={**os.environ, "OMP_THREAD_LIMIT": "1"},
+    )
+    if process.returncode:
+        raise pytesseract.TesseractError(process.returncode, process.stderr.decode("utf-8", errors="replace"))
+    return pytesseract.pytesseract.file_to_dict(process.stdout.decode("utf-8"), "\t", -1)
+
+
+@lru_cache(maxsize=1)
+def _tesseract_version() -> str:
+    return str(pytesseract.get_tesseract_version())
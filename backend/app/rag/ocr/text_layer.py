@@ -0,0 +1,90 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from app.rag.ocr.base_engine import BaseOCREngine
+from app.rag.ocr.ocr_cache import OCRCache
+from app.rag.ocr.pdf_document import PdfDocument
+
+# pdfminer renders glyphs it cannot map to unicode as "(cid:NN)"
+_CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+
+def text_quality(text: str) -> float:
+    """
+    Fraction of characters in `text` that are readable (printable, not unmapped glyphs).
+    Returns 0.0 for empty text.
+    """
+    stripped = _CID_PATTERN.sub("�", text.strip())
+    if not stripped:
+        return 0.0
+    readable = sum(1 for c in stripped if c != "�" and (c.isprintable() or c in "\n\t"))
+    return readable / len(stripped)
+
+
+class TextLayerExtractor:
+    """
+    Extracts page text from the PDF's own text layer and OCRs only the pages that need it.
+
+    Born-digital pages already carry exact text, so rasterizing and OCRing them is
+    wasted work. A page goes to OCR only when its extractable text is shorter
+    than `min_chars` or its `text_quality` is below `min_quality` (scanned pages,
+    broken font encodings). With an `ocr_cache`, pages OCR'd before (same file or
+    identical page content, same engine settings) are served from it without rendering.
+    """
+
+    def __init__(
+        self,
+        ocr_engine: BaseOCREngine,
+        min_chars: int = 20,
+        min_quality: float = 0.9,
+        ocr_cache: Optional[OCRCache] = None,
+    ):
+        self.ocr_engine = ocr_engine
+        self.min_chars = min_chars
+        self.min_quality = min_quality
+        self.ocr_cache = ocr_cache
+
+    def needs_ocr(self, text: str) -> bool:
+        return len(text.strip()) < self.min_chars or text_quality(text) < self.min_quality
+
+    def extract(self, document: PdfDocument, ocr_workers: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns one {"page_number", "text", "method"} dict per page, in page order.
+        `method` is "text_layer" or "ocr".
+        """
+        pages: Dict[int, Dict[str, Any]] = {}
+        ocr_pages = []
+
+        for page_number in range(1, document.page_count + 1):
+            text = document.page_text(page_number)
+            if self.needs_ocr(text):
+                ocr_pages.append(page_number)
+            else:
+                pages[page_number] = {"page_number": page_number, "text": text, "method": "text_layer"}
+
+        cached: Dict[int, str] = {}
+        page_hashes: Dict[int, str] = {}
+        engine_key = self.ocr_engine.cache_key if self.ocr_cache else None
+        if ocr_pages and self.ocr_cache:
+            page_hashes = {page_number: document.page_hash(page_number) for page_number in ocr_pages}
+            cached = self.ocr_cache.get_many(engine_key, document.sha256, ocr_pages, page_hashes)
+
+        pages_to_ocr = [page_number for page_number in ocr_pages if page_number not in cached]
+        ocr_results = list(cached.items())
+        if pages_to_ocr:
+            fresh_results = self.ocr_engine.ocr_pdf_parallel(
+                document.file_path, workers=ocr_workers, pages=pages_to_ocr
+            )
+            if self.ocr_cache:
+                for page_number, text in fresh_results:
+                    self.ocr_cache.put(engine_key, document.sha256, page_number, text, page_hashes.get(page_number))
+            ocr_results.extend(fresh_results)
+
+        for page_number, text in ocr_results:
+            pages[page_number] = {"page_number": page_number, "text": text, "method": "ocr"}
+
+        print(
+            f"Text extraction: {len(pages) - len(ocr_pages)} pages from text layer, "
+            f"{len(cached)} OCR pages from cache, {len(pages_to_ocr)} pages OCR'd."
+        )
+        return [pages[page_number] for page_number in sorted(pages)]
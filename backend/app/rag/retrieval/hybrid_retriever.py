@@ -8,6 +8,7 @@ from .reranker import reranker
 from .filters import filter_low_confidence
 from .citation_formatter import format_citations
 from app.core.security import mask_pii_in_results
+from app.core.inference_executor import inference_executor
 
 class HybridRetriever:
     async def retrieve(
@@ -38,7 +39,7 @@ class HybridRetriever:
             List of formatted citation results with scores and metadata
         """
         
-        # 1. Run retrievers in parallel
+        # 1. Run retrievers in parallel (their blocking work runs on the inference executor)
         vector_results_task = vector_retriever.retrieve(query, top_k=50)
         keyword_results_task = keyword_retriever.retrieve(query, top_k=50)
         results_list = await asyncio.gather(vector_results_task, keyword_results_task)
@@ -56,7 +57,7 @@ class HybridRetriever:
         if rerank:
             # Rerank the top 20 fused results to get the final top_k
             results_to_rerank = confident_results[:20]
-            reranked_results = reranker.rerank(query, results_to_rerank, top_k=top_k)
+            reranked_results = await inference_executor.run(reranker.rerank, query, results_to_rerank, top_k=top_k)
             
             # --- FIX: Add a post-reranking confidence check ---
             # Cross-encoder scores for irrelevant docs are often large negative numbers.
@@ -70,7 +71,7 @@ class HybridRetriever:
         
         # 5. Apply PII Masking (if required)
         if apply_pii_mask:
-            results_to_format = mask_pii_in_results(final_results)
+            results_to_format = await inference_executor.run(mask_pii_in_results, final_results)
         else:
             results_to_format = final_results
             
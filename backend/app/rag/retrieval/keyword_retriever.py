@@ -1,6 +1,6 @@
 from typing import Any, Dict, List
 
-from app.db.elasticsearch_client import es_client
+from app.db.elasticsearch_client import async_es_client
 
 
 class KeywordRetriever:
@@ -9,7 +9,7 @@ class KeywordRetriever:
         Retrieves relevant chunks based on a keyword query.
         """
         print(f"Performing keyword search for: '{query}'")
-        search_results = es_client.search(query, top_k)
+        search_results = await async_es_client.search(query, top_k)
 
         # Format results to be consistent with other retrievers
         formatted_results = []
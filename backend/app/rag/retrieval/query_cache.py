@@ -0,0 +1,136 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.settings import settings
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache with TTL for query embeddings on the retrieval hot path.
+
+    Keys are normalized query strings, so "What is RAG?" and "what is  rag"
+    share an entry. Entries older than `ttl_seconds` are treated as misses and
+    dropped; when the cache is full the least recently used entry is evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Lowercases, collapses whitespace and drops trailing punctuation.
+        """
+        query = " ".join(query.lower().split())
+        return re.sub(r"[\s?!.]+$", "", query)
+
+    def get(self, query: str) -> Optional[List[float]]:
+        key = self.normalize(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, vector = entry
+            if self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector: List[float]):
+        key = self.normalize(query)
+        with self._lock:
+            self._entries[key] = (self._clock(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def warm(self, queries: Iterable[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> int:
+        """
+        Embeds every distinct, not-yet-cached query in one batch and stores the results.
+        Returns the number of queries added.
+        """
+        pending = {}
+        for query in queries:
+            key = self.normalize(query)
+            if key and key not in self._entries and key not in pending:
+                pending[key] = query
+        if not pending:
+            return 0
+
+        vectors = embed_fn(list(pending.values()))
+        for query, vector in zip(pending.values(), vectors):
+            self.put(query, vector)
+        return len(pending)
+
+    def warm_from_log(
+        self,
+        path: str,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        field: str = "query",
+    ) -> int:
+        """
+        Warms the cache from a query log: either JSONL rows holding `field`
+        (e.g. the eval datasets) or one raw query per line.
+        """
+        queries = []
+        with open(Path(path), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("{"):
+                    query = json.loads(line).get(field)
+                    if query:
+                        queries.append(query)
+                else:
+                    queries.append(line)
+
+        added = self.warm(queries, embed_fn)
+        print(f"Warmed query embedding cache with {added} queries from {path}")
+        return added
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton instance
+query_embedding_cache = QueryEmbeddingCache(
+    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS,
+)
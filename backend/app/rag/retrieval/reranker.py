@@ -1,10 +1,38 @@
+import threading
 from sentence_transformers.cross_encoder import CrossEncoder
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from app.rag.inference_backends import load_cross_encoder
+from app.settings import settings
 
 class Reranker:
-    def __init__(self, model_name: str = 'cross-encoder/ms-marco-MiniLM-L-6-v2'):
-        # This will download the model on first run
-        self.model = CrossEncoder(model_name)
+    def __init__(
+        self,
+        model_name: str = 'cross-encoder/ms-marco-MiniLM-L-6-v2',
+        backend: str = "torch",
+        model_path: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.model_path = model_path
+        self._model = None
+        self._load_lock = threading.Lock()
+        # Calls arrive from the inference executor's threads; the tokenizer is not thread-safe
+        self._predict_lock = threading.Lock()
+
+    @property
+    def model(self) -> CrossEncoder:
+        # This will download the model on first use, not at import time
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    print(f"Loading reranker '{self.model_name}' ({self.backend})")
+                    self._model = load_cross_encoder(
+                        self.model_name,
+                        backend=self.backend,
+                        model_path=self.model_path,
+                        onnx_file_name=settings.RERANKER_ONNX_FILE_NAME or None,
+                    )
+        return self._model
 
     def rerank(self, query: str, chunks: List[Dict[str, Any]], top_k: int = 10) -> List[Dict[str, Any]]:
         """
@@ -17,7 +45,8 @@ class Reranker:
         pairs = [(query, chunk["text"]) for chunk in chunks]
         
         # Predict scores for all pairs
-        scores = self.model.predict(pairs)
+        with self._predict_lock:
+            scores = self.model.predict(pairs)
         
         # Add scores to the chunks and sort
         for i, chunk in enumerate(chunks):
@@ -28,4 +57,4 @@ class Reranker:
         return sorted_chunks[:top_k]
 
 # Singleton instance
-reranker = Reranker()
\ No newline at end of file
+reranker = Reranker(backend=settings.RERANKER_BACKEND, model_path=settings.RERANKER_MODEL_PATH or None)
\ No newline at end of file
@@ -1,20 +1,20 @@
 from typing import List, Dict, Any
 from app.rag.embedder import embedder
-from app.db.vector_db import vector_db_client
+from app.db.vector_db import async_vector_db_client
+from app.core.inference_executor import inference_executor
+from .query_cache import query_embedding_cache
 
 class VectorRetriever:
     async def retrieve(self, query: str, top_k: int = 50) -> List[Dict[str, Any]]:
         """
         Embeds a query and retrieves the top_k most semantically similar chunks.
         """
-        query_embedding = embedder.embed_texts([query])[0]
+        query_embedding = query_embedding_cache.get(query)
+        if query_embedding is None:
+            query_embedding = (await inference_executor.run(embedder.embed_texts, [query]))[0]
+            query_embedding_cache.put(query, query_embedding)
 
-        search_results = vector_db_client.client.search(
-            collection_name=vector_db_client.collection_name,
-            query_vector=query_embedding,
-            limit=top_k,
-            with_payload=True,
-        )
+        search_results = await async_vector_db_client.search(query_embedding, top_k=top_k)
 
         formatted_results = [
             {
@@ -0,0 +1,150 @@
+import zlib
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.rag.chunker import Chunker
+
+# Maps a batch of texts to the (start, end) character offsets of their tokens
+TokenizeFn = Callable[[List[str]], Sequence[Sequence[Tuple[int, int]]]]
+
+PAGE_SEPARATOR = "\n\n"
+
+# Number of trailing tokens whose texts decide whether a chunk may end after a token
+BOUNDARY_WINDOW = 4
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class TokenChunker:
+    """
+    Chunks documents by embedder tokens rather than characters.
+
+    All pages are joined into one text and tokenized in a single batched call (one
+    batch item per page) with the embedder's own tokenizer, so chunk sizes match
+    what the model actually sees. Chunks run across page boundaries instead of
+    leaving a short tail chunk at the end of every page; each chunk records the
+    pages it spans, starts `overlap_tokens` before the previous chunk's end and is
+    at most `chunk_tokens` tokens long. A final chunk shorter than `min_tail_tokens`
+    is merged into the previous one.
+
+    Chunk boundaries are content-defined: a chunk ends after the first token, at
+    least half a chunk in, whose rolling hash over the last `BOUNDARY_WINDOW` token
+    texts hits a target (or at the maximum length if none does). A boundary depends
+    only on the text around it, so an edit moves the boundaries next to it and the
+    rest of the document yields the same chunks as before, which lets a new version
+    reuse their stored embeddings.
+
+    Token hashes and boundary candidates are computed with numpy over the token
+    offset arrays, so the cost is linear in the document length.
+    """
+
+    def __init__(
+        self,
+        tokenize: TokenizeFn,
+        chunk_tokens: int = 200,
+        overlap_tokens: int = 32,
+        min_tail_tokens: int = 50,
+    ):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+        self.tokenize = tokenize
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tail_tokens = min_tail_tokens
+
+    def chunk_pages(self, page_texts: List[Dict]) -> List[Dict[str, Any]]:
+        pages = [page for page in page_texts if page["text"].strip()]
+        if not pages:
+            return []
+
+        # Join pages and remember where each one starts in the joined text
+        texts = [page["text"] for page in pages]
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        page_starts = np.concatenate(([0], np.cumsum(lengths + len(PAGE_SEPARATOR))[:-1]))
+        full_text = PAGE_SEPARATOR.join(texts)
+
+        # One batched tokenizer call; shift each page's offsets into joined-text coordinates
+        offsets = self.tokenize(texts)
+        token_counts = np.fromiter((len(page_offsets) for page_offsets in offsets), dtype=np.int64, count=len(texts))
+        if not token_counts.sum():
+            return []
+        flat = np.concatenate([np.asarray(page_offsets, dtype=np.int64).reshape(-1, 2) for page_offsets in offsets])
+        flat += np.repeat(page_starts, token_counts)[:, None]
+        token_starts, token_ends = flat[:, 0], flat[:, 1]
+
+        # Window bounds in token space
+        window_starts, window_ends = self._windows(full_text, token_starts, token_ends)
+
+        # Character spans and page spans for every window at once
+        char_starts = token_starts[window_starts]
+        char_ends = token_ends[window_ends - 1]
+        first_pages = np.searchsorted(page_starts, char_starts, side="right") - 1
+        last_pages = np.searchsorted(page_starts, char_ends - 1, side="right") - 1
+        page_numbers = np.fromiter((page["page_number"] for page in pages), dtype=np.int64, count=len(pages))
+        methods = [page.get("method") for page in pages]
+
+        chunks = []
+        for start, end, first, last, n_tokens in zip(
+            char_starts.tolist(),
+            char_ends.tolist(),
+            first_pages.tolist(),
+            last_pages.tolist(),
+            (window_ends - window_starts).tolist(),
+        ):
+            metadata = {
+                "page": int(page_numbers[first]),
+                "page_start": int(page_numbers[first]),
+                "page_end": int(page_numbers[last]),
+                "source": "text",
+                "token_count": n_tokens,
+            }
+            span_methods = set(methods[first : last + 1])
+            if len(span_methods) == 1 and None not in span_methods:
+                metadata["extraction"] = span_methods.pop()
+            chunks.append({"text": full_text[start:end], "metadata": metadata})
+        return chunks
+
+    def _windows(
+        self, full_text: str, token_starts: np.ndarray, token_ends: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the token-space [start, end) bounds of every chunk.
+        """
+        total = len(token_starts)
+        max_step = self.chunk_tokens - self.overlap_tokens
+        min_step = max(max_step // 2, 1)
+
+        # A token is a boundary candidate when the hash of its window of token texts is
+        # divisible by `max_step // 4`; crc32 keeps the hashes stable across processes
+        spans = zip(token_starts.tolist(), token_ends.tolist())
+        token_hashes = np.fromiter(
+            (zlib.crc32(full_text[start:end].encode()) for start, end in spans),
+            dtype=np.uint64,
+            count=total,
+        )
+        window_sums = np.cumsum(token_hashes)
+        window_sums[BOUNDARY_WINDOW:] -= window_sums[:-BOUNDARY_WINDOW].copy()
+        mixed = (window_sums * _HASH_MULTIPLIER) >> np.uint64(32)
+        candidates = np.flatnonzero(mixed % np.uint64(max(max_step // 4, 1)) == 0) + 1
+
+        cuts = []
+        start = 0
+        while total - start > max_step:
+            i = np.searchsorted(candidates, start + min_step)
+            end = int(candidates[i]) if i < len(candidates) and candidates[i] <= start + max_step else start + max_step
+            cuts.append(end)
+            start = end
+        if cuts and total - start < self.min_tail_tokens:
+            cuts.pop()
+        cuts.append(total)
+
+        window_ends = np.asarray(cuts, dtype=np.int64)
+        window_starts = np.concatenate(([0], np.maximum(window_ends[:-1] - self.overlap_tokens, 0)))
+        return window_starts, window_ends
+
+    def chunk_pages_and_tables(self, page_texts: List[Dict], tables: List[Dict]) -> List[Dict[str, Any]]:
+        """
+        Chunks the text of all pages together and adds tables as distinct chunks
+        (same table format as `Chunker`).
+        """
+        return self.chunk_pages(page_texts) + Chunker.table_chunks(tables)
@@ -0,0 +1,36 @@
+import re
+from typing import List, Literal
+
+from pydantic import BaseModel, model_validator
+
+# Drive file and folder ids are URL-safe base64-like tokens
+DRIVE_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class BulkManifestRequest(BaseModel):
+    # File paths relative to the server-side import root (settings.BULK_IMPORT_ROOT)
+    paths: List[str] = []
+    # Bucket prefixes to backfill, e.g. "s3://contracts/2024/"
+    s3_uris: List[str] = []
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if not self.paths and not self.s3_uris:
+            raise ValueError("A manifest needs at least one path or S3 URI")
+        if any(not uri.startswith("s3://") for uri in self.s3_uris):
+            raise ValueError("S3 URIs must look like s3://bucket/prefix")
+        return self
+
+
+class SyncSourceCreate(BaseModel):
+    connector: Literal["file", "s3", "drive"]
+    # Directory under the import root, s3://bucket/prefix, or a Drive folder id ("" for the whole drive)
+    location: str = ""
+
+    @model_validator(mode="after")
+    def check_location(self):
+        if self.connector == "s3" and not self.location.startswith("s3://"):
+            raise ValueError("S3 sources must look like s3://bucket/prefix")
+        if self.connector == "drive" and self.location and not DRIVE_ID_PATTERN.fullmatch(self.location):
+            raise ValueError("Drive sources must be a folder id (letters, digits, '-' and '_')")
+        return self
@@ -24,6 +24,86 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Model inference backends: "torch", "torch-int8" or "onnx" (see app/rag/inference_backends.py)
+    EMBEDDER_BACKEND: str = "torch"
+    EMBEDDER_MODEL_PATH: str = ""  # Local (e.g. ONNX-exported) model directory; defaults to the hub model
+    EMBEDDER_ONNX_FILE_NAME: str = ""  # e.g. "onnx/model_qint8_avx512_vnni.onnx"
+    RERANKER_BACKEND: str = "torch"
+    RERANKER_MODEL_PATH: str = ""
+    RERANKER_ONNX_FILE_NAME: str = ""
+
+    # Embedding
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_WAIT_MS: int = 50
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_LOCAL_SIZE: int = 50_000
+    EMBEDDING_CACHE_REDIS_TTL: int = 7 * 24 * 3600
+    EMBEDDING_CACHE_DTYPE: str = "float16"
+
+    # Query embedding cache (retrieval hot path)
+    QUERY_CACHE_MAX_ENTRIES: int = 10_000
+    QUERY_CACHE_TTL_SECONDS: int = 3600
+    QUERY_CACHE_WARMUP_LOG: str = ""  # Optional JSONL/plain-text query log replayed at API startup
+
+    # Chunking: "token" sizes chunks with the embedder's tokenizer across page boundaries,
+    # "character" is the original per-page RecursiveCharacterTextSplitter (500 chars, 50 overlap)
+    CHUNKER_STRATEGY: str = "token"
+    CHUNK_TOKENS: int = 200  # all-MiniLM-L6-v2 truncates at 256 tokens
+    CHUNK_OVERLAP_TOKENS: int = 32
+
+    # Chunk persistence: "values" (batched multi-row INSERT) or "copy" (PostgreSQL COPY)
+    CHUNK_INSERT_METHOD: str = "values"
+    CHUNK_INSERT_BATCH_SIZE: int = 1000
+
+    # Indexing: chunks are streamed from Postgres in batches through ES, embedding and Qdrant
+    INDEX_BATCH_SIZE: int = 256
+    INDEX_MAX_INFLIGHT_BATCHES: int = 2  # Batches whose ES/Qdrant writes may still be running
+
+    # Bulk ingestion: a batch is split into this many lanes that ingest their documents one at a time.
+    # Lanes run on the "batch_lanes" Celery queue; start a worker for it with this much concurrency.
+    BULK_INGEST_CONCURRENCY: int = 8
+    BULK_UPLOAD_MAX_FILES: int = 500  # Per multi-file upload request; larger imports go through a manifest
+    BULK_IMPORT_ROOT: str = "/app/imports"  # Manifest paths are resolved (and confined) under this directory
+    BULK_LANE_POLL_SECONDS: float = 2.0  # How often a lane checks whether its current document is done
+    BULK_LANE_DOCUMENT_TIMEOUT: int = 3600  # A lane moves on after waiting this long for one document
+    # A document left PROCESSING this long without any change (its worker died or its task was lost)
+    # counts as finished, so a new version can replace it
+    DOCUMENT_STALE_PROCESSING_SECONDS: int = 6 * 3600
+
+    # S3 connector (bucket backfills); S3_ENDPOINT_URL points at an S3-compatible store such as MinIO
+    S3_REGION: str = "us-east-1"
+    S3_ENDPOINT_URL: str = ""
+    S3_PART_SIZE: int = 8 * 1024 * 1024  # Objects larger than this are fetched as concurrent ranged GETs
+    S3_DOWNLOAD_CONCURRENCY: int = 8
+
+    # Source sync: registered sources (directory, S3 prefix, Drive folder) are re-crawled incrementally
+    SYNC_CONCURRENCY: int = 4  # Items downloaded into the upload store at once per sync
+    DRIVE_ACCESS_TOKEN: str = ""  # OAuth access token for the Drive connector
+
+    # Uploaded files are stored by content hash under this directory (shared by the API and workers)
+    UPLOAD_DIR: str = "/app/uploads"
+
+    # Ingestion pipeline: intermediate stage results are passed between tasks by reference
+    STAGE_STORE_DIR: str = "/app/uploads/.stages"
+    BROKER_PAYLOAD_STATS: bool = False  # Debug: measure every task message (one extra JSON encode per publish)
+    BROKER_PAYLOAD_WARN_BYTES: int = 64 * 1024  # With BROKER_PAYLOAD_STATS, log task messages larger than this
+
+    # Inference executor (blocking model / DB calls on the request path)
+    INFERENCE_MAX_WORKERS: int = 4
+    INFERENCE_MAX_QUEUE_DEPTH: int = 64
+
+    # OCR
+    OCR_ENGINE: str = "tesseract"  # "tesseract", "rapidocr" or "auto" (see app/rag/ocr/engine_registry.py)
+    OCR_MIN_CONFIDENCE: float = 0.75  # "auto": pages below this confidence are retried with the other engine
+    OCR_DPI: int = 200
+    OCR_PAGE_WINDOW: int = 1  # Pages rendered per pdf2image call; peak memory grows with this, not page count
+    OCR_WORKERS: int = 0  # Page shards OCR'd in parallel per document; 0 = one per CPU core
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_DIR: str = "/app/uploads/.ocr_cache"  # On the uploads volume, shared by all workers
+    TABLE_WORKERS: int = 0  # Processes for table extraction across candidate pages; 0 = one per CPU core
+    TEXT_LAYER_MIN_CHARS: int = 20  # Pages with less extractable text than this are OCR'd
+    TEXT_LAYER_MIN_QUALITY: float = 0.9  # ...as are pages whose text layer is mostly unmapped glyphs
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
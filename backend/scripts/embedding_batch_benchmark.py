@@ -0,0 +1,62 @@
+import argparse
+import threading
+import time
+
+from app.rag.embedder import embedder
+from app.rag.embedding_batcher import EmbeddingBatcher
+
+
+def make_documents(num_documents: int, chunks_per_document: int):
+    return [
+        [f"Document {d} chunk {c}: quarterly report summary and legal footer text." for c in range(chunks_per_document)]
+        for d in range(num_documents)
+    ]
+
+
+def run_per_document(documents):
+    """Baseline: every document is encoded on its own, like the original index task."""
+    start = time.perf_counter()
+    for texts in documents:
+        embedder.embed_texts(texts)
+    return time.perf_counter() - start
+
+
+def run_batched(documents, batch_size: int, max_wait_ms: int):
+    """Every document is submitted concurrently through a shared batcher."""
+    batcher = EmbeddingBatcher(embedder, max_batch_size=batch_size, max_wait_ms=max_wait_ms)
+    threads = [threading.Thread(target=batcher.embed, args=(texts,)) for texts in documents]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, batcher.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding throughput at different batch sizes.")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--chunks-per-document", type=int, default=3)
+    parser.add_argument("--batch-sizes", type=str, default="8,16,32,64,128,256")
+    parser.add_argument("--max-wait-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents, args.chunks_per_document)
+    total_chunks = args.documents * args.chunks_per_document
+
+    embedder.warmup()
+
+    elapsed = run_per_document(documents)
+    print(f"{'per-document':>14} | {total_chunks / elapsed:10.1f} chunks/sec | {elapsed:7.2f}s")
+
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        elapsed, stats = run_batched(documents, batch_size, args.max_wait_ms)
+        print(
+            f"{'batch=' + str(batch_size):>14} | {total_chunks / elapsed:10.1f} chunks/sec | {elapsed:7.2f}s "
+            f"| {stats['batches']} batches, avg {stats['avg_batch_size']} texts"
+        )
+
+
+if __name__ == "__main__":
+    main()
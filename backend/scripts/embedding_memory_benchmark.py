@@ -0,0 +1,75 @@
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+
+import numpy as np
+from qdrant_client.http.models import Batch, PointStruct
+
+from app.rag.embedder import quantize_vectors
+
+DIM = 384
+UPSERT_BATCH_SIZE = 256
+
+
+def make_vectors(num_chunks: int, with_model: bool) -> np.ndarray:
+    if not with_model:
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((num_chunks, DIM)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    from app.rag.embedder import Embedder
+
+    texts = [f"Chunk {i}: quarterly report summary and legal footer text." for i in range(num_chunks)]
+    return Embedder().embed_array(texts)
+
+
+def list_and_point_structs(vectors: np.ndarray, ids, payloads):
+    """Old path: every vector becomes a list of Python floats wrapped in its own PointStruct."""
+    embeddings = vectors.tolist()
+    return [PointStruct(id=i, vector=v, payload=p) for i, v, p in zip(ids, embeddings, payloads)]
+
+
+def array_and_batches(vectors: np.ndarray, ids, payloads):
+    """New path: one float32 array; only the slice being sent is converted to lists."""
+    batches = 0
+    for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+        end = start + UPSERT_BATCH_SIZE
+        Batch(ids=ids[start:end], vectors=vectors[start:end].tolist(), payloads=payloads[start:end])
+        batches += 1
+    return batches
+
+
+def measure(label: str, fn, *args):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:>24} | peak {peak / 1024 / 1024:8.1f} MiB | {elapsed:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak Python memory of the embedding -> Qdrant upsert path.")
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--with-model", action="store_true", help="Encode real texts instead of random vectors")
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.chunks, args.with_model)
+    ids = [str(uuid.uuid4()) for _ in range(args.chunks)]
+    payloads = [{"chunk_index": i} for i in range(args.chunks)]
+
+    print(f"{args.chunks} chunks x {DIM} dims")
+    for dtype in ("float32", "float16", "int8"):
+        print(f"{'ndarray ' + dtype:>24} | {quantize_vectors(vectors, dtype).nbytes / 1024 / 1024:8.1f} MiB")
+
+    measure("list + PointStruct", list_and_point_structs, vectors, ids, payloads)
+    measure("ndarray + Batch", array_and_batches, vectors, ids, payloads)
+
+
+if __name__ == "__main__":
+    main()
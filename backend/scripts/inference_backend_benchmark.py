@@ -0,0 +1,127 @@
+import argparse
+import gc
+import resource
+import statistics
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from app.rag.embedder import DEFAULT_MODEL_NAME
+from app.rag.inference_backends import (
+    SUPPORTED_BACKENDS,
+    cosine_drift,
+    load_cross_encoder,
+    load_sentence_transformer,
+    rank_agreement,
+)
+
+RERANKER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+QUERIES = [
+    "What is the refund policy for enterprise customers?",
+    "How do I rotate the API keys?",
+    "Which regions is the service deployed in?",
+    "Who approves security exceptions?",
+]
+PASSAGES = [
+    f"Section {i}: {topic}"
+    for i, topic in enumerate(
+        [
+            "Enterprise customers may request a refund within 30 days of purchase.",
+            "API keys can be rotated from the admin console under Security settings.",
+            "The service is deployed in us-east-1, eu-west-1 and ap-south-1.",
+            "Security exceptions must be approved by the CISO and recorded in the audit log.",
+            "Invoices are issued monthly and payable within 45 days.",
+            "Support is available 24/7 for premium plans.",
+        ]
+        * 8
+    )
+]
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), falling back to peak RSS elsewhere."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def time_calls(fn, repeats: int):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def bench_embedder(backend: str, model_path: str, repeats: int, reference: np.ndarray):
+    gc.collect()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    model: SentenceTransformer = load_sentence_transformer(DEFAULT_MODEL_NAME, backend=backend, model_path=model_path)
+    load_s = time.perf_counter() - start
+    rss_delta = rss_mb() - rss_before
+
+    p50, worst = time_calls(lambda: model.encode(PASSAGES, batch_size=32), repeats)
+    vectors = model.encode(PASSAGES, batch_size=32)
+    drift = cosine_drift(reference, vectors) if reference is not None else {}
+    return {"load_s": load_s, "rss_mb": rss_delta, "p50_ms": p50, "max_ms": worst, **drift}, vectors
+
+
+def bench_reranker(backend: str, model_path: str, repeats: int, reference_scores):
+    gc.collect()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    model = load_cross_encoder(RERANKER_MODEL_NAME, backend=backend, model_path=model_path)
+    load_s = time.perf_counter() - start
+    rss_delta = rss_mb() - rss_before
+
+    def score_all():
+        return [model.predict([(q, p) for p in PASSAGES]) for q in QUERIES]
+
+    p50, worst = time_calls(score_all, repeats)
+    scores = score_all()
+    agreement = rank_agreement(reference_scores, scores) if reference_scores is not None else {}
+    return {"load_s": load_s, "rss_mb": rss_delta, "p50_ms": p50, "max_ms": worst, **agreement}, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, RAM and parity of embedder/reranker inference backends.")
+    parser.add_argument("--backends", type=str, default=",".join(SUPPORTED_BACKENDS))
+    parser.add_argument("--embedder-onnx-path", type=str, default=None, help="Local ONNX-exported embedder directory")
+    parser.add_argument("--reranker-onnx-path", type=str, default=None, help="Local ONNX-exported reranker directory")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    backends = [b for b in args.backends.split(",") if b]
+    if "torch" in backends:
+        backends.remove("torch")
+    backends.insert(0, "torch")  # torch output is the parity reference
+
+    reference_vectors = None
+    reference_scores = None
+    print("--- Embedder ---")
+    for backend in backends:
+        path = args.embedder_onnx_path if backend == "onnx" else None
+        result, vectors = bench_embedder(backend, path, args.repeats, reference_vectors)
+        reference_vectors = vectors if backend == "torch" else reference_vectors
+        print(backend, {k: round(v, 5) for k, v in result.items()})
+
+    print("--- Reranker ---")
+    for backend in backends:
+        path = args.reranker_onnx_path if backend == "onnx" else None
+        result, scores = bench_reranker(backend, path, args.repeats, reference_scores)
+        reference_scores = scores if backend == "torch" else reference_scores
+        print(backend, {k: round(v, 5) for k, v in result.items()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import time
+
+from app.rag.ocr.engine_registry import OCR_ENGINES
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "scanned_sample.pdf")
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def character_accuracy(reference: str, candidate: str) -> float:
+    """1 - character error rate, on whitespace-normalised text."""
+    reference = " ".join(reference.split())
+    candidate = " ".join(candidate.split())
+    if not reference:
+        return 1.0 if not candidate else 0.0
+    return max(0.0, 1.0 - edit_distance(reference, candidate) / len(reference))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR engines on speed and character accuracy.")
+    parser.add_argument("--pdf", default=SAMPLE_PDF)
+    parser.add_argument("--reference", help="Ground-truth text file (pages separated by form feeds)")
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per engine (after one warm-up run)")
+    args = parser.parse_args()
+
+    reference_pages = None
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            reference_pages = f.read().split("\f")
+
+    outputs = {}
+    for name, engine_class in OCR_ENGINES.items():
+        engine = engine_class(dpi=args.dpi)
+        images = engine.render(args.pdf, 1, engine.page_count(args.pdf))
+        engine.ocr_image(images[0])  # Warm-up (model load)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = [engine.ocr_image(image) for image in images]
+        elapsed = time.perf_counter() - start
+
+        outputs[name] = [text for text, _ in results]
+        confidence = sum(c for _, c in results) / len(results)
+        line = f"{name:>10} | {len(images) * args.repeat / elapsed:6.2f} pages/sec | mean confidence {confidence:.3f}"
+        if reference_pages:
+            accuracy = sum(character_accuracy(r, t) for r, t in zip(reference_pages, outputs[name])) / len(images)
+            line += f" | char accuracy {accuracy:.3f}"
+        print(line)
+
+        for image in images:
+            image.close()
+
+    if not reference_pages and len(outputs) == 2:
+        first, second = outputs.values()
+        agreement = sum(character_accuracy(a, b) for a, b in zip(first, second)) / len(first)
+        print(f"No --reference given; cross-engine character agreement: {agreement:.3f}")
+
+
+if __name__ == "__main__":
+    main()
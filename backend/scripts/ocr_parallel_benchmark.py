@@ -0,0 +1,48 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pdf2image import convert_from_path
+
+from app.rag.ocr.tesseract_engine import TesseractEngine
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "scanned_sample.pdf")
+
+
+def replicate_pdf(source: str, pages: int, output_path: str, dpi: int = 200) -> str:
+    """Builds an N-page scanned PDF by repeating the pages of `source`."""
+    images = convert_from_path(source, dpi=dpi)
+    repeated = [images[i % len(images)] for i in range(pages)]
+    repeated[0].save(output_path, save_all=True, append_images=repeated[1:], resolution=dpi)
+    for image in images:
+        image.close()
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wall-clock OCR time versus number of parallel page shards.")
+    parser.add_argument("--source", default=SAMPLE_PDF)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--workers", type=str, default=f"1,2,4,{os.cpu_count()}")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = replicate_pdf(args.source, args.pages, os.path.join(tmp, "replicated.pdf"))
+        engine = TesseractEngine()
+        print(f"{args.pages} pages from {os.path.basename(args.source)}, {os.cpu_count()} cores")
+
+        baseline = None
+        for workers in sorted({int(w) for w in args.workers.split(",")}):
+            start = time.perf_counter()
+            results = engine.ocr_pdf_parallel(pdf_path, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"workers={workers:>3} | {elapsed:7.2f}s | {len(results) / elapsed:6.2f} pages/sec "
+                f"| speedup {baseline / elapsed:4.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+from fastapi import FastAPI, File, Request, UploadFile
+
+from app.rag.ingest.upload_store import UploadStore
+
+
+def build_app(upload_dir: str) -> FastAPI:
+    app = FastAPI()
+    store = UploadStore(upload_dir)
+
+    @app.post("/buffered")
+    async def buffered(file: UploadFile = File(...)):
+        # Baseline: what upload_document used to do
+        contents = await file.read()
+        sha256_hash = hashlib.sha256(contents).hexdigest()
+        with open(os.path.join(upload_dir, sha256_hash), "wb") as f:
+            f.write(contents)
+        return {"sha256": sha256_hash, "size_bytes": len(contents)}
+
+    @app.post("/multipart")
+    async def multipart(file: UploadFile = File(...)):
+        return await store.save_upload(file)
+
+    @app.post("/stream")
+    async def stream(request: Request):
+        return await store.save_stream(request.stream())
+
+    return app
+
+
+async def body_chunks(size_bytes: int, chunk_size: int = 256 * 1024):
+    block = os.urandom(chunk_size)
+    sent = 0
+    while sent < size_bytes:
+        n = min(chunk_size, size_bytes - sent)
+        sent += n
+        yield block[:n]
+
+
+def multipart_body(size_bytes: int, boundary: str):
+    async def gen():
+        yield (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.bin\"\r\n"
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        async for chunk in body_chunks(size_bytes):
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    return gen()
+
+
+async def run_mode(app: FastAPI, mode: str, uploads: int, size_bytes: int):
+    boundary = "benchmarkboundary"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def one():
+            if mode == "stream":
+                response = await client.post("/stream", content=body_chunks(size_bytes))
+            else:
+                response = await client.post(
+                    f"/{mode}",
+                    content=multipart_body(size_bytes, boundary),
+                    headers={"content-type": f"multipart/form-data; boundary={boundary}"},
+                )
+            response.raise_for_status()
+            return response.json()
+
+        return await asyncio.gather(*(one() for _ in range(uploads)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Peak Python memory for parallel large uploads: "
+            "buffered read vs chunked streaming to the upload store."
+        )
+    )
+    parser.add_argument("--uploads", type=int, default=4, help="Concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=32, help="Size of each upload")
+    args = parser.parse_args()
+
+    size_bytes = args.size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as upload_dir:
+        app = build_app(upload_dir)
+        for mode in ("buffered", "multipart", "stream"):
+            tracemalloc.start()
+            start = time.perf_counter()
+            results = asyncio.run(run_mode(app, mode, args.uploads, size_bytes))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert all(result["size_bytes"] == size_bytes for result in results)
+            total_mb = args.uploads * args.size_mb
+            print(
+                f"{mode:>10} | {args.uploads} x {args.size_mb} MiB | peak {peak / 2**20:8.1f} MiB "
+                f"| {total_mb / elapsed:7.1f} MiB/s"
+            )
+            for name in os.listdir(upload_dir):
+                os.remove(os.path.join(upload_dir, name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.inference_executor import InferenceExecutor, InferenceQueueFullError
+
+
+def _blocking_call(seconds: float) -> str:
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_blocking_calls_overlap():
+    """
+    Tests that blocking calls submitted concurrently run in parallel on the pool
+    instead of serialising on the event loop.
+    """
+    executor = InferenceExecutor(max_workers=4, max_queue_depth=4)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[executor.run(_blocking_call, 0.2) for _ in range(4)])
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.6  # Serial execution would take ~0.8s
+    assert all(name.startswith("inference") for name in results)
+    assert executor.get_stats()["completed"] == 4
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_limit_rejects_excess_calls():
+    executor = InferenceExecutor(max_workers=1, max_queue_depth=1)
+
+    running = [asyncio.create_task(executor.run(_blocking_call, 0.2)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceQueueFullError):
+        await executor.run(_blocking_call, 0.0)
+
+    await asyncio.gather(*running)
+    assert executor.get_stats()["rejected"] == 1
+    executor.shutdown()
@@ -0,0 +1,143 @@
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.chunk_store import (
+    apply_chunk_diff,
+    build_chunk_rows,
+    bulk_insert_chunks,
+    content_hash,
+    delete_chunks,
+    diff_chunk_rows,
+    iter_chunk_batches,
+)
+
+
+def _chunks(count):
+    return [{"text": f"chunk {i}", "metadata": {"page": 1}} for i in range(count)]
+
+
+def test_rows_get_client_side_ids_and_indexes():
+    document_id = uuid.uuid4()
+    rows = build_chunk_rows(document_id, _chunks(3), start_index=10)
+
+    assert [row["chunk_index"] for row in rows] == [10, 11, 12]
+    assert len({row["id"] for row in rows}) == 3
+    assert all(row["document_id"] == document_id for row in rows)
+
+
+def test_values_method_inserts_in_batches_and_returns_ids():
+    db = MagicMock()
+    rows = build_chunk_rows(uuid.uuid4(), _chunks(2500))
+
+    ids = bulk_insert_chunks(db, rows, method="values", batch_size=1000)
+
+    assert ids == [row["id"] for row in rows]
+    assert [len(c.args[1]) for c in db.execute.call_args_list] == [1000, 1000, 500]
+    assert "INSERT INTO chunks" in str(db.execute.call_args_list[0].args[0])
+    db.add.assert_not_called()
+
+
+def test_copy_method_streams_rows_through_copy():
+    db = MagicMock()
+    cursor = db.connection.return_value.connection.driver_connection.cursor.return_value.__enter__.return_value
+    copy = cursor.copy.return_value.__enter__.return_value
+    rows = build_chunk_rows(uuid.uuid4(), _chunks(3))
+
+    bulk_insert_chunks(db, rows, method="copy")
+
+    assert cursor.copy.call_args.args[0].startswith("COPY chunks (id, document_id, chunk_index, text")
+    assert copy.write_row.call_count == 3
+    assert copy.write_row.call_args_list[0].args[0][4] == '{"page": 1}'
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        bulk_insert_chunks(MagicMock(), [], method="orm")
+
+
+def test_iter_chunk_batches_streams_partitions_with_yield_per():
+    document_id = uuid.uuid4()
+    rows = [MagicMock(id=uuid.uuid4(), chunk_index=i, text=f"chunk {i}", chunk_metadata={"page": i}) for i in range(5)]
+    db = MagicMock()
+    db.execute.return_value.partitions.return_value = iter([rows[:2], rows[2:4], rows[4:]])
+
+    batches = list(iter_chunk_batches(db, document_id, batch_size=2))
+
+    statement = db.execute.call_args.args[0]
+    assert statement.get_execution_options()["yield_per"] == 2
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0] == {"chunk_id": str(rows[0].id), "chunk_index": 0, "text": "chunk 0", "metadata": {"page": 0}}
+
+
+def test_iter_chunk_batches_binds_chunk_ids_as_one_array_parameter():
+    chunk_ids = [str(uuid.uuid4()) for _ in range(70_000)]
+    db = MagicMock()
+    db.execute.return_value.partitions.return_value = iter([])
+
+    list(iter_chunk_batches(db, uuid.uuid4(), chunk_ids=chunk_ids))
+
+    compiled = db.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    assert "= ANY (" in str(compiled)
+    assert len(compiled.params) == 2  # document_id and the id array
+    assert compiled.params["chunk_ids"] == [uuid.UUID(chunk_id) for chunk_id in chunk_ids]
+
+def test_diff_keeps_unchanged_chunks_by_content_hash():
+    document_id = uuid.uuid4()
+    old_ids = [uuid.uuid4() for _ in range(4)]
+    existing = [
+        (old_ids[0], content_hash("intro")),
+        (old_ids[1], content_hash("clause")),
+        (old_ids[2], content_hash("clause")),  # Repeated boilerplate
+        (old_ids[3], content_hash("obsolete")),
+    ]
+    new_chunks = [{"text": t, "metadata": {"page": i}} for i, t in enumerate(["intro", "new section", "clause"])]
+    rows = build_chunk_rows(document_id, new_chunks)
+
+    diff = diff_chunk_rows(existing, rows)
+
+    assert [row["id"] for row in diff.kept] == [old_ids[0], old_ids[1]]
+    assert [row["chunk_index"] for row in diff.kept] == [0, 2]  # Re-numbered to the new positions
+    assert [row["text"] for row in diff.added] == ["new section"]
+    assert diff.removed_ids == [old_ids[2], old_ids[3]]
+    assert diff.get_stats() == {"added": 1, "kept": 2, "removed": 2}
+
+
+def test_diff_replaces_chunks_stored_without_a_hash():
+    old_id = uuid.uuid4()
+    rows = build_chunk_rows(uuid.uuid4(), _chunks(1))
+
+    diff = diff_chunk_rows([(old_id, None)], rows)
+
+    assert diff.added == rows
+    assert diff.removed_ids == [old_id]
+
+
+def test_apply_chunk_diff_updates_and_inserts_in_bulk_and_keeps_removed_rows():
+    document_id = uuid.uuid4()
+    old_ids = [uuid.uuid4() for _ in range(3)]
+    rows = build_chunk_rows(document_id, _chunks(2))
+    existing = [(old_ids[0], rows[0]["content_hash"]), (old_ids[1], "stale"), (old_ids[2], "stale")]
+    diff = diff_chunk_rows(existing, rows)
+    db = MagicMock()
+
+    added_ids = apply_chunk_diff(db, diff, batch_size=1)
+
+    statements = [str(c.args[0]) for c in db.execute.call_args_list]
+    assert [s.split()[0] for s in statements] == ["UPDATE", "INSERT"]
+    assert db.execute.call_args_list[0].args[1] == [
+        {"kept_id": old_ids[0], "kept_index": 0, "kept_metadata": {"page": 1}}
+    ]
+    assert added_ids == [rows[1]["id"]]
+
+
+def test_delete_chunks_runs_in_batches():
+    db = MagicMock()
+    ids = [uuid.uuid4() for _ in range(3)]
+
+    assert delete_chunks(db, [str(i) for i in ids], batch_size=2) == 3
+
+    statements = [str(c.args[0]) for c in db.execute.call_args_list]
+    assert [s.split()[0] for s in statements] == ["DELETE", "DELETE"]
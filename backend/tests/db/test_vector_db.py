@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.db.vector_db import VectorDBClient, plan_batches
+
+
+def _client() -> VectorDBClient:
+    client = VectorDBClient()
+    client.client = MagicMock()
+    return client
+
+
+def _points(count: int, dim: int = 4):
+    ids = [f"id-{i}" for i in range(count)]
+    vectors = np.arange(count * dim, dtype=np.float32).reshape(count, dim)
+    payloads = [{"chunk_index": i, "text": "x"} for i in range(count)]
+    return ids, vectors, payloads
+
+
+def test_plan_batches_bounds_count_and_bytes():
+    """
+    Tests that batches respect both the point count and the approximate byte budget.
+    """
+    payloads = [{"text": "a" * 100}] * 10
+    assert plan_batches(payloads, dim=4, batch_size=4, max_batch_bytes=10**6) == [(0, 4), (4, 8), (8, 10)]
+    # Each point is ~160 bytes, so a 400-byte budget fits two per batch
+    expected = [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10)]
+    assert plan_batches(payloads, dim=4, batch_size=100, max_batch_bytes=400) == expected
+
+
+def test_upsert_vectors_sends_every_point_once_and_waits_for_visibility(monkeypatch):
+    """
+    Tests that parallel wait=False batches cover every point, and the call only
+    returns once a count of the sent ids sees all of them.
+    """
+    monkeypatch.setattr("app.db.vector_db.time.sleep", lambda _: None)
+    client = _client()
+    client.client.count.side_effect = [MagicMock(count=7), MagicMock(count=10)]
+    ids, vectors, payloads = _points(10)
+
+    stats = client.upsert_vectors(ids, vectors, payloads, batch_size=3, parallel=3, wait=False)
+
+    calls = client.client.upsert.call_args_list
+    sent = [point_id for call in calls for point_id in call.kwargs["points"].ids]
+    assert stats["batches"] == 4
+    assert sorted(sent) == ids
+    assert all(call.kwargs["wait"] is False for call in calls)
+    assert client.client.count.call_count == 2
+    assert client.client.count.call_args.kwargs["exact"] is True
+
+
+def test_upsert_vectors_waits_for_every_batch_by_default():
+    client = _client()
+    ids, vectors, payloads = _points(5)
+
+    client.upsert_vectors(ids, vectors, payloads, batch_size=2, parallel=2)
+
+    assert all(call.kwargs["wait"] is True for call in client.client.upsert.call_args_list)
+    client.client.count.assert_not_called()
+
+
+def test_upsert_vectors_retries_failed_batches(monkeypatch):
+    """
+    Tests that a transient failure is retried and counted.
+    """
+    monkeypatch.setattr("app.db.vector_db.time.sleep", lambda _: None)
+    client = _client()
+    client.client.upsert.side_effect = [ConnectionError("reset"), None]
+    ids, vectors, payloads = _points(2)
+
+    stats = client.upsert_vectors(ids, vectors, payloads, batch_size=10, parallel=1, wait=True)
+
+    assert stats["retries"] == 1
+    assert client.client.upsert.call_count == 2
+
+
+def test_upsert_vectors_raises_after_exhausting_retries(monkeypatch):
+    monkeypatch.setattr("app.db.vector_db.time.sleep", lambda _: None)
+    client = _client()
+    client.client.upsert.side_effect = ConnectionError("down")
+    ids, vectors, payloads = _points(2)
+
+    with pytest.raises(ConnectionError):
+        client.upsert_vectors(ids, vectors, payloads, parallel=1, wait=True)
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.rag.index.streaming_indexer import StreamingIndexer
+
+
+def _batches(num_batches, batch_size, fetched):
+    for b in range(num_batches):
+        fetched.append(b)
+        yield [
+            {
+                "chunk_id": f"c{b}-{i}",
+                "chunk_index": b * batch_size + i,
+                "text": f"chunk {b}-{i}",
+                "metadata": {"page": b},
+            }
+            for i in range(batch_size)
+        ]
+
+
+class SlowSinks:
+    """Records what each sink saw and how many batches were unfinished at once."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.active_upserts = 0
+        self.max_active_upserts = 0
+        self.es_calls = []
+        self.upsert_calls = []
+
+    def _enter(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _exit(self):
+        with self.lock:
+            self.active -= 1
+
+    def index_chunks(self, chunks):
+        self._enter()
+        time.sleep(self.delay)
+        self.es_calls.append(chunks)
+        self._exit()
+
+    def embed(self, texts):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    def upsert_vectors(self, ids, vectors, payloads):
+        self._enter()
+        with self.lock:
+            self.active_upserts += 1
+            self.max_active_upserts = max(self.max_active_upserts, self.active_upserts)
+        time.sleep(self.delay)
+        self.upsert_calls.append((ids, vectors, payloads))
+        with self.lock:
+            self.active_upserts -= 1
+        self._exit()
+        return {"retries": 1}
+
+
+def test_streaming_indexer_sends_every_batch_to_both_sinks_in_order():
+    sinks = SlowSinks(delay=0)
+    fetched = []
+    indexer = StreamingIndexer(sinks, sinks.embed, sinks, max_inflight_batches=2)
+
+    stats = indexer.index("doc-1", _batches(5, 3, fetched))
+
+    assert stats["batches"] == 5
+    assert stats["chunks"] == 15
+    assert stats["upsert_retries"] == 5
+    assert [c["chunk_id"] for call in sinks.es_calls for c in call] == [f"c{b}-{i}" for b in range(5) for i in range(3)]
+    assert [i for ids, _, _ in sinks.upsert_calls for i in ids] == [f"c{b}-{i}" for b in range(5) for i in range(3)]
+
+    ids, vectors, payloads = sinks.upsert_calls[0]
+    assert vectors.shape == (3, 4)
+    assert payloads[0] == {"document_id": "doc-1", "text": "chunk 0-0", "chunk_index": 0, "metadata": {"page": 0}}
+    assert sinks.es_calls[0][0]["metadata"] == {"document_id": "doc-1", "chunk_index": 0}
+
+
+def test_streaming_indexer_bounds_batches_in_flight():
+    """
+    Tests that fetching runs ahead of slow sinks by at most `max_inflight_batches`.
+    """
+    sinks = SlowSinks(delay=0.02)
+    fetched = []
+    seen_lag = []
+    indexer = StreamingIndexer(sinks, sinks.embed, sinks, max_inflight_batches=2)
+
+    original_embed = sinks.embed
+
+    def embed(texts):
+        # Batches fetched so far minus batches fully written by both sinks
+        seen_lag.append(len(fetched) - min(len(sinks.es_calls), len(sinks.upsert_calls)))
+        return original_embed(texts)
+
+    indexer.embed = embed
+    stats = indexer.index("doc-1", _batches(8, 2, fetched))
+
+    assert stats["max_inflight"] == 2
+    assert max(seen_lag) <= 3  # The batch being embedded plus two unfinished ones
+    assert sinks.max_active == 2  # ES and Qdrant writes overlap
+
+
+def test_streaming_indexer_propagates_sink_errors():
+    class FailingES(SlowSinks):
+        def index_chunks(self, chunks):
+            raise RuntimeError("es down")
+
+    sinks = FailingES(delay=0)
+    indexer = StreamingIndexer(sinks, sinks.embed, sinks, max_inflight_batches=1)
+
+    with pytest.raises(RuntimeError, match="es down"):
+        indexer.index("doc-1", _batches(4, 2, []))
+
+
+def test_streaming_indexer_with_no_chunks():
+    sinks = SlowSinks(delay=0)
+    stats = StreamingIndexer(sinks, sinks.embed, sinks).index("doc-1", iter([[]]))
+
+    assert stats["chunks"] == 0
+    assert not sinks.es_calls and not sinks.upsert_calls
+
+
+def test_upserts_of_several_batches_overlap_with_upsert_workers():
+    """
+    Tests that a batch that fits one Qdrant request does not serialize the upserts:
+    with several upsert workers, batches' upserts run concurrently.
+    """
+    sinks = SlowSinks(delay=0.05)
+    indexer = StreamingIndexer(sinks, sinks.embed, sinks, max_inflight_batches=4, upsert_workers=4)
+
+    stats = indexer.index("doc-1", _batches(8, 2, []))
+
+    assert stats["chunks"] == 16
+    assert sorted(ids[0] for ids, _, _ in sinks.upsert_calls) == [f"c{b}-0" for b in range(8)]
+    assert 1 < sinks.max_active_upserts <= 4
+
+
+def test_a_single_upsert_worker_never_overlaps_upserts():
+    sinks = SlowSinks(delay=0.01)
+    StreamingIndexer(sinks, sinks.embed, sinks, max_inflight_batches=4).index("doc-1", _batches(6, 2, []))
+
+    assert sinks.max_active_upserts == 1
@@ -0,0 +1,93 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.document import Document, DocumentStatus
+from app.rag.ingest.bulk_ingest import (
+    bump_document_version,
+    dedupe_files,
+    hash_file,
+    import_file,
+    ingestion_finished,
+    resolve_manifest_path,
+    split_lanes,
+    summarize_batch_progress,
+)
+from app.rag.ingest.upload_store import UploadStore
+
+
+def test_import_file_hashes_in_blocks_and_stores_by_content(tmp_path):
+    source = tmp_path / "contract.pdf"
+    source.write_bytes(b"x" * (3 * 1024 * 1024 + 7))
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+
+    file = import_file(str(source), UploadStore(str(uploads)))
+
+    expected = hashlib.sha256(source.read_bytes()).hexdigest()
+    assert file == {"filename": "contract.pdf", "sha256": expected, "size_bytes": 3 * 1024 * 1024 + 7}
+    assert hash_file(str(uploads / expected), read_size=4096) == expected
+    assert os.listdir(uploads) == [expected]  # No temp file left behind
+    assert import_file(str(source), UploadStore(str(uploads)))["sha256"] == expected
+    assert os.listdir(uploads) == [expected]
+
+
+def test_manifest_paths_are_confined_to_the_import_root(tmp_path):
+    (tmp_path / "archive").mkdir()
+    (tmp_path / "archive" / "a.txt").write_text("a")
+    (tmp_path / "secret.txt").write_text("s")
+    root = str(tmp_path / "archive")
+
+    assert resolve_manifest_path(root, "a.txt") == str(tmp_path / "archive" / "a.txt")
+    assert resolve_manifest_path(root, "/a.txt") == str(tmp_path / "archive" / "a.txt")
+    with pytest.raises(ValueError):
+        resolve_manifest_path(root, "../secret.txt")
+    with pytest.raises(ValueError):
+        resolve_manifest_path(root, "missing.txt")
+
+
+def test_dedupe_skips_known_and_repeated_hashes():
+    files = [{"sha256": h} for h in ["a", "b", "a", "c"]]
+
+    new, skipped = dedupe_files(files, existing_hashes={"c"})
+
+    assert [f["sha256"] for f in new] == ["a", "b"]
+    assert [f["sha256"] for f in skipped] == ["a", "c"]
+
+
+def test_split_lanes_bounds_the_number_of_lanes():
+    assert split_lanes(list(range(10)), 4) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert split_lanes([1, 2], 8) == [[1], [2]]
+    assert split_lanes([], 8) == []
+
+
+def test_batch_progress_counts_indexed_and_failed_as_finished():
+    progress = summarize_batch_progress(10, {"indexed": 6, "failed": 1, "processing": 3})
+
+    assert progress["finished"] == 7
+    assert progress["progress"] == 0.7
+    assert progress["counts"]["pending"] == 0
+    assert not progress["done"]
+    assert summarize_batch_progress(2, {"indexed": 2})["done"]
+
+
+def test_bump_document_version_resets_the_document_for_reingestion():
+    document = Document(sha256="old", version=2, filename="a.pdf", status=DocumentStatus.INDEXED, source_etag="e1")
+
+    previous = bump_document_version(document, {"sha256": "new", "size_bytes": 10, "etag": "e2"})
+
+    assert previous == "old"
+    assert (document.sha256, document.version, document.status) == ("new", 3, DocumentStatus.PENDING)
+    assert (document.filename, document.source_etag, document.size_bytes) == ("a.pdf", "e2", 10)
+
+
+def test_documents_stuck_processing_count_as_finished_once_stale():
+    now = datetime.utcnow()
+
+    assert ingestion_finished(DocumentStatus.FAILED, now, stale_after=3600)
+    assert not ingestion_finished(DocumentStatus.PROCESSING, now - timedelta(minutes=5), stale_after=3600)
+    assert ingestion_finished(DocumentStatus.PROCESSING, now - timedelta(hours=2), stale_after=3600)
+    # Queued documents may legitimately wait behind a long batch
+    assert not ingestion_finished(DocumentStatus.PENDING, now - timedelta(hours=2), stale_after=3600)
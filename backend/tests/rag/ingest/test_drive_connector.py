@@ -0,0 +1,117 @@
+import hashlib
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.rag.ingest.drive_connector import DriveConnector
+from app.rag.ingest.sync_engine import SyncEngine
+from app.rag.ingest.upload_store import UploadStore
+from app.schemas.document import SyncSourceCreate
+
+FOLDER = "folder-1"
+
+
+def _file(file_id, name, mime_type="application/pdf", parents=(FOLDER,), **extra):
+    return {
+        "id": file_id,
+        "name": name,
+        "mimeType": mime_type,
+        "modifiedTime": "2024-05-01T10:00:00.000Z",
+        "parents": list(parents),
+        **extra,
+    }
+
+
+class FakeDrive:
+    """Minimal Drive v3 API: a file listing, a change log and file contents."""
+
+    def __init__(self):
+        self.files = [
+            _file("f1", "contract.pdf", md5Checksum="md5-1", size="8"),
+            _file("f2", "Board notes", mime_type="application/vnd.google-apps.document"),
+            _file("f3", "survey", mime_type="application/vnd.google-apps.form"),
+        ]
+        self.changes = []
+        self.content = {"f1": b"contract", "f4": b"new file"}
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        assert request.headers["Authorization"] == "Bearer token"
+        path, params = request.url.path, request.url.params
+        if path.endswith("/changes/startPageToken"):
+            return httpx.Response(200, json={"startPageToken": "100"})
+        if path.endswith("/changes"):
+            assert params["pageToken"] == "100"
+            return httpx.Response(200, json={"changes": self.changes, "newStartPageToken": "101"})
+        if path.endswith("/files"):
+            assert f"'{FOLDER}' in parents" in params["q"]
+            # Two pages, to exercise pagination
+            if "pageToken" not in params:
+                return httpx.Response(200, json={"files": self.files[:1], "nextPageToken": "p2"})
+            return httpx.Response(200, json={"files": self.files[1:]})
+        if path.endswith("/export"):
+            assert params["mimeType"] == "application/pdf"
+            return httpx.Response(200, content=b"%PDF board notes")
+        file_id = path.rsplit("/", 1)[-1]
+        assert params["alt"] == "media"
+        return httpx.Response(200, content=self.content[file_id])
+
+
+@pytest.mark.asyncio
+async def test_first_sync_crawls_the_folder_and_later_syncs_replay_changes(tmp_path):
+    drive = FakeDrive()
+    connector = DriveConnector(access_token="token", transport=httpx.MockTransport(drive.handler))
+    engine = SyncEngine(store=UploadStore(str(tmp_path)))
+    source = connector.parse_location(FOLDER)
+
+    first = await engine.run(connector, source, {}, lambda uris: {})
+
+    assert [(file["source_uri"], file["filename"]) for file in first.files] == [
+        ("gdrive://f1", "contract.pdf"),
+        ("gdrive://f2", "Board notes.pdf"),  # Google Doc exported to PDF; the form is skipped
+    ]
+    assert first.files[0]["sha256"] == hashlib.sha256(b"contract").hexdigest()
+    assert first.cursor == {"page_token": "100"}
+
+    known = {file["source_uri"]: file["etag"] for file in first.files}
+    drive.changes = [
+        {"file": _file("f1", "contract.pdf", md5Checksum="md5-1", size="8")},  # Metadata-only change
+        {"file": _file("f4", "new.pdf", md5Checksum="md5-4", size="8")},
+        {"file": _file("f5", "elsewhere.pdf", parents=("other-folder",), md5Checksum="md5-5")},
+        {"file": _file("f6", "trashed.pdf", trashed=True, md5Checksum="md5-6")},
+        {"removed": True, "fileId": "f2"},
+    ]
+    drive.requests.clear()
+
+    second = await engine.run(connector, source, first.cursor, lambda uris: known)
+
+    assert [file["source_uri"] for file in second.files] == ["gdrive://f4"]
+    assert second.stats == {**second.stats, "listed": 2, "unchanged": 1, "stored": 1}
+    assert second.cursor == {"page_token": "101"}
+    assert not any(request.url.path.endswith("/files") for request in drive.requests)  # No re-crawl
+
+
+@pytest.mark.asyncio
+async def test_folder_id_is_escaped_in_the_files_query():
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/changes/startPageToken"):
+            return httpx.Response(200, json={"startPageToken": "1"})
+        queries.append(request.url.params["q"])
+        return httpx.Response(200, json={"files": []})
+
+    connector = DriveConnector(access_token="token", transport=httpx.MockTransport(handler))
+    items = [item async for item in connector.iter_changes({"folder_id": "x' or name contains '\\"}, {})]
+
+    assert items == []
+    assert queries[0].endswith(" and 'x\\' or name contains \\'\\\\' in parents")
+
+
+def test_drive_sources_must_be_folder_ids():
+    assert SyncSourceCreate(connector="drive", location="1AbC-d_9").location == "1AbC-d_9"
+    assert SyncSourceCreate(connector="drive").location == ""
+    with pytest.raises(ValidationError):
+        SyncSourceCreate(connector="drive", location="x' or name contains 'a")
@@ -8,7 +8,7 @@ from app.rag.ingest.file_connector import FileConnector
 
 
 @pytest.mark.asyncio
-async def test_file_connector_fetch():
+async def test_file_connector_fetch(tmp_path):
     """
     Tests that the FileConnector correctly computes the sha256 hash
     and returns the expected metadata.
@@ -20,7 +20,7 @@ async def test_file_connector_fetch():
     mock_upload_file = UploadFile(filename=file_name, file=file_obj)
 
     # 2. Instantiate the connector and fetch
-    connector = FileConnector()
+    connector = FileConnector(upload_dir=tmp_path)
     results = await connector.fetch(mock_upload_file)
 
     # 3. Assertions
@@ -35,5 +35,6 @@ async def test_file_connector_fetch():
     expected_hash = hashlib.sha256(file_content).hexdigest()
     assert doc["metadata"]["sha256"] == expected_hash
 
-    # Check content
-    assert doc["content"] == file_content
+    # Check stored content
+    assert doc["metadata"]["storage_path"] == str(tmp_path / expected_hash)
+    assert (tmp_path / expected_hash).read_bytes() == file_content
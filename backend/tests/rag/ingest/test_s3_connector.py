@@ -0,0 +1,100 @@
+import hashlib
+import os
+
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from app.rag.ingest.s3_connector import WATERMARK_LAG, S3Connector  # noqa: E402
+from app.rag.ingest.sync_engine import SyncEngine  # noqa: E402
+from app.rag.ingest.upload_store import UploadStore  # noqa: E402
+
+BUCKET = "contracts"
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def _connector(s3_client, tmp_path, **kwargs):
+    return S3Connector(s3_client=s3_client, store=UploadStore(str(tmp_path / "uploads")), **kwargs)
+
+
+async def _collect(connector, source, cursor):
+    return [item async for item in connector.iter_changes(source, cursor)]
+
+
+@pytest.mark.asyncio
+async def test_lists_prefix_across_pages_and_stores_by_content_hash(s3_client, tmp_path):
+    for n in range(7):
+        s3_client.put_object(Bucket=BUCKET, Key=f"2024/doc-{n}.txt", Body=f"document {n}".encode())
+    s3_client.put_object(Bucket=BUCKET, Key="2023/old.txt", Body=b"other prefix")
+    connector = _connector(s3_client, tmp_path, page_size=3)
+
+    docs = await connector.fetch(connector.parse_location(f"s3://{BUCKET}/2024/"))
+
+    uris = sorted(doc["metadata"]["source_uri"] for doc in docs)
+    assert uris == [f"s3://{BUCKET}/2024/doc-{n}.txt" for n in range(7)]
+    first = next(doc["metadata"] for doc in docs if doc["metadata"]["filename"] == "doc-0.txt")
+    assert first["sha256"] == hashlib.sha256(b"document 0").hexdigest()
+    with open(first["storage_path"], "rb") as f:
+        assert f.read() == b"document 0"
+
+
+@pytest.mark.asyncio
+async def test_large_objects_are_fetched_as_concurrent_ranges(s3_client, tmp_path):
+    body = os.urandom(100_003)
+    s3_client.put_object(Bucket=BUCKET, Key="big.pdf", Body=body)
+    connector = _connector(s3_client, tmp_path, part_size=10_000, max_concurrency=4)
+
+    [item] = await _collect(connector, {"bucket": BUCKET, "key": "big.pdf"}, {})
+    stored = await connector.save(item)
+
+    assert stored["sha256"] == hashlib.sha256(body).hexdigest()
+    assert stored["size_bytes"] == len(body)
+    with open(stored["path"], "rb") as f:
+        assert f.read() == body
+    assert os.listdir(tmp_path / "uploads") == [stored["sha256"]]  # No temp files left
+
+
+@pytest.mark.asyncio
+async def test_open_stream_yields_the_object_content(s3_client, tmp_path):
+    s3_client.put_object(Bucket=BUCKET, Key="one.txt", Body=b"one")
+    connector = _connector(s3_client, tmp_path)
+
+    [item] = await _collect(connector, {"bucket": BUCKET, "key": "one.txt"}, {})
+
+    assert b"".join([chunk async for chunk in connector.open_stream(item)]) == b"one"
+
+
+@pytest.mark.asyncio
+async def test_objects_with_a_known_etag_are_not_downloaded(s3_client, tmp_path):
+    s3_client.put_object(Bucket=BUCKET, Key="a.txt", Body=b"unchanged")
+    s3_client.put_object(Bucket=BUCKET, Key="b.txt", Body=b"edited")
+    etag_a = s3_client.head_object(Bucket=BUCKET, Key="a.txt")["ETag"].strip('"')
+    known = {f"s3://{BUCKET}/a.txt": etag_a, f"s3://{BUCKET}/b.txt": "stale"}
+    engine = SyncEngine(store=UploadStore(str(tmp_path / "uploads")))
+
+    result = await engine.run(_connector(s3_client, tmp_path), {"bucket": BUCKET, "prefix": ""}, {}, lambda uris: known)
+
+    assert [file["source_uri"] for file in result.files] == [f"s3://{BUCKET}/b.txt"]
+    assert result.stats["unchanged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_watermark_skips_objects_modified_before_the_previous_sync(s3_client, tmp_path):
+    s3_client.put_object(Bucket=BUCKET, Key="old.txt", Body=b"old")
+    connector = _connector(s3_client, tmp_path)
+    cursor = {}
+    await _collect(connector, {"bucket": BUCKET, "prefix": ""}, cursor)
+
+    cursor["watermark"] += WATERMARK_LAG + 60  # As if the previous sync ran well after the upload
+
+    assert await _collect(connector, {"bucket": BUCKET, "prefix": ""}, cursor) == []
@@ -0,0 +1,22 @@
+import pytest
+
+from app.rag.ingest.stage_store import StageStore
+
+
+def test_put_get_delete_roundtrip(tmp_path):
+    store = StageStore(str(tmp_path))
+    data = {"page_texts": [{"page_number": 1, "text": "hello"}], "tables": []}
+
+    ref = store.put("doc-1", "extraction", data)
+
+    assert ref == "doc-1/extraction.json.gz"
+    assert store.get(ref) == data
+    store.delete(ref)
+    with pytest.raises(FileNotFoundError):
+        store.get(ref)
+
+
+def test_rejects_references_outside_the_store(tmp_path):
+    store = StageStore(str(tmp_path / "stages"))
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
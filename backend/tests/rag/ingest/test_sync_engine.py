@@ -0,0 +1,103 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.rag.ingest.file_connector import FileConnector
+from app.rag.ingest.sync_engine import SyncEngine
+from app.rag.ingest.upload_store import UploadStore
+
+
+def _write(path, content: bytes, age_seconds: float = 0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if age_seconds:
+        then = time.time() - age_seconds
+        os.utime(path, (then, then))
+
+
+class _Catalog:
+    """Stands in for the documents table: {uri: version} of what was ingested."""
+
+    def __init__(self):
+        self.versions = {}
+        self.lookups = []
+
+    def lookup(self, uris):
+        self.lookups.append(list(uris))
+        return {uri: self.versions[uri] for uri in uris if uri in self.versions}
+
+    def register(self, result):
+        self.versions.update({file["source_uri"]: file["etag"] for file in result.files})
+
+
+@pytest.mark.asyncio
+async def test_resync_only_stores_new_and_changed_files(tmp_path):
+    root = tmp_path / "imports"
+    for n in range(5):
+        _write(root / "contracts" / f"c{n}.txt", f"contract {n}".encode())
+    _write(root / "notes.txt", b"notes")
+    _write(root / ".partial.tmp", b"hidden")
+    engine = SyncEngine(store=UploadStore(str(tmp_path / "uploads")), concurrency=2)
+    connector, catalog = FileConnector(upload_dir=tmp_path / "uploads"), _Catalog()
+    source = connector.parse_location(str(root))
+
+    first = await engine.run(connector, source, {}, catalog.lookup)
+    catalog.register(first)
+
+    assert first.stats["stored"] == 6
+    assert {file["filename"] for file in first.files} == {"notes.txt"} | {f"c{n}.txt" for n in range(5)}
+    notes = next(file for file in first.files if file["filename"] == "notes.txt")
+    assert notes["sha256"] == hashlib.sha256(b"notes").hexdigest()
+    assert notes["source_uri"] == f"file://{root / 'notes.txt'}"
+
+    # Content edited in place, plus one new file
+    _write(root / "contracts" / "c1.txt", b"contract 1, amended")
+    _write(root / "contracts" / "c5.txt", b"contract 5")
+
+    second = await engine.run(connector, source, first.cursor, catalog.lookup)
+
+    assert sorted(file["filename"] for file in second.files) == ["c1.txt", "c5.txt"]
+    assert second.stats["stored"] == 2
+
+
+@pytest.mark.asyncio
+async def test_watermark_keeps_untouched_files_from_being_compared(tmp_path):
+    root = tmp_path / "imports"
+    _write(root / "old.txt", b"old")
+    connector, catalog = FileConnector(upload_dir=tmp_path / "uploads"), _Catalog()
+    engine = SyncEngine(store=UploadStore(str(tmp_path / "uploads")))
+    first = await engine.run(connector, connector.parse_location(str(root)), {}, catalog.lookup)
+    catalog.register(first)
+    catalog.lookups.clear()
+
+    # Stat times are set to the past (as a copy tool preserving mtime would), but ctime still moves
+    _write(root / "copied.txt", b"copied", age_seconds=3600)
+    second = await engine.run(connector, connector.parse_location(str(root)), first.cursor, catalog.lookup)
+
+    assert [file["filename"] for file in second.files] == ["copied.txt"]
+    assert second.stats["listed"] == 1
+    assert catalog.lookups == [[f"file://{root / 'copied.txt'}"]]
+
+
+@pytest.mark.asyncio
+async def test_cursor_is_only_returned_by_a_successful_sync(tmp_path):
+    root = tmp_path / "imports"
+    _write(root / "a.txt", b"a")
+    _write(root / "b.txt", b"b")
+
+    class FailingConnector(FileConnector):
+        async def save(self, item, store=None):
+            if item.filename == "b.txt":
+                raise IOError("connection reset")
+            return await super().save(item, store)
+
+    connector = FailingConnector(upload_dir=tmp_path / "uploads")
+    cursor = {"watermark": 0.0}
+    with pytest.raises(IOError):
+        await SyncEngine(store=UploadStore(str(tmp_path / "uploads"))).run(
+            connector, connector.parse_location(str(root)), cursor, lambda uris: {}
+        )
+
+    assert cursor == {"watermark": 0.0}
@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+import os
+import tracemalloc
+
+import pytest
+
+from app.rag.ingest.upload_store import UploadStore
+
+CHUNK = 64 * 1024
+
+
+async def _stream(total_bytes, chunk_size=CHUNK):
+    block = os.urandom(chunk_size)
+    sent = 0
+    while sent < total_bytes:
+        size = min(chunk_size, total_bytes - sent)
+        sent += size
+        yield block[:size]
+
+
+def test_stream_is_hashed_and_renamed_to_its_content_hash(tmp_path):
+    store = UploadStore(str(tmp_path))
+    data = b"".join([b"a" * 100, b"b" * 100])
+
+    async def chunks():
+        yield data[:100]
+        yield data[100:]
+
+    stored = asyncio.run(store.save_stream(chunks()))
+
+    sha = hashlib.sha256(data).hexdigest()
+    assert stored == {"sha256": sha, "size_bytes": 200, "path": str(tmp_path / sha)}
+    assert (tmp_path / sha).read_bytes() == data
+    assert os.listdir(tmp_path) == [sha]
+
+
+def test_duplicate_content_keeps_one_file(tmp_path):
+    store = UploadStore(str(tmp_path))
+    source = tmp_path.parent / "source.bin"
+    source.write_bytes(b"same bytes")
+
+    first = store.save_file(str(source))
+    second = store.save_file(str(source))
+
+    assert first == second
+    assert os.listdir(tmp_path) == [first["sha256"]]
+    assert store.get_stats() == {"files_written": 1, "duplicates": 1, "bytes_received": 20}
+
+
+def test_failed_stream_leaves_no_temp_file(tmp_path):
+    store = UploadStore(str(tmp_path))
+
+    async def broken():
+        yield b"partial"
+        raise ConnectionError("client went away")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(store.save_stream(broken()))
+    assert os.listdir(tmp_path) == []
+
+
+def test_memory_stays_constant_for_large_parallel_uploads(tmp_path):
+    """
+    Tests that peak Python allocations while storing four concurrent 16 MiB
+    streams stay around a few chunks, not the 64 MiB received.
+    """
+    store = UploadStore(str(tmp_path))
+
+    async def upload_all():
+        return await asyncio.gather(*(store.save_stream(_stream(16 * 1024 * 1024)) for _ in range(4)))
+
+    tracemalloc.start()
+    try:
+        stored = asyncio.run(upload_all())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert all(item["size_bytes"] == 16 * 1024 * 1024 for item in stored)
+    assert peak < 4 * 1024 * 1024
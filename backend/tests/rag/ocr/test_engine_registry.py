@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.rag.ocr.engine_registry import FallbackOCREngine, create_ocr_engine
+from app.rag.ocr.rapidocr_engine import RapidOCREngine
+from app.rag.ocr.tesseract_engine import TesseractEngine
+
+
+def _engine(name: str, text: str, confidence: float) -> MagicMock:
+    engine = MagicMock()
+    engine.name = name
+    engine.ocr_image.return_value = (text, confidence)
+    return engine
+
+
+def test_create_ocr_engine_by_name():
+    assert isinstance(create_ocr_engine("tesseract"), TesseractEngine)
+    assert isinstance(create_ocr_engine("rapidocr", dpi=300), RapidOCREngine)
+    assert isinstance(create_ocr_engine("auto"), FallbackOCREngine)
+    with pytest.raises(ValueError):
+        create_ocr_engine("easyocr")
+
+
+def test_fallback_keeps_confident_primary_result():
+    primary = _engine("rapidocr", "primary", 0.9)
+    secondary = _engine("tesseract", "secondary", 0.95)
+    router = FallbackOCREngine([primary, secondary], min_confidence=0.8)
+
+    assert router.ocr_image(MagicMock()) == ("primary", 0.9)
+    secondary.ocr_image.assert_not_called()
+    assert router.get_stats() == {"pages_by_engine": {"rapidocr": 1}, "fallbacks": 0}
+
+
+def test_fallback_retries_low_confidence_pages():
+    primary = _engine("rapidocr", "garbled", 0.4)
+    secondary = _engine("tesseract", "clean", 0.85)
+    router = FallbackOCREngine([primary, secondary], min_confidence=0.8)
+
+    assert router.ocr_image(MagicMock()) == ("clean", 0.85)
+    assert router.get_stats() == {"pages_by_engine": {"tesseract": 1}, "fallbacks": 1}
+
+
+def test_prepare_orders_engines_by_probe_confidence():
+    weaker = _engine("tesseract", "", 0.5)
+    stronger = _engine("rapidocr", "", 0.9)
+    router = FallbackOCREngine([weaker, stronger])
+    router.render = MagicMock(return_value=[MagicMock()])
+
+    router.prepare("doc.pdf", [3, 4])
+
+    router.render.assert_called_once_with("doc.pdf", 3, 3)
+    assert [engine.name for engine in router.engines] == ["rapidocr", "tesseract"]
+
+
+@patch("app.rag.ocr.base_engine.pdfinfo_from_path", return_value={"Pages": 3})
+def test_probe_page_is_not_ocred_twice(mock_pdfinfo):
+    """
+    Tests that the probe page's result is reused by the main pass and only the
+    remaining pages are rendered and OCR'd again.
+    """
+    primary = _engine("rapidocr", "page text", 0.9)
+    secondary = _engine("tesseract", "other text", 0.6)
+    router = FallbackOCREngine([secondary, primary], min_confidence=0.8)
+    router.render = MagicMock(side_effect=lambda file_path, first, last: [MagicMock() for _ in range(first, last + 1)])
+
+    results = router.ocr_pdf_parallel("doc.pdf", workers=1)
+
+    assert results == [(1, "page text"), (2, "page text"), (3, "page text")]
+    assert [c.args[1:] for c in router.render.call_args_list] == [(1, 1), (2, 2), (3, 3)]
+    assert primary.ocr_image.call_count == 3  # Probe + pages 2 and 3
+    assert router.get_stats() == {"pages_by_engine": {"rapidocr": 3}, "fallbacks": 0}
+    assert router._probes == {}
@@ -0,0 +1,52 @@
+import os
+from unittest.mock import patch
+
+import pdfplumber
+
+from app.rag.ocr.layout_analyzer import LayoutAnalyzer, _extract_page_tables
+from app.rag.ocr.pdf_document import PdfDocument
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")
+TABLE_PDF = os.path.join(REPO_ROOT, "table_sample.pdf")
+PII_PDF = os.path.join(REPO_ROOT, "pii_sample.pdf")
+
+
+def test_pages_without_ruling_lines_are_skipped():
+    """
+    Tests that a page with only a border rectangle is screened out before table extraction.
+    """
+    analyzer = LayoutAnalyzer(workers=1)
+    with PdfDocument(PII_PDF) as document, patch("pdfplumber.page.Page.extract_tables") as mock_extract:
+        tables = analyzer.extract_tables(document)
+
+    assert tables == []
+    mock_extract.assert_not_called()
+    assert analyzer.last_stats["pages_skipped"] == 1
+    assert analyzer.last_stats["skip_ratio"] == 1.0
+
+
+def test_candidate_pages_are_extracted():
+    analyzer = LayoutAnalyzer(workers=1)
+    tables = analyzer.extract_tables(TABLE_PDF)
+
+    assert tables[0]["table_data"][1] == ["North America", "150", "5.2"]
+    assert analyzer.last_stats["pages_with_tables"] == 1
+    assert analyzer.last_stats["candidate_hit_ratio"] == 1.0
+
+
+def test_parallel_shards_run_in_worker_processes():
+    """
+    Tests the process-pool path: shards are extracted in other processes and merged by page.
+    """
+    results = LayoutAnalyzer()._extract_parallel(TABLE_PDF, [1, 1], workers=2)
+
+    assert [page_number for page_number, _, _ in results] == [1, 1]
+    assert all(tables[0][0] == ["Region", "Sales (Millions)", "Growth (%)"] for _, tables, _ in results)
+
+
+def test_worker_builds_only_its_shard_pages():
+    with patch("app.rag.ocr.layout_analyzer.pdfplumber.open", wraps=pdfplumber.open) as mock_open:
+        results = _extract_page_tables(TABLE_PDF, [1])
+
+    mock_open.assert_called_once_with(TABLE_PDF, pages=[1])
+    assert [page_number for page_number, _, _ in results] == [1]
@@ -0,0 +1,40 @@
+import os
+from unittest.mock import MagicMock
+
+from app.rag.ocr.ocr_cache import OCRCache
+from app.rag.ocr.pdf_document import PdfDocument
+from app.rag.ocr.text_layer import TextLayerExtractor
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")
+SCANNED_PDF = os.path.join(REPO_ROOT, "scanned_sample.pdf")
+
+
+def test_file_key_and_page_hash_lookups(tmp_path):
+    """
+    Tests lookups by (sha256, page) and, for a different file, by page content hash.
+    """
+    cache = OCRCache(str(tmp_path))
+    cache.put("tesseract-5.3-200dpi", "a" * 64, 1, "page one", page_hash="f" * 64)
+
+    assert cache.get("tesseract-5.3-200dpi", "a" * 64, 1) == "page one"
+    assert cache.get("tesseract-5.3-200dpi", "b" * 64, 4, page_hash="f" * 64) == "page one"
+    assert cache.get("tesseract-5.4-200dpi", "a" * 64, 1) is None  # New engine version misses
+    assert cache.get_stats() == {"file_hits": 1, "page_hash_hits": 1, "misses": 1, "hit_rate": 0.6667}
+
+
+def test_reprocessing_a_document_skips_ocr(tmp_path):
+    """
+    Tests that the second extraction of the same scanned PDF is served from the cache.
+    """
+    ocr_engine = MagicMock()
+    ocr_engine.cache_key = "tesseract-5.3-200dpi"
+    ocr_engine.ocr_pdf_parallel.return_value = [(1, "scanned text")]
+    extractor = TextLayerExtractor(ocr_engine, ocr_cache=OCRCache(str(tmp_path)))
+
+    with PdfDocument(SCANNED_PDF) as document:
+        first = extractor.extract(document)
+    with PdfDocument(SCANNED_PDF) as document:
+        second = extractor.extract(document)
+
+    assert first == second == [{"page_number": 1, "text": "scanned text", "method": "ocr"}]
+    assert ocr_engine.ocr_pdf_parallel.call_count == 1
@@ -0,0 +1,99 @@
+import os
+import tracemalloc
+from unittest.mock import MagicMock, patch
+
+import pdfplumber
+
+from app.rag.ocr.layout_analyzer import LayoutAnalyzer
+from app.rag.ocr.pdf_document import PdfDocument
+from app.rag.ocr.text_layer import TextLayerExtractor
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")
+TABLE_PDF = os.path.join(REPO_ROOT, "table_sample.pdf")
+
+
+def test_metadata_text_and_tables_share_one_parse():
+    """
+    Tests that metadata, text-layer extraction and table extraction parse the PDF once.
+    """
+    tracemalloc.start()
+    with patch("app.rag.ocr.pdf_document.pdfplumber.open", wraps=pdfplumber.open) as mock_open:
+        with PdfDocument(TABLE_PDF) as document:
+            metadata = document.metadata
+            pages = TextLayerExtractor(MagicMock()).extract(document)
+            tables = LayoutAnalyzer().extract_tables(document)
+            parse_count = document.parse_count
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert mock_open.call_count == 1
+    assert parse_count == 1
+    assert metadata["page_count"] == 1
+    assert "North America" in pages[0]["text"]
+    assert tables[0]["page_number"] == 1
+    assert tables[0]["table_data"][0] == ["Region", "Sales (Millions)", "Growth (%)"]
+    assert peak < 20 * 1024 * 1024
+
+
+def test_layout_analyzer_still_accepts_a_path():
+    tables = LayoutAnalyzer().extract_tables(TABLE_PDF)
+    assert len(tables) == 1
+
+
+def _pdf(path, font: bytes, contents=(b"BT /F1 12 Tf 72 720 Td (Invoice) Tj ET",)):
+    # One page per content stream, all drawing with the same font object
+    font_id = 3 + 2 * len(contents)
+    kids = b" ".join(b"%d 0 R" % (3 + 2 * n) for n in range(len(contents)))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(contents))]
+    for n, content in enumerate(contents):
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * n, font_id)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+    objects.append(font)
+    body, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(body)
+    return str(path)
+
+
+def test_page_hash_covers_fonts_not_only_content_streams(tmp_path):
+    helvetica = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    a = _pdf(tmp_path / "a.pdf", helvetica)
+    b = _pdf(tmp_path / "b.pdf", helvetica + b"\n% different file, same page")
+    c = _pdf(tmp_path / "c.pdf", b"<< /Type /Font /Subtype /Type1 /BaseFont /ABCDEF+Garbled >>")
+
+    with PdfDocument(a) as doc_a, PdfDocument(b) as doc_b, PdfDocument(c) as doc_c:
+        assert doc_a.sha256 != doc_b.sha256
+        assert doc_a.page_hash(1) == doc_b.page_hash(1)
+        assert doc_a.page_hash(1) != doc_c.page_hash(1)
+
+
+def test_page_hash_does_not_change_after_text_extraction(tmp_path):
+    """
+    Tests that extracting a page's text (which makes pdfminer decode and drop the raw
+    content and font streams) leaves every page hash as it was, so different pages
+    never collapse onto one hash.
+    """
+    path = _pdf(
+        tmp_path / "two.pdf",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        contents=(b"0 0 m 100 100 l S", b"0 0 m 200 50 l S"),
+    )
+    with PdfDocument(path) as fresh:
+        expected = [fresh.page_hash(1), fresh.page_hash(2)]
+
+    with PdfDocument(path) as document:
+        for page_number in (1, 2):
+            document.page_text(page_number)
+        hashes = [document.page_hash(1), document.page_hash(2)]
+
+    assert expected[0] != expected[1]
+    assert hashes == expected
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.rag.ocr.rapidocr_engine import RapidOCREngine, _merge_lines
+
+
+def test_merge_lines_orders_boxes_into_reading_lines():
+    boxes = [
+        ([[300, 70], [500, 64], [500, 100], [300, 103]], "report 2024", 0.9),
+        ([[20, 64], [290, 66], [290, 104], [20, 103]], "Hello quarterly", 0.9),
+        ([[20, 160], [200, 160], [200, 190], [20, 190]], "Second line", 0.9),
+    ]
+    assert _merge_lines(boxes) == ["Hello quarterly report 2024", "Second line"]
+
+
+def test_ocr_image_reads_rendered_text():
+    """
+    Tests the bundled RapidOCR models end to end on a synthetic page.
+    """
+    image = Image.new("RGB", (800, 200), "white")
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 36)
+    except OSError:
+        font = ImageFont.load_default(size=36)
+    ImageDraw.Draw(image).text((20, 60), "Quarterly report 2024", fill="black", font=font)
+
+    text, confidence = RapidOCREngine().ocr_image(image)
+
+    assert "report 2024" in text
+    assert 0.5 < confidence <= 1.0
+
+
+def _session_threads(model):
+    sessions = [model.text_detector.infer, model.text_cls.infer, model.text_recognizer.session]
+    return [infer.session.get_session_options().intra_op_num_threads for infer in sessions]
+
+
+def test_shard_threads_build_sessions_within_their_thread_budget():
+    engine = RapidOCREngine()
+
+    with ThreadPoolExecutor(max_workers=1, initializer=engine._enter_shard, initargs=(2,)) as pool:
+        shard_threads = pool.submit(lambda: _session_threads(engine.model)).result()
+
+    assert shard_threads == [2, 2, 2]
+    assert _session_threads(engine.model) == [0, 0, 0]  # ONNX Runtime's default (all cores) outside shards
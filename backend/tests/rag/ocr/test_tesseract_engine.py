@@ -1,6 +1,11 @@
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
 import pytest
+from PIL import Image
 
-from app.rag.ocr.tesseract_engine import TesseractEngine
+from app.rag.ocr.tesseract_engine import TesseractEngine, _image_to_data
 
 
 # Note: This test requires a PDF file at the specified path
@@ -20,3 +25,106 @@ def test_tesseract_ocr_pdf():
     page_num, text = results[0]
     assert page_num == 1
     assert "expected_keyword_from_your_pdf" in text.lower()
+
+
+@patch.object(TesseractEngine, "ocr_image", side_effect=lambda image: (f"text {image.page}", 0.9))
+@patch("app.rag.ocr.base_engine.convert_from_path")
+@patch("app.rag.ocr.base_engine.pdfinfo_from_path", return_value={"Pages": 5})
+def test_iter_pdf_renders_one_window_at_a_time(mock_pdfinfo, mock_convert, mock_ocr):
+    """
+    Tests that pages are rendered lazily in first_page/last_page windows, never all at once.
+    """
+
+    def render(file_path, dpi, first_page, last_page):
+        return [MagicMock(page=page) for page in range(first_page, last_page + 1)]
+
+    mock_convert.side_effect = render
+    engine = TesseractEngine(page_window=2)
+
+    pages = engine.iter_pdf("doc.pdf")
+    assert next(pages) == (1, "text 1")
+    assert mock_convert.call_count == 1  # Nothing beyond the first window has been rendered yet
+
+    assert list(pages) == [(2, "text 2"), (3, "text 3"), (4, "text 4"), (5, "text 5")]
+    windows = [(c.kwargs["first_page"], c.kwargs["last_page"]) for c in mock_convert.call_args_list]
+    assert windows == [(1, 2), (3, 4), (5, 5)]
+
+
+@patch("app.rag.ocr.base_engine.pdfinfo_from_path", return_value={"Pages": 10})
+def test_ocr_pdf_parallel_merges_shards_in_page_order(mock_pdfinfo):
+    """
+    Tests that page shards run concurrently and results come back in page order.
+    """
+    engine = TesseractEngine()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def ocr_shard(file_path, first_page, last_page):
+        barrier.wait()  # Deadlocks unless all three shards are in flight at once
+        return [(page, f"text {page}") for page in reversed(range(first_page, last_page + 1))]
+
+    with patch.object(engine, "ocr_page_range", side_effect=ocr_shard) as mock_shard:
+        results = engine.ocr_pdf_parallel("doc.pdf", workers=3)
+
+    assert results == [(page, f"text {page}") for page in range(1, 11)]
+    shards = sorted(c.args[1:] for c in mock_shard.call_args_list)
+    assert shards == [(1, 4), (5, 8), (9, 10)]
+
+
+@patch("app.rag.ocr.base_engine.pdfinfo_from_path", return_value={"Pages": 4})
+def test_only_shard_threads_run_tesseract_single_threaded(mock_pdfinfo, monkeypatch):
+    """
+    Tests that shard threads ask for a single-threaded Tesseract without touching
+    the process environment, and that direct callers are not pinned.
+    """
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    engine = TesseractEngine()
+    seen = []
+
+    def ocr_shard(file_path, first_page, last_page):
+        seen.append(engine.in_shard)
+        return [(page, "") for page in range(first_page, last_page + 1)]
+
+    with patch.object(engine, "ocr_page_range", side_effect=ocr_shard):
+        engine.ocr_pdf_parallel("doc.pdf", workers=2)
+
+    assert seen == [True, True]
+    assert not engine.in_shard
+    assert "OMP_THREAD_LIMIT" not in os.environ
+
+
+@patch("app.rag.ocr.tesseract_engine.subprocess.run")
+def test_single_threaded_tesseract_gets_its_own_environment(mock_run):
+    mock_run.return_value = MagicMock(returncode=0, stdout=b"level\ttext\tconf\n5\tHello\t91\n")
+
+    data = _image_to_data(Image.new("RGB", (10, 10)), single_threaded=True)
+
+    assert data == {"level": [5], "text": ["Hello"], "conf": ["91"]}
+    assert mock_run.call_args.kwargs["env"]["OMP_THREAD_LIMIT"] == "1"
+    assert "OMP_THREAD_LIMIT" not in os.environ
+
+
+def test_ocr_pages_renders_contiguous_runs():
+    engine = TesseractEngine()
+    with patch.object(engine, "ocr_page_range", return_value=[]) as mock_range:
+        engine.ocr_pages("doc.pdf", [2, 3, 4, 7, 9, 10])
+
+    assert [c.args[1:] for c in mock_range.call_args_list] == [(2, 4), (7, 7), (9, 10)]
+
+
+@patch("app.rag.ocr.tesseract_engine.pytesseract.image_to_data")
+def test_ocr_image_rebuilds_lines_and_confidence(mock_image_to_data):
+    """
+    Tests that word boxes are regrouped into lines/paragraphs and confidences averaged.
+    """
+    mock_image_to_data.return_value = {
+        "text": ["", "Quarterly", "report", "Net", "income"],
+        "conf": [-1, 90, 80, 70, 60],
+        "block_num": [1, 1, 1, 2, 2],
+        "par_num": [1, 1, 1, 1, 1],
+        "line_num": [1, 1, 1, 1, 1],
+    }
+
+    text, confidence = TesseractEngine().ocr_image(MagicMock())
+
+    assert text == "Quarterly report\n\nNet income"
+    assert confidence == pytest.approx(0.75)
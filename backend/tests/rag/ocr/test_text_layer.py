@@ -0,0 +1,42 @@
+import os
+from unittest.mock import MagicMock
+
+from app.rag.ocr.pdf_document import PdfDocument
+from app.rag.ocr.text_layer import TextLayerExtractor, text_quality
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")
+TABLE_PDF = os.path.join(REPO_ROOT, "table_sample.pdf")
+SCANNED_PDF = os.path.join(REPO_ROOT, "scanned_sample.pdf")
+
+
+def test_text_quality_flags_unmapped_glyphs():
+    assert text_quality("") == 0.0
+    assert text_quality("Quarterly revenue grew 5%.") == 1.0
+    assert text_quality("(cid:12)(cid:34)(cid:56)(cid:78) ab") < 0.5
+
+
+def test_digital_pdf_skips_ocr():
+    """
+    Tests that a born-digital PDF is read from its text layer without touching OCR.
+    """
+    ocr_engine = MagicMock()
+    with PdfDocument(TABLE_PDF) as document:
+        pages = TextLayerExtractor(ocr_engine).extract(document)
+
+    assert [page["method"] for page in pages] == ["text_layer"]
+    assert "North America" in pages[0]["text"]
+    ocr_engine.ocr_pdf_parallel.assert_not_called()
+
+
+def test_scanned_pdf_falls_back_to_ocr_per_page():
+    """
+    Tests that pages without a usable text layer are sent to OCR and labelled as such.
+    """
+    ocr_engine = MagicMock()
+    ocr_engine.ocr_pdf_parallel.return_value = [(1, "scanned text")]
+
+    with PdfDocument(SCANNED_PDF) as document:
+        pages = TextLayerExtractor(ocr_engine).extract(document, ocr_workers=2)
+
+    assert pages == [{"page_number": 1, "text": "scanned text", "method": "ocr"}]
+    ocr_engine.ocr_pdf_parallel.assert_called_once_with(SCANNED_PDF, workers=2, pages=[1])
@@ -0,0 +1,63 @@
+import json
+
+from app.rag.retrieval.query_cache import QueryEmbeddingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_query_cache_normalizes_near_identical_queries():
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    cache.put("What is RAG?", [0.1, 0.2])
+
+    assert cache.get("  what is   rag ") == [0.1, 0.2]
+    assert cache.get("what is langgraph") is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_query_cache_evicts_lru_and_expires_after_ttl():
+    clock = FakeClock()
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=10, clock=clock)
+
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")  # "b" becomes least recently used
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get_stats()["evictions"] == 1
+
+    clock.now = 11.0
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_query_cache_warm_from_log(tmp_path):
+    """
+    Tests warming from a JSONL query log; duplicate queries are embedded once.
+    """
+    log_path = tmp_path / "queries.jsonl"
+    rows = [{"query": "What is RAG?"}, {"query": "what is rag"}, {"query": "LangGraph"}]
+    log_path.write_text("\n".join(json.dumps(row) for row in rows))
+
+    embedded = []
+
+    def embed_fn(texts):
+        embedded.append(list(texts))
+        return [[float(i)] for i, _ in enumerate(texts)]
+
+    cache = QueryEmbeddingCache()
+    added = cache.warm_from_log(str(log_path), embed_fn)
+
+    assert added == 2
+    assert embedded == [["What is RAG?", "LangGraph"]]
+    assert cache.get("langgraph") == [1.0]
@@ -1,3 +1,7 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
 from app.rag.embedder import Embedder
 
 
@@ -6,3 +10,48 @@ def test_embedder_shape():
     embeddings = embedder.embed_texts(["hello", "world"])
     assert len(embeddings) == 2
     assert len(embeddings[0]) == 384  # all-MiniLM-L6-v2 dimension
+
+
+@patch("app.rag.embedder.load_sentence_transformer")
+def test_embedder_loads_model_once_and_tracks_metrics(mock_load_model):
+    """
+    Tests that the model is loaded a single time per Embedder instance and
+    that load/encode timings are tracked separately.
+    """
+    mock_model = MagicMock()
+    mock_model.encode.return_value = np.zeros((1, 384), dtype=np.float32)
+    mock_load_model.return_value = mock_model
+
+    embedder = Embedder()
+    assert not embedder.is_loaded
+
+    embedder.warmup()
+    embedder.embed_texts(["first"])
+    embedder.embed_texts(["second"])
+
+    mock_load_model.assert_called_once()
+    metrics = embedder.get_metrics()
+    assert metrics["loaded"] is True
+    assert metrics["encode_calls"] == 2
+    assert metrics["encoded_texts"] == 2
+    assert metrics["load_seconds"] >= 0.0
+
+
+@patch("app.rag.embedder.load_sentence_transformer")
+def test_embed_array_returns_contiguous_compact_arrays(mock_load_model):
+    """
+    Tests that embed_array returns one contiguous array and its float16/int8 forms.
+    """
+    vectors = np.random.default_rng(0).uniform(-1, 1, size=(3, 384)).astype(np.float32)
+    mock_load_model.return_value.encode.return_value = vectors
+
+    embedder = Embedder()
+    float32 = embedder.embed_array(["a", "b", "c"])
+    float16 = embedder.embed_array(["a", "b", "c"], dtype="float16")
+    int8 = embedder.embed_array(["a", "b", "c"], dtype="int8")
+
+    assert float32.dtype == np.float32 and float32.flags["C_CONTIGUOUS"]
+    assert float32.shape == (3, 384)
+    assert float16.dtype == np.float16 and float16.nbytes == float32.nbytes // 2
+    assert int8.dtype == np.int8
+    assert np.allclose(int8 / 127.0, vectors, atol=1 / 127)
@@ -0,0 +1,93 @@
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.rag.embedding_batcher import EmbeddingBatcher
+
+
+def _fake_embedder():
+    embedder = MagicMock()
+    embedder.embed_array.side_effect = lambda texts, batch_size=None: np.array(
+        [[float(len(t))] for t in texts], dtype=np.float32
+    )
+    return embedder
+
+
+def test_batcher_returns_vectors_in_order():
+    """
+    Tests that a single caller gets exactly one vector per text, in order.
+    """
+    batcher = EmbeddingBatcher(_fake_embedder(), max_batch_size=8, max_wait_ms=5)
+
+    vectors = batcher.embed(["a", "bb", "ccc"])
+
+    assert vectors.tolist() == [[1.0], [2.0], [3.0]]
+    assert len(batcher.embed([])) == 0
+
+
+def test_batcher_merges_concurrent_documents():
+    """
+    Tests that texts from concurrent callers are encoded in shared batches and
+    that each caller only receives its own vectors.
+    """
+    embedder = _fake_embedder()
+    batcher = EmbeddingBatcher(embedder, max_batch_size=64, max_wait_ms=200)
+    results = {}
+
+    def index_document(doc_id: int):
+        texts = ["x" * (doc_id + 1)] * 3
+        results[doc_id] = batcher.embed(texts)
+
+    threads = [threading.Thread(target=index_document, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for doc_id, vectors in results.items():
+        assert vectors.tolist() == [[float(doc_id + 1)]] * 3
+
+    stats = batcher.get_stats()
+    assert stats["batched_texts"] == 15
+    assert stats["batches"] < 5  # Fewer encode calls than documents
+
+
+def test_batches_never_exceed_max_batch_size():
+    """
+    Tests that large requests are split and concurrent requests that would overflow
+    a batch are carried over to the next one.
+    """
+    embedder = _fake_embedder()
+    batcher = EmbeddingBatcher(embedder, max_batch_size=4, max_wait_ms=100)
+    results = {}
+
+    def index_document(doc_id: int, count: int):
+        results[doc_id] = batcher.embed(["x" * (doc_id + 1)] * count)
+
+    threads = [threading.Thread(target=index_document, args=(i, count)) for i, count in enumerate([10, 3, 3])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results[0].tolist() == [[1.0]] * 10
+    assert results[1].tolist() == [[2.0]] * 3
+    assert results[2].tolist() == [[3.0]] * 3
+    assert max(len(c.args[0]) for c in embedder.embed_array.call_args_list) <= 4
+    assert batcher.get_stats()["batched_texts"] == 16
+
+
+def test_direct_mode_calls_the_embedder_without_batching():
+    """
+    Tests that a single-task-per-process batcher encodes inline, without a background thread.
+    """
+    embedder = _fake_embedder()
+    batcher = EmbeddingBatcher(embedder, max_batch_size=8, max_wait_ms=10_000)
+    batcher.direct = True
+
+    vectors = batcher.embed(["a", "bb"])
+
+    assert vectors.tolist() == [[1.0], [2.0]]
+    assert batcher._thread is None
+    embedder.embed_array.assert_called_once_with(["a", "bb"], batch_size=8)
@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.rag.embedder import Embedder
+from app.rag.embedding_cache import EmbeddingCache, cache_namespace
+
+
+def _dict_backed_redis():
+    """A minimal stand-in for the Redis client backed by a plain dict."""
+    store = {}
+    client = MagicMock()
+    client.mget.side_effect = lambda keys: [store.get(k) for k in keys]
+    pipe = MagicMock()
+    pipe.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value)
+    client.pipeline.return_value = pipe
+    return client, store
+
+
+def test_cache_key_ignores_whitespace_and_includes_model():
+    cache = EmbeddingCache(model_name="model-a")
+    other = EmbeddingCache(model_name="model-b")
+
+    assert cache.key("Legal  footer\n text") == cache.key("Legal footer text")
+    assert cache.key("Legal footer text") != other.key("Legal footer text")
+
+
+def test_backends_and_model_builds_get_separate_namespaces():
+    namespaces = {
+        cache_namespace("minilm"),
+        cache_namespace("minilm", backend="torch-int8"),
+        cache_namespace("minilm", backend="onnx", model_path="/models/minilm-onnx"),
+        cache_namespace("minilm", backend="onnx", model_path="/models/minilm-onnx", onnx_file_name="onnx/qint8.onnx"),
+    }
+
+    assert len(namespaces) == 4
+    assert cache_namespace("minilm") == "minilm:torch"
+
+
+def test_local_lru_evicts_oldest_entry():
+    cache = EmbeddingCache(model_name="m", local_max_entries=2)
+    cache.put_many(["a", "b", "c"], np.eye(3, dtype=np.float32))
+
+    results = cache.get_many(["a", "b", "c"])
+
+    assert results[0] is None
+    assert np.allclose(results[2], [0, 0, 1])
+    assert cache.get_stats()["local_entries"] == 2
+
+
+def test_redis_tier_stores_compact_bytes_and_is_shared():
+    client, store = _dict_backed_redis()
+    writer = EmbeddingCache(model_name="m", redis_client=client, storage_dtype="float16")
+    writer.put_many(["header"], np.ones((1, 384), dtype=np.float32))
+
+    assert len(next(iter(store.values()))) == 384 * 2  # float16 bytes
+
+    reader = EmbeddingCache(model_name="m", redis_client=client, storage_dtype="float16")
+    vector = reader.get_many(["header"])[0]
+
+    assert vector.dtype == np.float32
+    assert np.allclose(vector, 1.0)
+    assert reader.get_stats()["redis_hits"] == 1
+
+
+def test_embedder_only_encodes_uncached_texts():
+    """
+    Tests that repeated chunks (within a call and across calls) are encoded once.
+    """
+    embedder = Embedder(cache=EmbeddingCache(model_name="m"))
+    embedder._encode = MagicMock(side_effect=lambda texts, batch_size=None: np.ones((len(texts), 4), np.float32))
+
+    first = embedder.embed_texts(["footer", "body", "footer"])
+    second = embedder.embed_texts(["footer", "new"])
+
+    assert len(first) == 3 and len(second) == 2
+    encoded = [call.args[0] for call in embedder._encode.call_args_list]
+    assert encoded == [["footer", "body"], ["new"]]
+    assert embedder.cache.get_stats()["hit_rate"] > 0
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from app.rag.inference_backends import cosine_drift, load_sentence_transformer, rank_agreement
+
+
+def test_cosine_drift_is_zero_for_identical_and_scaled_vectors():
+    reference = np.random.default_rng(0).normal(size=(5, 384)).astype(np.float32)
+
+    drift = cosine_drift(reference, reference * 3.0)
+
+    assert drift["mean_cosine_drift"] == pytest.approx(0.0, abs=1e-6)
+    assert drift["max_cosine_drift"] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_cosine_drift_detects_quantization_noise():
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(5, 384)).astype(np.float32)
+    noisy = reference + rng.normal(scale=0.05, size=reference.shape).astype(np.float32)
+
+    drift = cosine_drift(reference, noisy)
+
+    assert 0.0 < drift["mean_cosine_drift"] < 0.01
+
+
+def test_rank_agreement():
+    reference = [[0.9, 0.1, 0.5], [0.2, 0.8, 0.1]]
+    same_order = [[3.0, -1.0, 1.0], [0.0, 5.0, -2.0]]
+    swapped_top = [[0.4, 0.1, 0.5], [0.2, 0.8, 0.1]]
+
+    assert rank_agreement(reference, same_order, top_k=2) == {"top1_agreement": 1.0, "mean_topk_overlap": 1.0}
+    assert rank_agreement(reference, swapped_top, top_k=2)["top1_agreement"] == 0.5
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_sentence_transformer("all-MiniLM-L6-v2", backend="tensorrt")
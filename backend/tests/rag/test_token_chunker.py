@@ -0,0 +1,81 @@
+import re
+
+import pytest
+
+from app.rag.token_chunker import TokenChunker
+
+
+def whitespace_offsets(texts):
+    """Stand-in for the embedder tokenizer: one token per whitespace-separated word."""
+    return [[match.span() for match in re.finditer(r"\S+", text)] for text in texts]
+
+
+def _page(number, words, start=0):
+    return {"page_number": number, "text": " ".join(f"w{i}" for i in range(start, start + words)), "method": "ocr"}
+
+
+def test_chunks_are_sized_in_tokens_with_overlap():
+    chunker = TokenChunker(whitespace_offsets, chunk_tokens=10, overlap_tokens=2, min_tail_tokens=1)
+    chunks = chunker.chunk_pages([_page(1, 26)])
+
+    assert len(chunks) > 1
+    assert all(chunk["metadata"]["token_count"] <= 10 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous["text"].split()[-2:] == chunk["text"].split()[:2]
+    assert chunks[0]["text"].split()[0] == "w0"
+    assert chunks[-1]["text"].split()[-1] == "w25"
+
+
+def test_chunks_cross_page_boundaries_and_record_page_spans():
+    """
+    Tests that a chunk can run from one page into the next instead of leaving a tiny
+    tail chunk on each page.
+    """
+    chunker = TokenChunker(whitespace_offsets, chunk_tokens=10, overlap_tokens=0, min_tail_tokens=1)
+    chunks = chunker.chunk_pages([_page(1, 7), _page(2, 7, start=7), _page(3, 6, start=14)])
+
+    spans = [(c["metadata"]["page_start"], c["metadata"]["page_end"]) for c in chunks]
+    assert spans == [(1, 1), (1, 2), (2, 3)]
+    assert chunks[1]["text"] == "w5 w6\n\nw7 w8 w9 w10"
+    assert all(c["metadata"]["extraction"] == "ocr" for c in chunks)
+
+
+def test_short_final_window_is_merged_into_previous_chunk():
+    chunker = TokenChunker(whitespace_offsets, chunk_tokens=10, overlap_tokens=0, min_tail_tokens=5)
+    chunks = chunker.chunk_pages([_page(1, 22)])
+
+    assert [chunk["metadata"]["token_count"] for chunk in chunks] == [5, 6, 11]
+    assert chunks[-1]["text"].split()[-1] == "w21"
+
+
+def test_editing_one_page_keeps_the_chunks_of_the_other_pages():
+    """
+    Tests that chunk boundaries depend on the nearby text rather than on token
+    positions, so an edit that shifts every later token leaves later chunks as they were.
+    """
+    chunker = TokenChunker(whitespace_offsets, chunk_tokens=40, overlap_tokens=8)
+    pages = [_page(n, 150, start=n * 1000) for n in range(1, 9)]
+    edited = [dict(page) for page in pages]
+    edited[3]["text"] = edited[3]["text"].replace("w4050", "a few inserted words")
+
+    before = chunker.chunk_pages(pages)
+    after = chunker.chunk_pages(edited)
+
+    changed = [c for c in after if c["text"] not in {chunk["text"] for chunk in before}]
+    assert changed
+    assert all(c["metadata"]["page_start"] <= 4 <= c["metadata"]["page_end"] for c in changed)
+    assert len(after) - len(changed) >= len(before) - 3
+
+
+def test_tables_become_separate_chunks_and_empty_pages_are_ignored():
+    chunker = TokenChunker(whitespace_offsets, chunk_tokens=10, overlap_tokens=2)
+    tables = [{"page_number": 2, "table_data": [["a", "b"], ["1", "2"]]}]
+
+    chunks = chunker.chunk_pages_and_tables([{"page_number": 1, "text": "  "}], tables)
+
+    assert chunks == [{"text": "Table:\na\tb\n1\t2", "metadata": {"page": 2, "source": "table"}}]
+
+
+def test_overlap_must_be_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        TokenChunker(whitespace_offsets, chunk_tokens=10, overlap_tokens=10)
@@ -0,0 +1,166 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+from app.models.document import DocumentStatus
+from app.rag.ingest.stage_store import StageStore
+from workers.tasks.batch_tasks import _wait_for_document, ingest_batch_lane_task, schedule_ingestion_batch
+
+
+def test_batch_is_scheduled_as_one_group_of_bounded_lanes(tmp_path):
+    store = StageStore(str(tmp_path))
+    documents = [(f"doc-{n}", f"sha-{n}") for n in range(50)]
+
+    with patch("workers.tasks.batch_tasks.stage_store", store), patch("workers.tasks.batch_tasks.group") as mock_group:
+        schedule_ingestion_batch("batch-1", documents, concurrency=4)
+
+    signatures = list(mock_group.call_args.args[0])
+    mock_group.return_value.apply_async.assert_called_once()
+    assert len(signatures) == 4
+    lanes = [store.get(signature.kwargs["lane_ref"]) for signature in signatures]
+    assert [tuple(doc) for lane in lanes for doc in lane] == documents
+
+
+def test_lane_waits_for_each_document_before_starting_the_next(tmp_path):
+    store = StageStore(str(tmp_path))
+    lane_ref = store.put("batch-1", "lane-0", [["doc-1", "sha-1"], ["doc-2", "sha-2"]])
+    order = MagicMock()
+
+    with patch("workers.tasks.batch_tasks.stage_store", store), patch(
+        "workers.tasks.batch_tasks.ingest_document_task", order.ingest
+    ), patch("workers.tasks.batch_tasks._wait_for_document", order.wait):
+        ingest_batch_lane_task.run(batch_id="batch-1", lane_ref=lane_ref)
+
+    assert order.mock_calls == [
+        call.ingest.run(document_id="doc-1", sha256_hash="sha-1"),
+        call.wait("doc-1"),
+        call.ingest.run(document_id="doc-2", sha256_hash="sha-2"),
+        call.wait("doc-2"),
+    ]
+    order.ingest.delay.assert_not_called()
+    assert not (tmp_path / "batch-1" / "lane-0.json.gz").exists()
+
+
+def test_wait_for_document_polls_until_a_terminal_status():
+    db = MagicMock()
+    db.execute.return_value.scalar_one_or_none.side_effect = [
+        DocumentStatus.PROCESSING,
+        DocumentStatus.PROCESSING,
+        DocumentStatus.INDEXED,
+    ]
+
+    with patch("workers.tasks.batch_tasks.get_sync_db") as mock_db, patch("workers.tasks.batch_tasks.time.sleep"):
+        mock_db.return_value.__enter__.return_value = db
+        status = _wait_for_document("doc-1", timeout=60, poll=0)
+
+    assert status == DocumentStatus.INDEXED
+    assert db.execute.call_count == 3
+
+
+def test_wait_for_document_stops_when_a_pipeline_task_failed(tmp_path):
+    """
+    Tests that a task failing before it could mark the document FAILED does not hold
+    the lane until the timeout: the failure marker ends the wait.
+    """
+    from workers.celery_app import record_pipeline_failure
+
+    store = StageStore(str(tmp_path))
+    db = MagicMock()
+    db.execute.return_value.scalar_one_or_none.return_value = DocumentStatus.PROCESSING
+    sender = MagicMock()
+    sender.name = "tasks.process_text"
+
+    with patch("app.rag.ingest.stage_store.stage_store", store), patch(
+        "workers.tasks.batch_tasks.stage_store", store
+    ), patch("workers.tasks.batch_tasks.get_sync_db") as mock_db, patch(
+        "workers.tasks.batch_tasks.time.sleep"
+    ) as mock_sleep:
+        mock_db.return_value.__enter__.return_value = db
+        mock_sleep.side_effect = lambda _: record_pipeline_failure(
+            sender=sender, exception=FileNotFoundError("extraction"), kwargs={"document_id": "doc-1"}
+        )
+        status = _wait_for_document("doc-1", timeout=3600, poll=0)
+
+    assert status == DocumentStatus.FAILED
+    assert db.execute.call_count == 2
+    assert store.get(store.ref("doc-1", "failure"))["task"] == "tasks.process_text"
+
+
+def test_wait_for_document_gives_up_after_the_timeout():
+    db = MagicMock()
+    db.execute.return_value.scalar_one_or_none.return_value = DocumentStatus.PROCESSING
+
+    with patch("workers.tasks.batch_tasks.get_sync_db") as mock_db:
+        mock_db.return_value.__enter__.return_value = db
+        status = _wait_for_document("doc-1", timeout=0, poll=0)
+
+    assert status == DocumentStatus.PROCESSING
+    assert db.execute.call_count == 1
+
+
+def test_s3_prefix_sync_splits_new_changed_and_unchanged_objects(tmp_path, monkeypatch):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    from app.rag.ingest.s3_connector import S3Connector
+    from app.rag.ingest.upload_store import UploadStore
+    from workers.tasks import batch_tasks
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="archive")
+        for key, body in [("q1/same.txt", b"same"), ("q1/edited.txt", b"v2"), ("q1/new.txt", b"new")]:
+            client.put_object(Bucket="archive", Key=key, Body=body)
+        same_etag = client.head_object(Bucket="archive", Key="q1/same.txt")["ETag"].strip('"')
+
+        same_id, edited_id = uuid.uuid4(), uuid.uuid4()
+        db = MagicMock()
+        db.execute.return_value.all.return_value = [
+            MagicMock(id=same_id, source_uri="s3://archive/q1/same.txt", source_etag=same_etag),
+            MagicMock(id=edited_id, source_uri="s3://archive/q1/edited.txt", source_etag="v1-etag"),
+        ]
+        monkeypatch.setattr(batch_tasks, "upload_store", UploadStore(str(tmp_path)))
+        connector = S3Connector(s3_client=client)
+
+        new_files, changed, result = batch_tasks.sync_from_connector(
+            db, connector, connector.parse_location("s3://archive/q1/"), {}, uuid.uuid4()
+        )
+
+    assert [file["source_uri"] for file in new_files] == ["s3://archive/q1/new.txt"]
+    assert [(doc_id, file["sha256"]) for doc_id, file in changed] == [(edited_id, hashlib.sha256(b"v2").hexdigest())]
+    assert result.stats["unchanged"] == 1
+    assert "watermark" in result.cursor
+
+
+def test_changed_files_of_documents_still_ingesting_are_deferred():
+    from app.models.document import DocumentStatus
+    from workers.tasks.batch_tasks import register_files
+
+    now = datetime.utcnow()
+    busy = MagicMock(id=uuid.uuid4(), sha256="old-busy", status=DocumentStatus.PROCESSING, version=1, updated_at=now)
+    done = MagicMock(id=uuid.uuid4(), sha256="old-done", status=DocumentStatus.INDEXED, version=1, updated_at=now)
+    # Left PROCESSING by a worker that died: its ingestion is over, so it can be versioned
+    stuck = MagicMock(id=uuid.uuid4(), sha256="old-stuck", status=DocumentStatus.PROCESSING, version=1)
+    stuck.updated_at = now - timedelta(days=1)
+    changed = [
+        (busy.id, {"sha256": "new-busy", "size_bytes": 1, "etag": "e1", "filename": "busy.pdf"}),
+        (done.id, {"sha256": "new-done", "size_bytes": 1, "etag": "e2", "filename": "done.pdf"}),
+        (stuck.id, {"sha256": "new-stuck", "size_bytes": 1, "etag": "e3", "filename": "stuck.pdf"}),
+    ]
+    db = MagicMock()
+    existing_hashes, changed_documents = MagicMock(), MagicMock()
+    existing_hashes.scalars.return_value = []
+    changed_documents.scalars.return_value.all.return_value = [busy, done, stuck]
+    db.execute.side_effect = [existing_hashes, changed_documents]
+    batch = MagicMock(id=uuid.uuid4())
+
+    scheduled, replaced, deferred = register_files(db, batch, [], changed)
+
+    assert scheduled == [(str(done.id), "new-done"), (str(stuck.id), "new-stuck")]
+    assert replaced == ["old-done", "old-stuck"]
+    assert [file["sha256"] for file in deferred] == ["new-busy"]
+    assert busy.sha256 == "old-busy" and busy.version == 1
@@ -0,0 +1,124 @@
+import re
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.models.document import DocumentStatus
+from app.rag.ingest.stage_store import StageStore
+from workers.tasks.index_tasks import index_document_task
+from workers.tasks.process_text_tasks import process_text_document_task
+
+PAGE_TEXTS = [{"page_number": n, "text": f"Page {n}. " + "Clause text. " * 40, "method": "text"} for n in (1, 2, 3)]
+
+
+def _process_new_version(tmp_path, stored_rows, chunks_indexed):
+    store = StageStore(str(tmp_path))
+    doc = MagicMock(chunks_indexed=chunks_indexed)
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = doc
+
+    @contextmanager
+    def fake_db():
+        yield session
+
+    fake_embedder = MagicMock()
+    fake_embedder.token_offsets.side_effect = lambda texts: [[m.span() for m in re.finditer(r"\S+", t)] for t in texts]
+    mock_apply = MagicMock(side_effect=lambda db, diff, **kwargs: [row["id"] for row in diff.added])
+    stored_hashes = [(row["id"], row["content_hash"]) for row in stored_rows]
+
+    with patch("workers.tasks.process_text_tasks.stage_store", store), patch(
+        "workers.tasks.process_text_tasks.get_sync_db", fake_db
+    ), patch("workers.tasks.process_text_tasks.embedder", fake_embedder), patch(
+        "workers.tasks.process_text_tasks.load_chunk_hashes", return_value=stored_hashes
+    ), patch("workers.tasks.process_text_tasks.apply_chunk_diff", mock_apply), patch(
+        "workers.tasks.process_text_tasks.index_document_task"
+    ) as mock_index:
+        process_text_document_task.run(document_id="doc-1", page_texts=PAGE_TEXTS)
+
+    diff = mock_apply.call_args.args[1]
+    diff_ref = mock_index.delay.call_args.kwargs.get("diff_ref")
+    return doc, diff, store.get(diff_ref) if diff_ref else None
+
+
+def test_new_version_replaces_every_chunk_when_the_last_index_run_did_not_finish(tmp_path):
+    """
+    Tests that chunks stored by a run whose indexing failed are not reused: they may be
+    missing from Qdrant and Elasticsearch, so they are all removed and re-added.
+    """
+    _, first, _ = _process_new_version(tmp_path, [], chunks_indexed=False)
+    stored_rows = first.added
+    assert len(stored_rows) > 1
+
+    doc, diff, chunk_diff = _process_new_version(tmp_path, stored_rows, chunks_indexed=False)
+
+    assert diff.kept == []
+    assert chunk_diff["kept_ids"] == []
+    assert chunk_diff["removed_ids"] == [str(row["id"]) for row in stored_rows]
+    assert len(chunk_diff["added_ids"]) == len(stored_rows)
+    assert doc.chunks_indexed is False
+
+    # Once the index task has confirmed the chunks, the same texts are reused
+    doc, diff, chunk_diff = _process_new_version(tmp_path, stored_rows, chunks_indexed=True)
+
+    assert chunk_diff["kept_ids"] == [str(row["id"]) for row in stored_rows]
+    assert chunk_diff["added_ids"] == chunk_diff["removed_ids"] == []
+    assert doc.chunks_indexed is False  # Until this version's index run succeeds
+
+
+def test_new_version_deletes_removed_chunks_and_indexes_only_added_ones(tmp_path):
+    store = StageStore(str(tmp_path))
+    chunk_diff = {"added_ids": ["a1", "a2"], "kept_ids": ["k1"], "removed_ids": ["r1"]}
+    diff_ref = store.put("doc-1", "chunk_diff", chunk_diff)
+
+    doc = MagicMock()
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = doc
+
+    @contextmanager
+    def fake_db():
+        yield session
+
+    added = [
+        {"chunk_id": cid, "chunk_index": i, "text": f"new {i}", "metadata": {}} for i, cid in enumerate(["a1", "a2"])
+    ]
+    kept = [{"chunk_id": "k1", "chunk_index": 2, "text": "unchanged", "metadata": {"page": 3}}]
+    mock_iter = MagicMock(
+        side_effect=lambda db, doc_id, batch_size, chunk_ids: iter([kept if "k1" in chunk_ids else added])
+    )
+    mock_vectors = MagicMock()
+    mock_vectors.upsert_vectors.return_value = {"retries": 0}
+    mock_keywords = MagicMock()
+    mock_batcher = MagicMock()
+    mock_batcher.embed.side_effect = lambda texts: np.zeros((len(texts), 4), dtype=np.float32)
+    mock_delete_rows = MagicMock()
+    order = MagicMock()
+    order.attach_mock(mock_vectors.delete_vectors, "qdrant")
+    order.attach_mock(mock_keywords.delete_chunks, "es")
+    order.attach_mock(mock_delete_rows, "postgres")
+
+    with patch("workers.tasks.index_tasks.stage_store", store), patch(
+        "workers.tasks.index_tasks.get_sync_db", fake_db
+    ), patch("workers.tasks.index_tasks.iter_chunk_batches", mock_iter), patch(
+        "workers.tasks.index_tasks.vector_db_client", mock_vectors
+    ), patch("workers.tasks.index_tasks.keyword_indexer", mock_keywords), patch(
+        "workers.tasks.index_tasks.embedding_batcher", mock_batcher
+    ), patch("workers.tasks.index_tasks.embedder"), patch("workers.tasks.index_tasks.delete_chunks", mock_delete_rows):
+        index_document_task.run(document_id="doc-1", diff_ref=diff_ref)
+
+    mock_vectors.delete_vectors.assert_called_once_with(["r1"])
+    mock_keywords.delete_chunks.assert_called_once_with(["r1"])
+    # Postgres rows go only after Qdrant and ES no longer return them
+    assert [c[0] for c in order.mock_calls] == ["qdrant", "es", "postgres"]
+    assert mock_delete_rows.call_args.args[1] == ["r1"]
+    assert [c.kwargs["chunk_ids"] for c in mock_iter.call_args_list] == [["k1"], ["a1", "a2"]]
+    assert mock_vectors.upsert_vectors.call_args.args[0] == ["a1", "a2"]
+    # Kept chunks are re-positioned in both indexes without being re-embedded
+    mock_vectors.set_payloads.assert_called_once_with(["k1"], [{"chunk_index": 2, "metadata": {"page": 3}}])
+    mock_keywords.update_chunk_metadata.assert_called_once_with(
+        [{"chunk_id": "k1", "metadata": {"document_id": "doc-1", "chunk_index": 2}}]
+    )
+    assert mock_batcher.embed.call_count == 1
+    assert doc.status == DocumentStatus.INDEXED
+    assert doc.chunks_indexed is True
+    assert not (tmp_path / "doc-1" / "chunk_diff.json.gz").exists()
@@ -0,0 +1,26 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models.document import DocumentStatus
+from workers.tasks.ocr_tasks import run_ocr
+
+
+def test_ocr_failure_marks_the_document_failed():
+    doc = MagicMock(status=DocumentStatus.PROCESSING)
+    db = MagicMock()
+    db.execute.return_value.scalar_one_or_none.return_value = doc
+
+    with patch("workers.tasks.ocr_tasks.get_sync_db") as mock_db, patch(
+        "workers.tasks.ocr_tasks.PdfDocument", side_effect=RuntimeError("corrupt PDF")
+    ), patch("workers.tasks.ocr_tasks.create_ocr_engine"), patch(
+        "workers.tasks.ocr_tasks.process_text_document_task"
+    ) as mock_process:
+        mock_db.return_value.__enter__.return_value = db
+        with pytest.raises(RuntimeError):
+            asyncio.run(run_ocr("doc-1", "/uploads/missing.pdf"))
+
+    assert doc.status == DocumentStatus.FAILED
+    db.commit.assert_called_once()
+    mock_process.delay.assert_not_called()
@@ -0,0 +1,84 @@
+import re
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+from app.rag.ingest.stage_store import StageStore
+from app.settings import settings
+from workers import celery_app as celery_module
+from workers.tasks.process_text_tasks import process_text_document_task
+
+PAGES = 500
+
+
+def _extraction():
+    page_texts = [
+        {"page_number": n, "text": f"Page {n}. " + "Clause text of a long scanned contract. " * 60, "method": "ocr"}
+        for n in range(1, PAGES + 1)
+    ]
+    tables = [{"page_number": n, "table_data": [["Region", "Sales"], ["EU", str(n)]]} for n in range(1, PAGES + 1, 10)]
+    return {"page_texts": page_texts, "tables": tables, "doc_metadata": {"page_count": PAGES}}
+
+
+def _publish(task_kwargs):
+    # Celery message protocol 2 body: (args, kwargs, embed)
+    with patch.object(settings, "BROKER_PAYLOAD_STATS", True):
+        celery_module.record_publish_payload_size(sender="tasks.process_text", body=((), task_kwargs, {}))
+
+
+def test_publish_sizes_are_not_measured_by_default():
+    celery_module.publish_stats.clear()
+
+    with patch.object(celery_module.json, "dumps") as mock_dumps:
+        celery_module.record_publish_payload_size(sender="tasks.process_text", body=((), {"document_id": "doc-1"}, {}))
+
+    mock_dumps.assert_not_called()
+    assert celery_module.get_publish_stats() == {}
+
+
+def test_500_page_document_passes_a_constant_size_reference(tmp_path):
+    """
+    Tests that a 500-page extraction crosses the broker as a short reference instead
+    of megabytes of inline text, and that the consumer reads it back from the store.
+    """
+    extraction = _extraction()
+    store = StageStore(str(tmp_path))
+    celery_module.publish_stats.clear()
+
+    _publish({"document_id": "doc-1", **extraction})
+    inline_bytes = celery_module.get_publish_stats()["tasks.process_text"]["max_bytes"]
+
+    celery_module.publish_stats.clear()
+    ref = store.put("doc-1", "extraction", extraction)
+    _publish({"document_id": "doc-1", "extraction_ref": ref})
+    reference_bytes = celery_module.get_publish_stats()["tasks.process_text"]["max_bytes"]
+
+    assert inline_bytes > 1_000_000
+    assert reference_bytes < 200
+
+    doc = MagicMock()
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = doc
+
+    @contextmanager
+    def fake_db():
+        yield session
+
+    # Whitespace tokens stand in for the embedder's tokenizer
+    fake_embedder = MagicMock()
+    fake_embedder.token_offsets.side_effect = lambda texts: [[m.span() for m in re.finditer(r"\S+", t)] for t in texts]
+
+    with patch("workers.tasks.process_text_tasks.stage_store", store), patch(
+        "workers.tasks.process_text_tasks.get_sync_db", fake_db
+    ), patch("workers.tasks.process_text_tasks.embedder", fake_embedder), patch(
+        "workers.tasks.process_text_tasks.index_document_task"
+    ) as mock_index:
+        process_text_document_task.run(document_id="doc-1", extraction_ref=ref)
+
+    # Bulk insert: execute(insert(chunks), rows) calls after the document and chunk-hash selects
+    rows = [row for c in session.execute.call_args_list[2:] for row in c.args[1]]
+    assert {row["chunk_metadata"]["page"] for row in rows} == set(range(1, PAGES + 1))
+    assert doc.doc_metadata == {"page_count": PAGES}
+    assert not (tmp_path / "doc-1" / "extraction.json.gz").exists()  # Consumed blob is removed
+
+    # Indexing streams the committed chunks from Postgres, so only the id is enqueued
+    mock_index.delay.assert_called_once_with(document_id="doc-1")
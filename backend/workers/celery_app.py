@@ -3,19 +3,38 @@ import multiprocessing as mp
 mp.set_start_method("spawn", force=True)
 
 
+import json
 import os
+import threading
 
 from celery import Celery
+from celery.concurrency import get_implementation
+from celery.signals import before_task_publish, task_failure, worker_init, worker_process_init
 
 # Get the Redis URL from an environment variable, with a default for local dev
 REDIS_URL = os.getenv("REDIS_URL", "redis://intelliagent-redis:6379/0")
 
+# Bulk ingestion lanes wait on whole document pipelines, so they get their own queue
+# (and worker) instead of holding the slots the pipeline stages run in
+BATCH_LANE_QUEUE = "batch_lanes"
+
+# Tasks of a document's ingestion pipeline, which all take a `document_id` keyword argument
+PIPELINE_TASKS = {"tasks.ingest_document", "tasks.ocr_document", "tasks.process_text", "tasks.index_document"}
+
+# Pools whose tasks share one process, and so can share embedding batches
+SHARED_PROCESS_POOLS = {"celery.concurrency.thread", "celery.concurrency.eventlet", "celery.concurrency.gevent"}
+
 # Create the Celery app instance
 celery_app = Celery(
     "workers",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["workers.tasks.ingest_tasks"],  # List of modules to import when the worker starts
+    # List of modules to import when the worker starts
+    include=[
+        "workers.tasks.ingest_tasks",
+        "workers.tasks.batch_tasks",
+        "workers.tasks.sync_tasks",
+    ],
 )
 
 # Configure Celery
@@ -27,4 +46,107 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     broker_connection_retry_on_startup=True,
+    task_routes={"tasks.ingest_batch_lane": {"queue": BATCH_LANE_QUEUE}},
 )
+
+
+# Broker payload sizes per task name, recorded by the publishing process
+_publish_stats_lock = threading.Lock()
+publish_stats = {}
+
+
+@before_task_publish.connect
+def record_publish_payload_size(sender=None, body=None, **kwargs):
+    """
+    Records the serialized size of every task message sent to the broker and logs
+    oversized ones, so large arguments (which should go through the stage store) show up.
+
+    The body reaches this signal before kombu serializes it, so measuring costs a
+    second JSON encode of every message; it only runs when BROKER_PAYLOAD_STATS is on.
+    """
+    from app.settings import settings
+
+    if not settings.BROKER_PAYLOAD_STATS:
+        return
+
+    size = len(json.dumps(body, default=str).encode("utf-8"))
+    with _publish_stats_lock:
+        stats = publish_stats.setdefault(sender, {"messages": 0, "total_bytes": 0, "max_bytes": 0})
+        stats["messages"] += 1
+        stats["total_bytes"] += size
+        stats["max_bytes"] = max(stats["max_bytes"], size)
+
+    if size > settings.BROKER_PAYLOAD_WARN_BYTES:
+        print(f"Large broker payload: task {sender} message is {size / 1024:.1f} KiB")
+
+
+def get_publish_stats():
+    with _publish_stats_lock:
+        return {
+            task: {**stats, "avg_bytes": round(stats["total_bytes"] / stats["messages"], 1)}
+            for task, stats in publish_stats.items()
+        }
+
+
+@task_failure.connect
+def record_pipeline_failure(sender=None, exception=None, kwargs=None, **extra):
+    """
+    Leaves a failure marker in the stage store when a pipeline task raises, so a batch
+    lane waiting on the document moves on even if its status was never set to FAILED
+    (e.g. the task failed before reaching its own error handling).
+    """
+    from app.rag.ingest.stage_store import FAILURE_STAGE, stage_store
+
+    document_id = (kwargs or {}).get("document_id")
+    if sender is None or sender.name not in PIPELINE_TASKS or not document_id:
+        return
+    try:
+        stage_store.put(document_id, FAILURE_STAGE, {"task": sender.name, "error": str(exception)})
+    except Exception as e:
+        print(f"Could not record the failure of {sender.name} for document {document_id}: {e}")
+
+
+@worker_init.connect
+def configure_embedding_batcher(sender=None, **kwargs):
+    """
+    Turns off cross-task embedding batching when each worker process runs one task at
+    a time (solo and prefork pools): there is nothing to batch with, only a wait.
+    Set before prefork forks its children, so they inherit it.
+    """
+    from app.rag.embedding_batcher import embedding_batcher
+
+    pool = get_implementation(sender.pool_cls)
+    embedding_batcher.direct = sender.concurrency <= 1 or pool.__module__ not in SHARED_PROCESS_POOLS
+    print(f"Embedding batcher {'disabled' if embedding_batcher.direct else 'enabled'} for {pool.__module__}")
+
+
+@worker_process_init.connect
+def warm_up_embedder(**kwargs):
+    """
+    Loads the embedding model once per worker process, before any task runs.
+    Every indexing task in this process then reuses the same in-memory model.
+    """
+    from app.rag.embedder import embedder
+
+    try:
+        embedder.warmup()
+        print(f"Embedder ready in worker process: {embedder.get_metrics()}")
+    except Exception as e:
+        # Not fatal: the model will be loaded lazily by the first task instead
+        print(f"Embedder warm-up failed, falling back to lazy loading: {e}")
+
+
+@worker_process_init.connect
+def init_search_backends(**kwargs):
+    """
+    Ensures the Qdrant collection and Elasticsearch index exist, once per worker
+    process, using the pooled sync clients that the indexing tasks share.
+    """
+    from app.db.elasticsearch_client import es_client
+    from app.db.vector_db import vector_db_client
+
+    try:
+        vector_db_client.initialize_collection()
+    except Exception as e:
+        print(f"Qdrant collection initialization failed: {e}")
+    es_client.create_index_if_not_exists()
@@ -0,0 +1,256 @@
+# workers/tasks/batch_tasks.py
+
+"""
+Bulk ingestion tasks: a batch of documents is scheduled as one Celery group of
+lane tasks, and server-side manifests are registered in the worker. The
+registration helpers are shared with source syncs (see sync_tasks).
+"""
+
+import asyncio
+import mimetypes
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+from celery import group
+from sqlalchemy import select
+
+from app.db.sync_session import get_sync_db
+from app.models.document import Document, DocumentStatus
+from app.models.ingestion_batch import IngestionBatch, IngestionBatchStatus
+from app.rag.ingest.base_connector import BaseConnector
+from app.rag.ingest.bulk_ingest import (
+    TERMINAL_STATUSES,
+    bump_document_version,
+    dedupe_files,
+    import_file,
+    ingestion_finished,
+    resolve_manifest_path,
+    split_lanes,
+)
+from app.rag.ingest.connector_registry import create_connector
+from app.rag.ingest.stage_store import FAILURE_STAGE, stage_store
+from app.rag.ingest.sync_engine import SyncEngine, SyncResult
+from app.rag.ingest.upload_store import upload_store
+from app.settings import settings
+from workers.celery_app import celery_app
+from workers.tasks.ingest_tasks import ingest_document_task
+
+
+def schedule_ingestion_batch(batch_id: str, documents: Sequence[Tuple[str, str]], concurrency: int):
+    """
+    Schedules (document_id, sha256) pairs as a group of at most `concurrency` lane tasks.
+
+    Each lane's document list goes through the stage store, so a 50k-file batch is
+    `concurrency` small messages rather than 50k, and the batch never holds more
+    than `concurrency` worker slots for ingestion at once.
+    """
+    lanes = split_lanes([list(document) for document in documents], concurrency)
+    if not lanes:
+        return None
+
+    lane_refs = [stage_store.put(str(batch_id), f"lane-{n}", lane) for n, lane in enumerate(lanes)]
+    result = group(ingest_batch_lane_task.si(batch_id=str(batch_id), lane_ref=ref) for ref in lane_refs).apply_async()
+    print(f"Scheduled batch {batch_id}: {len(documents)} documents in {len(lanes)} lanes")
+    return result
+
+
+@celery_app.task(name="tasks.ingest_batch_lane")
+def ingest_batch_lane_task(batch_id: str, lane_ref: str):
+    """
+    Ingests one lane of a batch, one document at a time.
+
+    `ingest_document_task` is run inline, and the lane then waits until the
+    document's whole pipeline (OCR/text processing/indexing, queued as usual) has
+    reached INDEXED or FAILED, or one of its tasks has raised (see
+    `record_pipeline_failure`), before starting the next one. A batch therefore has
+    at most one document per lane in the pipeline at once. Lanes are routed to
+    their own queue (`BATCH_LANE_QUEUE`), so waiting never starves the stage tasks.
+    """
+    documents = stage_store.get(lane_ref)
+    print(f"Batch {batch_id}: ingesting lane {lane_ref} with {len(documents)} documents")
+
+    for document_id, sha256_hash in documents:
+        ingest_document_task.run(document_id=document_id, sha256_hash=sha256_hash)
+        _wait_for_document(document_id)
+
+    stage_store.delete(lane_ref)
+
+
+def _wait_for_document(
+    document_id: str,
+    timeout: float = settings.BULK_LANE_DOCUMENT_TIMEOUT,
+    poll: float = settings.BULK_LANE_POLL_SECONDS,
+):
+    deadline = time.monotonic() + timeout
+    failure_ref = stage_store.ref(document_id, FAILURE_STAGE)
+    while True:
+        with get_sync_db() as db:
+            status = db.execute(select(Document.status).where(Document.id == document_id)).scalar_one_or_none()
+        if status is None or status in TERMINAL_STATUSES:
+            return status
+        if stage_store.exists(failure_ref):
+            failure = stage_store.get(failure_ref)
+            print(f"Document {document_id}: {failure['task']} failed ({failure['error']}); lane moves on")
+            return DocumentStatus.FAILED
+        if time.monotonic() >= deadline:
+            print(f"Document {document_id} still {status.value} after {timeout}s; lane moves on")
+            return status
+        time.sleep(poll)
+
+
+@celery_app.task(name="tasks.register_manifest")
+def register_manifest_task(batch_id: str, manifest_ref: str):
+    """
+    Registers the files of a manifest batch and schedules it.
+
+    Local paths are copied into the upload store (hashed in threads; file reads
+    release the GIL). S3 prefixes are backfilled through `SyncEngine`, which skips
+    objects whose ETag matches the one recorded for their document; objects whose
+    content changed become a new version of that document (see `bump_document_version`).
+    All new and updated `Document` rows are written in one transaction.
+    """
+    manifest = stage_store.get(manifest_ref)
+    print(f"Registering manifest batch {batch_id}: {len(manifest['paths'])} paths, {len(manifest['s3_uris'])} S3 URIs")
+
+    with get_sync_db() as db:
+        batch = db.execute(select(IngestionBatch).where(IngestionBatch.id == batch_id)).scalar_one_or_none()
+        if not batch:
+            print(f"Error: Ingestion batch {batch_id} not found.")
+            return
+
+        try:
+            resolved = [resolve_manifest_path(settings.BULK_IMPORT_ROOT, path) for path in manifest["paths"]]
+            with ThreadPoolExecutor(max_workers=settings.BULK_INGEST_CONCURRENCY) as pool:
+                files = list(pool.map(lambda path: import_file(path, upload_store), resolved))
+
+            # S3 objects: new keys become documents, changed keys become versions of existing ones
+            changed, unchanged = [], 0
+            for uri in manifest["s3_uris"]:
+                connector = create_connector("s3")
+                new_objects, changed_objects, result = sync_from_connector(
+                    db, connector, connector.parse_location(uri), {}, batch.project_id
+                )
+                files.extend(new_objects)
+                changed.extend(changed_objects)
+                unchanged += result.stats["unchanged"]
+
+            scheduled, replaced_hashes, deferred = register_files(db, batch, files, changed, unchanged)
+            batch.skipped_documents += len(deferred)
+            db.commit()
+
+            for sha256_hash in replaced_hashes:
+                _remove_quietly(upload_store.path(sha256_hash))
+            schedule_ingestion_batch(batch_id, scheduled, settings.BULK_INGEST_CONCURRENCY)
+            stage_store.delete(manifest_ref)
+
+        except Exception as e:
+            db.rollback()
+            print(f"Error registering manifest batch {batch_id}: {str(e)}")
+            batch.status = IngestionBatchStatus.FAILED
+            batch.error = str(e)
+            db.commit()
+
+
+def sync_from_connector(
+    db, connector: BaseConnector, source: Dict[str, Any], cursor: Dict[str, Any], project_id: uuid.UUID
+) -> Tuple[List[dict], List[Tuple[uuid.UUID, dict]], SyncResult]:
+    """
+    Runs `SyncEngine` over a connector source against the project's documents.
+    Returns (new files, [(document id, file)] for changed items, the sync result).
+    """
+    ids_by_uri: Dict[str, uuid.UUID] = {}
+
+    def lookup_versions(uris: List[str]) -> Dict[str, str]:
+        rows = db.execute(
+            select(Document.id, Document.source_uri, Document.source_etag).where(
+                Document.project_id == project_id, Document.source_uri.in_(uris)
+            )
+        ).all()
+        ids_by_uri.update({row.source_uri: row.id for row in rows})
+        return {row.source_uri: row.source_etag for row in rows}
+
+    engine = SyncEngine(store=upload_store, concurrency=settings.SYNC_CONCURRENCY)
+    result = asyncio.run(engine.run(connector, source, cursor, lookup_versions))
+
+    new_files = [file for file in result.files if file["source_uri"] not in ids_by_uri]
+    changed = [(ids_by_uri[file["source_uri"]], file) for file in result.files if file["source_uri"] in ids_by_uri]
+    return new_files, changed, result
+
+
+def register_files(
+    db, batch: IngestionBatch, files: List[dict], changed: List[Tuple[uuid.UUID, dict]], unchanged: int = 0
+) -> Tuple[List[Tuple[str, str]], List[str], List[dict]]:
+    """
+    Adds a `Document` for every new file and a new version for every changed one,
+    and marks the batch QUEUED, without committing. A changed file whose document
+    is still being ingested is deferred rather than versioned, since that
+    ingestion still reads the current file.
+    Returns ((document id, sha256) pairs to schedule, hashes of replaced files,
+    deferred files).
+    """
+    hashes = [file["sha256"] for file in files] + [file["sha256"] for _, file in changed]
+    existing = set(db.execute(select(Document.sha256).where(Document.sha256.in_(hashes))).scalars())
+    new_files, skipped = dedupe_files(files, existing)
+
+    documents = [
+        Document(
+            id=uuid.uuid4(),
+            project_id=batch.project_id,
+            owner_id=batch.owner_id,
+            batch_id=batch.id,
+            filename=file["filename"],
+            mime_type=file.get("mime_type") or _guess_mime_type(file["filename"]),
+            size_bytes=file["size_bytes"],
+            sha256=file["sha256"],
+            source_uri=file.get("source_uri"),
+            source_etag=file.get("etag"),
+        )
+        for file in new_files
+    ]
+    db.add_all(documents)
+    scheduled = [(str(doc.id), doc.sha256) for doc in documents]  # Before commit expires the objects
+
+    replaced_hashes, deferred = [], []
+    for document, file in _load_changed_documents(db, changed):
+        if not ingestion_finished(document.status, document.updated_at, settings.DOCUMENT_STALE_PROCESSING_SECONDS):
+            deferred.append(file)
+        elif file["sha256"] == document.sha256:
+            document.source_etag = file["etag"]  # Re-uploaded with identical content
+            unchanged += 1
+        elif file["sha256"] in existing:
+            skipped.append(file)  # Content already belongs to another document
+        else:
+            replaced_hashes.append(bump_document_version(document, file))
+            document.batch_id = batch.id
+            scheduled.append((str(document.id), document.sha256))
+
+    batch.total_documents = len(scheduled)
+    batch.skipped_documents = len(skipped) + unchanged
+    batch.status = IngestionBatchStatus.QUEUED
+    if deferred:
+        print(f"Batch {batch.id}: deferred {len(deferred)} changed files whose documents are still being ingested")
+    return scheduled, replaced_hashes, deferred
+
+
+def _load_changed_documents(db, changed: List[Tuple[uuid.UUID, dict]]):
+    if not changed:
+        return []
+    files_by_id = dict(changed)
+    # Row locks keep a version upload through the API from interleaving with this one
+    statement = select(Document).where(Document.id.in_(list(files_by_id))).with_for_update()
+    documents = db.execute(statement).scalars().all()
+    return [(document, files_by_id[document.id]) for document in documents]
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _guess_mime_type(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "text/plain"
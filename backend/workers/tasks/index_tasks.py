@@ -1,93 +1,128 @@
 # workers/tasks/index_tasks.py
-from qdrant_client.http.models import PointStruct  # ← ADD THIS IMPORT
+from typing import Any, Dict, Iterable, List, Optional
+
 from sqlalchemy import select
 
+from app.db.chunk_store import delete_chunks, iter_chunk_batches
 from app.db.sync_session import get_sync_db
-from app.db.vector_db import VectorDBClient
-from app.models.chunk import Chunk
+from app.db.vector_db import QDRANT_UPSERT_PARALLEL, vector_db_client
 from app.models.document import Document, DocumentStatus
-from app.rag.embedder import Embedder
+from app.rag.embedder import embedder
+from app.rag.embedding_batcher import embedding_batcher
 from app.rag.index.keyword_indexer import keyword_indexer
+from app.rag.index.streaming_indexer import StreamingIndexer
+from app.rag.ingest.stage_store import stage_store
+from app.settings import settings
 from workers.celery_app import celery_app
 
 
 @celery_app.task(name="tasks.index_document")
-def index_document_task(document_id: str):
+def index_document_task(document_id: str, chunks_ref: str = None, diff_ref: str = None):
     """
     Generate embeddings and index chunks in the vector database.
+
+    Chunks are streamed from Postgres in `INDEX_BATCH_SIZE` batches through a
+    server-side cursor, and each batch goes to Elasticsearch and Qdrant while the
+    next one is fetched and embedded. `chunks_ref` is only read for messages
+    enqueued before chunks stopped being staged (a stage store reference to the
+    chunk records).
+
+    `diff_ref` is set when a new document version replaced stored chunks: a stage
+    store reference to {"added_ids", "kept_ids", "removed_ids"}. Only the added
+    chunks are embedded and indexed; see `_apply_chunk_diff` for the rest.
     """
     print(f"Starting indexing for document: {document_id}")
 
     with get_sync_db() as db:
         try:
-            # Fetch all chunks for this document
-            result = db.execute(select(Chunk).where(Chunk.document_id == document_id))
-            chunks = result.scalars().all()
+            # Embeddings go through the shared batcher so small documents indexed
+            # concurrently in this process are encoded together. An index batch is
+            # usually one Qdrant request, so the upsert parallelism comes from running
+            # several batches' upserts at once (which needs as many batches in flight).
+            indexer = StreamingIndexer(
+                keyword_indexer,
+                embedding_batcher.embed,
+                vector_db_client,
+                max_inflight_batches=max(settings.INDEX_MAX_INFLIGHT_BATCHES, QDRANT_UPSERT_PARALLEL),
+                upsert_workers=QDRANT_UPSERT_PARALLEL,
+            )
 
-            if not chunks:
-                print(f"No chunks found for document {document_id}")
-                return
-
-            # 1. Index chunks in Elasticsearch for keyword search
-            chunk_data_for_es = [
-                {
-                    "chunk_id": str(chunk.id),
-                    "text": chunk.text,
-                    "metadata": {
-                        "document_id": str(chunk.document_id),
-                        "chunk_index": chunk.chunk_index,
-                        # Add any other relevant metadata from chunk.chunk_metadata
-                    },
-                }
-                for chunk in chunks
-            ]
-            keyword_indexer.index_chunks(chunk_data_for_es)
-            print(f"✓ Indexed {len(chunks)} chunks to Elasticsearch for document {document_id}")
-
-            # Generate embeddings (batch mode)
-            embedder = Embedder()
-            texts = [chunk.text for chunk in chunks]
-            embeddings = embedder.embed_texts(texts)  # ← FIXED: use embed_texts()
-
-            # Create PointStruct objects for Qdrant
-            points = []
-            for chunk, embedding in zip(chunks, embeddings):
-                point = PointStruct(
-                    id=str(chunk.id),  # Use chunk ID as point ID
-                    vector=embedding,
-                    payload={
-                        "document_id": str(document_id),
-                        "text": chunk.text,
-                        "chunk_index": chunk.chunk_index,
-                        "metadata": chunk.chunk_metadata,
-                    },
-                )
-                points.append(point)
+            chunk_ids = _apply_chunk_diff(db, document_id, stage_store.get(diff_ref), indexer) if diff_ref else None
 
-            # Upsert to Qdrant (batch)
-            vector_db = VectorDBClient()
-            vector_db.upsert_embeddings(points)  # ← FIXED: use upsert_embeddings()
+            index_stats = indexer.index(document_id, _chunk_batches(db, document_id, chunks_ref, chunk_ids))
 
-            print(f"✓ Indexed {len(points)} chunks to Qdrant for document {document_id}")
+            if not index_stats["chunks"] and not diff_ref:
+                print(f"No chunks found for document {document_id}")
+            else:
+                print(
+                    f"✓ Indexed {index_stats['chunks']} chunks to Elasticsearch and Qdrant "
+                    f"for document {document_id}: {index_stats}"
+                )
+            print(f"Embedder metrics: {embedder.get_metrics()}")
+            print(f"Embedding batcher stats: {embedding_batcher.get_stats()}")
 
-            # Update document status to INDEXED
-            result = db.execute(select(Document).where(Document.id == document_id))
-            doc = result.scalar_one_or_none()
-            if doc:
-                doc.status = DocumentStatus.INDEXED
-                db.commit()
+            if _set_status(db, document_id, DocumentStatus.INDEXED, chunks_indexed=True):
                 print(f"✓ Document {document_id} status set to INDEXED")
 
+            for ref in (chunks_ref, diff_ref):
+                if ref:
+                    stage_store.delete(ref)
+
         except Exception as e:
             db.rollback()
             print(f"✗ Error indexing document {document_id}: {str(e)}")
 
-            # Update document status to FAILED
             try:
-                result = db.execute(select(Document).where(Document.id == document_id))
-                doc = result.scalar_one_or_none()
-                if doc:
-                    doc.status = DocumentStatus.FAILED
-                    db.commit()
+                _set_status(db, document_id, DocumentStatus.FAILED)
             except Exception as update_error:
                 print(f"Failed to update status: {str(update_error)}")
+
+
+def _set_status(db, document_id: str, status: DocumentStatus, **fields: Any) -> bool:
+    doc = db.execute(select(Document).where(Document.id == document_id)).scalar_one_or_none()
+    if doc:
+        doc.status = status
+        for name, value in fields.items():
+            setattr(doc, name, value)
+        db.commit()
+    return doc is not None
+
+
+def _chunk_batches(
+    db, document_id: str, chunks_ref: Optional[str], chunk_ids: Optional[List[str]]
+) -> Iterable[List[Dict[str, Any]]]:
+    if not chunks_ref:
+        return iter_chunk_batches(db, document_id, batch_size=settings.INDEX_BATCH_SIZE, chunk_ids=chunk_ids)
+    # Legacy messages carry the chunk records in the stage store instead of Postgres
+    chunks = stage_store.get(chunks_ref)
+    return (
+        chunks[start : start + settings.INDEX_BATCH_SIZE] for start in range(0, len(chunks), settings.INDEX_BATCH_SIZE)
+    )
+
+
+def _apply_chunk_diff(db, document_id: str, chunk_diff: Dict[str, List[str]], indexer: StreamingIndexer) -> List[str]:
+    """
+    Applies the index side of a new version's chunk diff and returns the ids of the
+    chunks still to embed and index. Removed chunks are deleted from Qdrant and
+    Elasticsearch, then from Postgres. Kept chunks keep their vectors and ES
+    documents, but their new `chunk_index` and page metadata are pushed to both.
+    """
+    removed_ids = chunk_diff["removed_ids"]
+    if removed_ids:
+        # Search resolves Qdrant/ES hits against Postgres, so the rows go last
+        vector_db_client.delete_vectors(removed_ids)
+        keyword_indexer.delete_chunks(removed_ids)
+        delete_chunks(db, removed_ids, batch_size=settings.CHUNK_INSERT_BATCH_SIZE)
+        db.commit()
+
+    kept_ids = chunk_diff.get("kept_ids", [])  # Absent from diffs staged before kept chunks were re-positioned
+    if kept_ids:
+        indexer.reposition(
+            document_id, iter_chunk_batches(db, document_id, batch_size=settings.INDEX_BATCH_SIZE, chunk_ids=kept_ids)
+        )
+
+    print(
+        f"Chunk diff for document {document_id}: {len(chunk_diff['added_ids'])} to index, "
+        f"{len(kept_ids)} re-positioned, {len(removed_ids)} removed"
+    )
+    return chunk_diff["added_ids"]
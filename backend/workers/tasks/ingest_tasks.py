@@ -11,6 +11,8 @@ from sqlalchemy import select  # ← Added for sync queries
 from app.db.sync_session import get_sync_db  # ← Changed from AsyncSessionLocal
 from app.models.document import Document, DocumentStatus
 from app.rag.ingest.metadata_extractor import MetadataExtractor  # ← NEW: Import metadata extractor
+from app.rag.ingest.stage_store import FAILURE_STAGE, stage_store
+from app.rag.ingest.upload_store import upload_store
 from workers.celery_app import celery_app
 from workers.tasks.ocr_tasks import ocr_document_task
 from workers.tasks.process_text_tasks import process_text_document_task
@@ -28,7 +30,7 @@ def ingest_document_task(document_id: str, sha256_hash: str):
 
     Workflow:
         1. Updates document status to PROCESSING
-        2. Extracts and saves metadata from the file
+        2. Extracts and saves metadata from the file (PDF metadata is saved by the OCR path)
         3. Routes based on mime type:
            - PDF → ocr_document_task
            - DOCX → Extract text → process_text_document_task
@@ -36,6 +38,7 @@ def ingest_document_task(document_id: str, sha256_hash: str):
 
     """
     print(f"Starting ingestion for document_id: {document_id}")
+    stage_store.delete(stage_store.ref(document_id, FAILURE_STAGE))  # Left by a failed earlier version
 
     with get_sync_db() as db:  # ← Changed from asyncio.run(process_document())
         try:
@@ -53,22 +56,24 @@ def ingest_document_task(document_id: str, sha256_hash: str):
             print(f"Document {doc.filename} status set to PROCESSING.")
 
             # 3. Construct the file path
-            file_path = f"/app/uploads/{sha256_hash}"
+            file_path = upload_store.path(sha256_hash)
             print(f"Processing file at: {file_path}")
 
-            # 4. Extract metadata from the original file
-            try:
-                with open(file_path, "rb") as f:
-                    file_content = f.read()
-
-                meta_extractor = MetadataExtractor()
-                metadata = meta_extractor.extract(file_content, doc.mime_type)
-                if metadata:
-                    doc.doc_metadata = metadata
-                    db.commit()
-                    print(f"Extracted and saved metadata for document {document_id}: {metadata}")
-            except Exception as e:
-                print(f"Could not extract metadata for {document_id}: {e}")
+            # 4. Extract metadata from the original file. PDFs are skipped here: the OCR
+            # task reads their metadata from the same PdfDocument session it parses once.
+            if doc.mime_type != "application/pdf":
+                try:
+                    with open(file_path, "rb") as f:
+                        file_content = f.read()
+
+                    meta_extractor = MetadataExtractor()
+                    metadata = meta_extractor.extract(file_content, doc.mime_type)
+                    if metadata:
+                        doc.doc_metadata = metadata
+                        db.commit()
+                        print(f"Extracted and saved metadata for document {document_id}: {metadata}")
+                except Exception as e:
+                    print(f"Could not extract metadata for {document_id}: {e}")
 
             # 5. Route based on mime type
             if doc.mime_type == "application/pdf":
@@ -84,8 +89,10 @@ def ingest_document_task(document_id: str, sha256_hash: str):
                     # Create page_texts structure (DOCX treated as single page)
                     page_texts = [{"page_number": 1, "text": full_text}]
 
-                    # Enqueue text processing task
-                    process_text_document_task.delay(document_id=document_id, page_texts=page_texts, tables=[])
+                    # Enqueue text processing task; the text itself goes through the stage store
+                    extraction = {"page_texts": page_texts, "tables": []}
+                    extraction_ref = stage_store.put(document_id, "extraction", extraction)
+                    process_text_document_task.delay(document_id=document_id, extraction_ref=extraction_ref)
                     print("DOCX text extracted. Enqueued text processing task.")
 
                 except Exception as e:
@@ -102,8 +109,10 @@ def ingest_document_task(document_id: str, sha256_hash: str):
 
                     page_texts = [{"page_number": 1, "text": text}]
 
-                    # Enqueue text processing task
-                    process_text_document_task.delay(document_id=document_id, page_texts=page_texts, tables=[])
+                    # Enqueue text processing task; the text itself goes through the stage store
+                    extraction = {"page_texts": page_texts, "tables": []}
+                    extraction_ref = stage_store.put(document_id, "extraction", extraction)
+                    process_text_document_task.delay(document_id=document_id, extraction_ref=extraction_ref)
                     print("Plain text extracted. Enqueued text processing task.")
 
                 except Exception as e:
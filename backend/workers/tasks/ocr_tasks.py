@@ -1,8 +1,17 @@
 # workers/tasks/ocr_tasks.py
 import asyncio
 
+from sqlalchemy import select
+
+from app.db.sync_session import get_sync_db
+from app.models.document import Document, DocumentStatus
+from app.rag.ingest.stage_store import stage_store
+from app.rag.ocr.engine_registry import create_ocr_engine
 from app.rag.ocr.layout_analyzer import LayoutAnalyzer
-from app.rag.ocr.tesseract_engine import TesseractEngine
+from app.rag.ocr.ocr_cache import OCRCache
+from app.rag.ocr.pdf_document import PdfDocument
+from app.rag.ocr.text_layer import TextLayerExtractor
+from app.settings import settings
 from workers.celery_app import celery_app
 from workers.tasks.process_text_tasks import process_text_document_task
 
@@ -36,27 +45,58 @@ async def run_ocr(document_id: str, file_path: str):
 
     try:
         # Initialize OCR engine and layout analyzer
-        ocr_engine = TesseractEngine()
-        layout_analyzer = LayoutAnalyzer()
-
-        # Perform OCR on all pages
-        ocr_results = ocr_engine.ocr_pdf(file_path)
-        print(f"OCR completed. Extracted text from {len(ocr_results)} pages.")
-
-        # Extract tables from PDF
-        tables = layout_analyzer.extract_tables(file_path)
-        print(f"Layout analysis completed. Extracted {len(tables)} tables.")
-
-        # Format OCR results for downstream processing
-        page_texts = [{"page_number": page_num, "text": text} for page_num, text in ocr_results]
-
-        # Hand off to the text processing task
-        process_text_document_task.delay(document_id=document_id, page_texts=page_texts, tables=tables)
+        ocr_engine = create_ocr_engine(
+            settings.OCR_ENGINE,
+            dpi=settings.OCR_DPI,
+            page_window=settings.OCR_PAGE_WINDOW,
+            min_confidence=settings.OCR_MIN_CONFIDENCE,
+        )
+        layout_analyzer = LayoutAnalyzer(workers=settings.TABLE_WORKERS)
+
+        ocr_cache = OCRCache(settings.OCR_CACHE_DIR) if settings.OCR_CACHE_ENABLED else None
+
+        text_extractor = TextLayerExtractor(
+            ocr_engine,
+            min_chars=settings.TEXT_LAYER_MIN_CHARS,
+            min_quality=settings.TEXT_LAYER_MIN_QUALITY,
+            ocr_cache=ocr_cache,
+        )
+
+        # One parsing session serves metadata, text layer and tables
+        with PdfDocument(file_path) as document:
+            doc_metadata = document.metadata
+
+            # Use the PDF's text layer where it is good enough; OCR the remaining pages in parallel shards
+            page_texts = text_extractor.extract(document, ocr_workers=settings.OCR_WORKERS)
+            print(f"Text extraction completed for {len(page_texts)} pages.")
+
+            # Extract tables from PDF
+            tables = layout_analyzer.extract_tables(document)
+            print(f"Layout analysis completed. Extracted {len(tables)} tables.")
+            print(f"PDF parsed {document.parse_count} time(s) for document {document_id}.")
+            if ocr_cache:
+                print(f"OCR cache stats: {ocr_cache.get_stats()}")
+
+        # Hand off to the text processing task. The extraction result goes to the stage
+        # store and only its reference goes through the broker.
+        extraction_ref = stage_store.put(
+            document_id, "extraction", {"page_texts": page_texts, "tables": tables, "doc_metadata": doc_metadata}
+        )
+        process_text_document_task.delay(document_id=document_id, extraction_ref=extraction_ref)
 
         print(f"OCR finished for document {document_id}. Handed off to text processor.")
 
     except Exception as e:
         print(f"Error during OCR for document {document_id}: {str(e)}")
-        # Note: The text processing task won't be triggered if OCR fails
-        # The document status will remain in PROCESSING until manually updated
+        # The text processing task won't be triggered, so the document is marked FAILED here:
+        # otherwise it stays PROCESSING, blocking new versions and the batch lane waiting on it
+        try:
+            with get_sync_db() as db:
+                doc = db.execute(select(Document).where(Document.id == document_id)).scalar_one_or_none()
+                if doc:
+                    doc.status = DocumentStatus.FAILED
+                    db.commit()
+                    print(f"Document {document_id} status set to FAILED.")
+        except Exception as update_error:
+            print(f"Failed to update document status to FAILED: {str(update_error)}")
         raise
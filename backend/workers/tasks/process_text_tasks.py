@@ -1,21 +1,44 @@
 # workers/tasks/process_text_tasks.py
 
 from sqlalchemy import select
+from app.db.chunk_store import apply_chunk_diff, build_chunk_rows, diff_chunk_rows, load_chunk_hashes
 from app.db.sync_session import get_sync_db
-from app.models.chunk import Chunk
 from app.models.document import Document, DocumentStatus
 from app.rag.chunker import Chunker
+from app.rag.embedder import embedder
+from app.rag.ingest.stage_store import stage_store
+from app.rag.token_chunker import TokenChunker
+from app.settings import settings
 # REMOVED: from app.rag.ingest.pii_redactor import PIIRedactor
 from workers.celery_app import celery_app
 from workers.tasks.index_tasks import index_document_task
 
 @celery_app.task(name="tasks.process_text")
-def process_text_document_task(document_id: str, page_texts: list, tables: list):
+def process_text_document_task(
+    document_id: str,
+    page_texts: list = None,
+    tables: list = None,
+    doc_metadata: dict = None,
+    extraction_ref: str = None,
+):
     """
     Process extracted text: chunk and save ORIGINAL text to database.
     PII redaction is now applied at retrieval time, not during ingestion.
+
+    The extraction result normally arrives as `extraction_ref`, a stage store
+    reference to {"page_texts", "tables", "doc_metadata"}; inline `page_texts` /
+    `tables` are still accepted for messages enqueued before the claim-check.
+    `doc_metadata` is set by the OCR task, which reads PDF metadata from its parsing session.
     """
     print(f"Starting text processing for document: {document_id}")
+
+    if extraction_ref:
+        extraction = stage_store.get(extraction_ref)
+        page_texts = extraction["page_texts"]
+        tables = extraction["tables"]
+        doc_metadata = extraction.get("doc_metadata")
+    page_texts = page_texts or []
+    tables = tables or []
     
     with get_sync_db() as db:
         try:
@@ -27,8 +50,19 @@ def process_text_document_task(document_id: str, page_texts: list, tables: list)
                 print(f"Error: Document {document_id} not found.")
                 return
             
+            if doc_metadata:
+                doc.doc_metadata = doc_metadata
+                print(f"Saved metadata for document {document_id}: {doc_metadata}")
+
             # 2. Initialize chunker (PII redactor REMOVED)
-            chunker = Chunker(chunk_size=500, chunk_overlap=50)
+            if settings.CHUNKER_STRATEGY == "token":
+                chunker = TokenChunker(
+                    embedder.token_offsets,
+                    chunk_tokens=settings.CHUNK_TOKENS,
+                    overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+                )
+            else:
+                chunker = Chunker(chunk_size=500, chunk_overlap=50)
             
             # 3. NO PII REDACTION - Keep original text
             # REMOVED: for page in page_texts:
@@ -37,23 +71,46 @@ def process_text_document_task(document_id: str, page_texts: list, tables: list)
             # 4. Chunk the original text
             chunks_data = chunker.chunk_pages_and_tables(page_texts, tables)
             
-            # 5. Save chunks with ORIGINAL text to database
-            for idx, chunk_data in enumerate(chunks_data):
-                chunk = Chunk(
-                    document_id=doc.id,
-                    text=chunk_data["text"],  # Store ORIGINAL unredacted text
-                    chunk_index=idx,
-                    chunk_metadata=chunk_data["metadata"],
-                )
-                db.add(chunk)
-            
+            # 5. Save chunks with ORIGINAL text to database in bulk (ids are generated client-side).
+            # For a new version of an existing document, chunks whose text is unchanged keep
+            # their stored row (and so their embedding and ES doc); only the rest is written.
+            # Removed rows are deleted by the index task, after their vectors and ES docs.
+            # If the stored chunks never finished indexing (the last run failed or is still
+            # going), none of them can be trusted to be in the indexes: all are replaced.
+            rows = build_chunk_rows(doc.id, chunks_data)
+            existing = load_chunk_hashes(db, doc.id)
+            if not doc.chunks_indexed:
+                existing = [(chunk_id, None) for chunk_id, _ in existing]
+            diff = diff_chunk_rows(existing, rows)
+            added_ids = apply_chunk_diff(
+                db, diff, method=settings.CHUNK_INSERT_METHOD, batch_size=settings.CHUNK_INSERT_BATCH_SIZE
+            )
+            doc.chunks_indexed = False
             db.commit()
-            print(f"Created {len(chunks_data)} chunks for document {document_id}")
-            
-            # 6. Trigger indexing task
-            index_document_task.delay(document_id=document_id)
+            print(f"Saved {len(rows)} chunks for document {document_id} (version {doc.version}): {diff.get_stats()}")
+
+            # The chunks are persisted, so the extraction blob is no longer needed
+            if extraction_ref:
+                stage_store.delete(extraction_ref)
+
+            # 6. Trigger indexing task. Indexing streams the committed chunks back from
+            # Postgres in batches, so nothing but the document id crosses the broker.
+            # When stored chunks were replaced, the chunk-level diff goes by reference.
+            if diff.kept or diff.removed_ids:
+                diff_ref = stage_store.put(
+                    document_id,
+                    "chunk_diff",
+                    {
+                        "added_ids": [str(i) for i in added_ids],
+                        "kept_ids": [str(row["id"]) for row in diff.kept],
+                        "removed_ids": [str(i) for i in diff.removed_ids],
+                    },
+                )
+                index_document_task.delay(document_id=document_id, diff_ref=diff_ref)
+            else:
+                index_document_task.delay(document_id=document_id)
             print(f"Enqueued indexing task for document {document_id}")
-            
+
         except Exception as e:
             db.rollback()
             print(f"Error processing text for document {document_id}: {str(e)}")
@@ -0,0 +1,79 @@
+# workers/tasks/sync_tasks.py
+
+"""
+Source sync: a registered source (directory, S3 prefix, Drive folder) is
+re-crawled through its connector, and only new or changed items are ingested.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.db.sync_session import get_sync_db
+from app.models.ingestion_batch import IngestionBatch
+from app.models.sync_source import SyncSource
+from app.rag.ingest.bulk_ingest import resolve_import_dir
+from app.rag.ingest.connector_registry import create_connector
+from app.rag.ingest.upload_store import upload_store
+from app.settings import settings
+from workers.celery_app import celery_app
+from workers.tasks.batch_tasks import register_files, schedule_ingestion_batch, sync_from_connector
+
+
+@celery_app.task(name="tasks.sync_source")
+def sync_source_task(sync_source_id: str):
+    """
+    Syncs one source and schedules what changed as an ingestion batch.
+
+    The connector starts from the cursor saved by the previous successful sync.
+    The new cursor is written in the same transaction as the batch's documents, so
+    if anything fails the next sync starts over from the old cursor (items the
+    failed run already stored are downloaded again to the same content-addressed
+    paths).
+    """
+    with get_sync_db() as db:
+        sync_source = db.execute(select(SyncSource).where(SyncSource.id == sync_source_id)).scalar_one_or_none()
+        if not sync_source:
+            print(f"Error: Sync source {sync_source_id} not found.")
+            return
+
+        try:
+            connector = create_connector(sync_source.connector)
+            location = sync_source.location
+            if sync_source.connector == "file":
+                location = resolve_import_dir(settings.BULK_IMPORT_ROOT, location)
+            new_files, changed, result = sync_from_connector(
+                db, connector, connector.parse_location(location), sync_source.cursor, sync_source.project_id
+            )
+
+            batch = IngestionBatch(
+                project_id=sync_source.project_id,
+                owner_id=sync_source.owner_id,
+                source="sync",
+            )
+            db.add(batch)
+            db.flush()
+            scheduled, replaced_hashes, deferred = register_files(
+                db, batch, new_files, changed, result.stats["unchanged"]
+            )
+
+            # Deferred items are only picked up again if the cursor stays where it was
+            if not deferred:
+                sync_source.cursor = result.cursor
+            sync_source.last_synced_at = datetime.utcnow()
+            sync_source.last_stats = {**result.stats, "deferred": len(deferred)}
+            sync_source.last_batch_id = batch.id
+            sync_source.error = None
+            batch_id = str(batch.id)
+            db.commit()
+
+            for sha256_hash in replaced_hashes:
+                upload_store.discard(upload_store.path(sha256_hash))
+            schedule_ingestion_batch(batch_id, scheduled, settings.BULK_INGEST_CONCURRENCY)
+            print(f"Synced source {sync_source_id}: {len(scheduled)} documents scheduled in batch {batch_id}")
+
+        except Exception as e:
+            db.rollback()
+            print(f"Error syncing source {sync_source_id}: {str(e)}")
+            sync_source.error = str(e)
+            db.commit()